@@ -2,12 +2,13 @@ from fastapi import APIRouter
 from app.api.admin import (
     employees, dashboard, raw_data, policies, reports,
     companies, departments, ws, notice, today_meal_check, admins, settings as admin_settings,
-    hardware_terminals,
+    hardware_terminals, metrics, jobs,
 )
 
 router = APIRouter()
 router.include_router(ws.router, tags=["Websocket"])
 router.include_router(notice.router, tags=["Admin Notice"])
+router.include_router(metrics.router, tags=["Admin Metrics"])
 router.include_router(today_meal_check.router, tags=["Admin Today Meal Check"])
 router.include_router(admins.router, prefix="/admins", tags=["Admin Admins"])
 router.include_router(admin_settings.router, prefix="/settings", tags=["Admin Settings"])
@@ -24,3 +25,4 @@ router.include_router(policies.router, prefix="/policies", tags=["Admin Policies
 router.include_router(reports.router, prefix="/reports", tags=["Admin Reports"])
 router.include_router(companies.router, prefix="/companies", tags=["Admin Companies"])
 router.include_router(departments.router, prefix="/departments", tags=["Admin Departments"])
+router.include_router(jobs.router, prefix="/jobs", tags=["Admin Jobs"])
@@ -7,6 +7,7 @@ from app.api.auth import get_current_admin
 from app.models.models import CafeteriaAdmin
 from app.schemas.schemas import CafeteriaAdminResponse, AdminCreate, AdminUpdate
 from typing import List
+from app.core.principal_cache import invalidate_admin
 
 router = APIRouter()
 
@@ -57,6 +58,7 @@ def update_admin(
         admin.name = body.name.strip()
     db.commit()
     db.refresh(admin)
+    invalidate_admin(admin.id)
     return admin
 
 
@@ -69,6 +71,7 @@ def delete_admin(admin_id: int, db: Session = Depends(get_db), _admin=Depends(ge
         raise HTTPException(status_code=404, detail="관리자를 찾을 수 없습니다.")
     db.delete(admin)
     db.commit()
+    invalidate_admin(admin_id)
     return {"message": "삭제되었습니다."}
 
 
@@ -82,4 +85,5 @@ def reset_admin_device(admin_id: int, db: Session = Depends(get_db), _admin=Depe
     admin.is_verified = False
     admin.password_hash = None
     db.commit()
+    invalidate_admin(admin.id)
     return {"message": "기기 인증이 초기화되었습니다."}
@@ -1,17 +1,30 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from sqlalchemy.orm import Session
 from sqlalchemy import select, update, delete
 from app.core.database import get_db
 from app.api.auth import get_current_admin
-from app.models.models import Company, AuditLog
+from app.models.models import Company, AuditLog, Department, MealPolicy, User
 from app.schemas.schemas import CompanyCreate, CompanyUpdate, CompanyResponse
 from app.api.admin.utils import record_audit_log
-from typing import List
+from app.core.audit_writer import audit_writer
+from typing import List, Optional
+from app.core.live_counters import live_counters
+from app.core.report_cache import report_cache
+from app.core.principal_cache import invalidate_all_users
+from app.core.employee_search import invalidate_employee_index
+from app.core.delta_sync import delta_response, record_deletes
 
 router = APIRouter()
 
 @router.get("", response_model=List[CompanyResponse])
-def get_companies(db: Session = Depends(get_db), _admin=Depends(get_current_admin)):
+def get_companies(
+    request: Request,
+    since: Optional[str] = Query(None, description="델타 동기화 워터마크 (빈 값이면 전체). 응답 형식이 {rows, deleted, watermark, full} 로 바뀜"),
+    db: Session = Depends(get_db),
+    _admin=Depends(get_current_admin),
+):
+    if since is not None:
+        return delta_response(request, db, "companies", Company, CompanyResponse, since)
     result = db.execute(select(Company))
     return result.scalars().all()
 
@@ -75,6 +88,15 @@ def delete_company(company_id: int, db: Session = Depends(get_db), _admin=Depend
         before_value={"code": db_company.code, "name": db_company.name},
         reason="Admin deleted company"
     )
+    # 소속 사원·부서·정책은 DB CASCADE 로 지워지므로 델타 동기화용 삭제 기록을 미리 남김
+    for entity, model in (("employees", User), ("departments", Department), ("meal_policies", MealPolicy)):
+        record_deletes(db, entity, db.scalars(select(model.id).where(model.company_id == company_id)).all())
+    record_deletes(db, "companies", [company_id])
     db.delete(db_company)
     db.commit()
+    invalidate_all_users()  # 소속 사원 CASCADE 삭제
+    audit_writer.invalidate_operators()
+    invalidate_employee_index()
+    live_counters.invalidate()
+    report_cache.invalidate_all()
     return {"status": "success"}
@@ -1,12 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from sqlalchemy import select, and_
-from app.core.database import get_db
-from app.api.auth import get_current_admin
-from app.models.models import MealLog, MealPolicy, User
+from sqlalchemy import select
+from app.core.database import get_async_db
+from app.api.auth import get_current_admin_async
+from app.models.models import MealPolicy
 from app.schemas.schemas import DashboardStats
-from app.core.time_utils import kst_now, kst_today, kst_date_range_naive
-from datetime import date, datetime, timedelta
+from app.core.live_counters import live_counters
+from app.core.time_utils import kst_now, kst_today
 
 router = APIRouter(tags=["dashboard"])
 
@@ -21,9 +20,9 @@ def _policy_display_order_key(policy):
 
 
 @router.get("/today", response_model=DashboardStats)
-def get_today_stats(
-    db: Session = Depends(get_db),
-    _admin=Depends(get_current_admin),
+async def get_today_stats(
+    db=Depends(get_async_db),
+    _admin=Depends(get_current_admin_async),
 ):
     today = kst_today()
     
@@ -35,42 +34,31 @@ def get_today_stats(
     
     # Get all active policies for breakdown (정렬: 일반 식사 순서, 자정 넘김은 심야→새벽)
     policy_query = select(MealPolicy).where(MealPolicy.is_active == True).order_by(MealPolicy.start_time)
-    policy_result = db.execute(policy_query)
+    policy_result = await db.execute(policy_query)
     policies = sorted(policy_result.scalars().all(), key=_policy_display_order_key)
     
-    # Get all logs for today (created_at은 KST naive로 저장됨)
-    start_naive, end_naive = kst_date_range_naive()
-    log_query = select(MealLog).outerjoin(MealPolicy, MealLog.policy_id == MealPolicy.id).where(
-        and_(
-            MealLog.is_void == False,
-            MealLog.created_at >= start_naive,
-            MealLog.created_at < end_naive,
-        )
-    )
-    log_result = db.execute(log_query)
-    logs = log_result.scalars().all()
-    
-    # Exception criteria: 
-    # 1. is_void == True (Cancelled)
-    # 2. policy_id is None (Extra/No categorization)
-    exception_logs = [log for log in logs if log.is_void or log.policy_id is None]
+    # 오늘(KST naive created_at) 취소 제외 로그의 policy_id 별 건수·동반 인원 합: 메모리 카운터 (없거나 재집계 주기면 DB 집계 1회)
+    by_policy = live_counters.snapshot()
+    if by_policy is None:
+        by_policy = await db.run_sync(live_counters.seed)
     
-    # Active/Valid logs for policy breakdown (Not voided AND has policy_id)
-    valid_logs = [log for log in logs if not log.is_void and log.policy_id is not None]
+    # Exception criteria: policy_id is None (Extra/No categorization). 취소 로그는 집계에서 제외됨
+    exception_count = by_policy.get(None, (0, 0))[0]
     
     # Total count = sum of (1 + guest_count) for all NON-VOID logs
     # Note: Even if it's "Extra", it counts as a meal if not voided.
-    non_void_logs = [log for log in logs if not log.is_void]
-    total_count = sum(1 + log.guest_count for log in non_void_logs)
+    log_count = sum(cnt for cnt, _ in by_policy.values())
+    guest_count = sum(guests for _, guests in by_policy.values())
+    total_count = log_count + guest_count
     
     # Policy summary breakdown
     meal_summaries = []
     for policy in policies:
-        policy_logs = [log for log in valid_logs if log.policy_id == policy.id]
-        count = sum(1 + log.guest_count for log in policy_logs)
+        cnt, guests = by_policy.get(policy.id, (0, 0))
         meal_summaries.append({
+            "policy_id": policy.id,
             "meal_type": policy.meal_type,
-            "count": count,
+            "count": cnt + guests,
             "price": policy.base_price
         })
     
@@ -78,8 +66,8 @@ def get_today_stats(
         date=today,
         meal_type=meal_type_key,
         total_count=total_count,
-        employee_count=len([l for l in non_void_logs if l.policy_id is not None]), # Real employees with policy
-        guest_count=sum(log.guest_count for log in non_void_logs),
-        exception_count=len(exception_logs),
+        employee_count=log_count - exception_count, # Real employees with policy
+        guest_count=guest_count,
+        exception_count=exception_count,
         meal_summaries=meal_summaries
     )
@@ -1,17 +1,32 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from sqlalchemy.orm import Session
 from sqlalchemy import select, update, delete
 from app.core.database import get_db
 from app.api.auth import get_current_admin
-from app.models.models import Department, AuditLog
+from app.models.models import Department, AuditLog, User
 from app.schemas.schemas import DepartmentCreate, DepartmentUpdate, DepartmentResponse
 from app.api.admin.utils import record_audit_log
+from app.core.audit_writer import audit_writer
 from typing import List, Optional
+from app.core.principal_cache import invalidate_all_users
+from app.core.report_cache import report_cache
+from app.core.delta_sync import delta_response, record_deletes
+from app.core.time_utils import kst_now_naive
 
 router = APIRouter()
 
 @router.get("", response_model=List[DepartmentResponse])
-def get_departments(company_id: Optional[int] = None, db: Session = Depends(get_db), _admin=Depends(get_current_admin)):
+def get_departments(
+    request: Request,
+    company_id: Optional[int] = None,
+    since: Optional[str] = Query(None, description="델타 동기화 워터마크 (빈 값이면 전체). 응답 형식이 {rows, deleted, watermark, full} 로 바뀜"),
+    db: Session = Depends(get_db),
+    _admin=Depends(get_current_admin),
+):
+    if since is not None:
+        if company_id:
+            raise HTTPException(status_code=400, detail="since 는 company_id 와 함께 쓸 수 없습니다.")
+        return delta_response(request, db, "departments", Department, DepartmentResponse, since)
     query = select(Department)
     if company_id:
         query = query.where(Department.company_id == company_id)
@@ -64,8 +79,13 @@ def update_department(dept_id: int, dept_in: DepartmentUpdate, db: Session = Dep
         before_value=before_value, after_value=update_data,
         reason="Admin updated department"
     )
+    if "name" in update_data:
+        # 사원 목록 응답의 department_name 이 바뀌므로 소속 사원도 변경으로 표시 (델타 동기화)
+        db.execute(update(User).where(User.department_id == dept_id).values(updated_at=kst_now_naive()))
     db.commit()
     db.refresh(db_dept)
+    invalidate_all_users()  # 부서명 스냅샷 갱신
+    report_cache.invalidate_all()
     return db_dept
 
 @router.delete("/{dept_id}")
@@ -80,6 +100,10 @@ def delete_department(dept_id: int, db: Session = Depends(get_db), _admin=Depend
         before_value={"code": db_dept.code, "name": db_dept.name},
         reason="Admin deleted department"
     )
-    db.delete(db_dept)
+    record_deletes(db, "departments", [dept_id])
+    db.delete(db_dept)  # 소속 사원 CASCADE 삭제
     db.commit()
+    invalidate_all_users()
+    audit_writer.invalidate_operators()
+    report_cache.invalidate_all()
     return {"status": "success"}
@@ -1,12 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+import re
+
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request, status
 from sqlalchemy.orm import Session
 from sqlalchemy.orm import joinedload
-from sqlalchemy import select, update, and_, or_, func
+from sqlalchemy import select, insert, update, and_, or_, func
 from app.core.database import get_db
 from app.api.auth import get_current_admin
 from app.models.models import User, AuditLog
-from app.schemas.schemas import UserResponse, UserCreate, UserUpdate
+from app.schemas.schemas import JobResponse, UserResponse, UserCreate, UserUpdate
 from .utils import record_audit_log
+from app.core.audit_writer import audit_writer
+from app.core.live_counters import live_counters
+from app.core.meal_rollups import reassign_user_department
+from app.core.report_cache import report_cache
+from app.core.principal_cache import AdminPrincipal, invalidate_user, invalidate_users
+from app.core.delta_sync import delta_response, record_deletes
+from app.core.jobs import job_runner
+from app.core.employee_search import index_user, rebuild_employee_index, unindex_user, user_search_clause
 from typing import List, Optional
 from datetime import datetime
 
@@ -16,12 +26,22 @@ router = APIRouter(tags=["employees"])
 
 @router.get("", response_model=List[UserResponse])
 def list_employees(
+    request: Request,
     dept: Optional[str] = None,
     status: Optional[str] = None,
     search: Optional[str] = None,
+    since: Optional[str] = Query(None, description="델타 동기화 워터마크 (빈 값이면 전체). 응답 형식이 {rows, deleted, watermark, full} 로 바뀜"),
     db: Session = Depends(get_db),
     _admin=Depends(get_current_admin),
 ):
+    if since is not None:
+        # 필터 결과에서 빠진 행은 삭제로 알릴 수 없으므로 델타 동기화는 전체 목록만
+        if dept or status or search:
+            raise HTTPException(status_code=400, detail="since 는 dept·status·search 와 함께 쓸 수 없습니다.")
+        return delta_response(
+            request, db, "employees", User, UserResponse, since, User.emp_no != "admin",
+            options=(joinedload(User.department_ref),),
+        )
     query = select(User).options(joinedload(User.department_ref))
     filters = []
     if dept:
@@ -36,10 +56,7 @@ def list_employees(
     # Exclude system placeholder from employee list (식당관리는 cafeteria_admins 테이블로 분리)
     filters.append(User.emp_no != "admin")
     if search:
-        filters.append(or_(
-            User.name.icontains(search),
-            User.emp_no.icontains(search)
-        ))
+        filters.append(user_search_clause(db, search, User.id))
     
     if filters:
         query = query.where(and_(*filters))
@@ -65,6 +82,7 @@ def create_employee(
             existing_user.resigned_at = None
             existing_user.company_id = user_in.company_id
             existing_user.department_id = user_in.department_id
+            reassign_user_department(db, existing_user.id, user_in.department_id)
             existing_user.name = user_in.name
             existing_user.is_verified = False
             existing_user.password_hash = None
@@ -75,6 +93,9 @@ def create_employee(
                 reason="Re-registration (was resigned)"
             )
             db.commit()
+            invalidate_user(existing_user.id)
+            index_user(existing_user.id, user_in.name, user_in.emp_no)
+            report_cache.invalidate_all()  # 보고서의 사원명·부서
             result = db.execute(
                 select(User).where(User.id == existing_user.id).options(joinedload(User.department_ref))
             )
@@ -92,10 +113,12 @@ def create_employee(
         reason="Manual registration"
     )
 
+    new_user_id = new_user.id
     db.commit()
+    index_user(new_user_id, user_in.name, user_in.emp_no)
     # Refresh with relationship
     result = db.execute(
-        select(User).where(User.id == new_user.id).options(joinedload(User.department_ref))
+        select(User).where(User.id == new_user_id).options(joinedload(User.department_ref))
     )
     return result.scalar_one()
 
@@ -124,6 +147,8 @@ def update_employee(
 
     for key, value in update_data.items():
         setattr(user, key, value)
+    if "department_id" in update_data:
+        reassign_user_department(db, user.id, user.department_id)
     
     record_audit_log(
         db, operator_id, "UPDATE", "employees", user.id,
@@ -132,7 +157,13 @@ def update_employee(
         reason="Admin update"
     )
     
+    search_keys = (user.name, user.emp_no)
     db.commit()
+    invalidate_user(user.id)
+    if {"emp_no", "name"} & set(update_data):
+        index_user(user_id, *search_keys)
+    if {"emp_no", "name", "department_id"} & set(update_data):
+        report_cache.invalidate_all()  # 보고서의 사번·이름·부서
     # Refresh with relationship
     result = db.execute(
         select(User).where(User.id == user.id).options(joinedload(User.department_ref))
@@ -159,8 +190,14 @@ def delete_employee_soft(
             before_value={"emp_no": user.emp_no, "name": user.name, "status": user.status},
             reason="Admin permanent delete"
         )
+        record_deletes(db, "employees", [user.id])
         db.delete(user)
         db.commit()
+        invalidate_user(user_id)
+        audit_writer.invalidate_operator(user_id)
+        unindex_user(user_id)
+        live_counters.invalidate()  # 해당 사원 식수 기록 연쇄 삭제
+        report_cache.invalidate_all()
         return {"message": "Employee permanently deleted", "deleted": True}
     else:
         # Soft delete: mark as RESIGNED (default)
@@ -178,6 +215,7 @@ def delete_employee_soft(
         )
 
         db.commit()
+        invalidate_user(user.id)
         return {"message": "Employee marked as resigned"}
 
 @router.post("/{user_id}/reset-device")
@@ -203,21 +241,101 @@ def reset_device_auth(
     )
     
     db.commit()
+    invalidate_user(user.id)
     return {"message": "기기 인증 상태가 초기화되었습니다."}
+
+
+# 엑셀 일괄 등록: 사번 조회·INSERT·재등록 UPDATE 를 이 건수씩 묶어 실행하고 묶음마다 커밋
+_IMPORT_BATCH_SIZE = 1000
+# 응답에 담는 행별 오류 최대 건수 (error_count 는 전체)
+_IMPORT_MAX_ERRORS = 200
+# 숫자 사번이 실수로 읽혀 붙은 소수부 ("1001.0" → "1001"). 예전 가져오기(dtype 미지정)로 DB 에 남은 값도 같은 규칙으로 맞춤
+_FLOAT_EMP_NO = r"^(\d+)\.0+$"
+
+
+def _normalize_emp_no(emp_no: str) -> str:
+    """사번 비교용 정규화: 앞뒤 공백 제거, 숫자 사번의 ".0" 소수부 제거 (앞자리 0 은 유지)."""
+    return re.sub(_FLOAT_EMP_NO, r"\1", emp_no.strip())
+
+
+def _import_in_batches(db: Session, rows: list, apply, errors: list, on_batch=None) -> list:
+    """rows [(엑셀 행, 사번, 값 dict)] 를 _IMPORT_BATCH_SIZE 건씩 apply(db, [값 dict...]) 후 커밋.
+    묶음이 실패하면 그 묶음만 행별로 다시 적용해 실패한 행을 errors 에 기록. 반영된 rows 반환.
+    on_batch(처리한 행 수) 는 묶음마다 호출 (진행률)."""
+    done = []
+    for i in range(0, len(rows), _IMPORT_BATCH_SIZE):
+        if on_batch is not None and i:
+            on_batch(i)
+        batch = rows[i:i + _IMPORT_BATCH_SIZE]
+        try:
+            apply(db, [values for _, _, values in batch])
+            db.commit()
+            done.extend(batch)
+            continue
+        except Exception:
+            db.rollback()
+        for row in batch:
+            try:
+                apply(db, [row[2]])
+                db.commit()
+                done.append(row)
+            except Exception as e:
+                db.rollback()
+                errors.append({"row": row[0], "emp_no": row[1], "reason": f"저장 실패: {e.__class__.__name__}"})
+    return done
+
+
+def _insert_users(db: Session, batch: list) -> None:
+    db.execute(insert(User), batch)
+
+
+def _reregister_users(db: Session, batch: list) -> None:
+    db.execute(update(User), batch)  # 기본키별 일괄 UPDATE (executemany)
+    for values in batch:
+        reassign_user_department(db, values["id"], values["department_id"])
+
+
 @router.post("/import")
 def import_employees_excel(
-    file_content: bytes,
     company_id: int,
+    file_content: bytes = Body(..., media_type="application/octet-stream"),
     operator_id: int = 1,
     db: Session = Depends(get_db),
     _admin=Depends(get_current_admin),
 ):
+    """사원 엑셀(사번·성명·부서명) 일괄 등록 (요청 안에서 실행). 큰 파일은 POST /import/jobs 사용."""
+    return _import_employees(db, file_content, company_id)
+
+
+@router.post("/import/jobs", response_model=JobResponse, status_code=status.HTTP_202_ACCEPTED)
+def import_employees_excel_job(
+    company_id: int,
+    file_content: bytes = Body(..., media_type="application/octet-stream"),
+    db: Session = Depends(get_db),
+    admin: AdminPrincipal = Depends(get_current_admin),
+):
+    """사원 엑셀 일괄 등록을 백그라운드 작업으로 등록. 결과(JSON)는 /import 응답과 같음, GET /jobs/{id} 로 조회."""
+    return job_runner.submit(
+        db, "employee_import", _employee_import_job, created_by=admin.id,
+        file_content=file_content, company_id=company_id,
+    )
+
+
+def _employee_import_job(ctx, file_content: bytes, company_id: int) -> dict:
+    return _import_employees(ctx.db, file_content, company_id, progress=ctx.progress)
+
+
+def _import_employees(db: Session, file_content: bytes, company_id: int, progress=None) -> dict:
+    """사원 엑셀(사번·성명·부서명) 일괄 등록.
+    파일 안 정리·중복 제거는 pandas 로 한 번에, DB 는 파일에 있는 사번만 조회하고
+    신규 부서는 다중 행 INSERT 1회, 신규 사원은 INSERT·퇴사자 재등록은 UPDATE 를 묶음(executemany)으로 실행.
+    잘못된 행·저장 실패 행은 errors 로 돌려주고 나머지는 계속 반영. progress(처리 행, 전체 행, 메시지) 선택."""
     import pandas as pd
     from io import BytesIO
     from app.models.models import Department
     
     try:
-        df = pd.read_excel(BytesIO(file_content))
+        df = pd.read_excel(BytesIO(file_content), dtype=str)
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"엑셀 파일을 읽을 수 없습니다: {str(e)}")
     
@@ -226,74 +344,112 @@ def import_employees_excel(
     for col in required_cols:
         if col not in df.columns:
             raise HTTPException(status_code=400, detail=f"필수 컬럼이 누락되었습니다: {col}")
-    
-    # 1. Get all existing departments for this company
-    result = db.execute(select(Department).where(Department.company_id == company_id))
-    existing_depts = {d.name: d.id for d in result.scalars().all()}
-    
-    # 2. Get existing users by emp_no for skip/re-register
-    result = db.execute(select(User))
-    all_users = result.scalars().all()
-    users_by_emp_no = {u.emp_no: u for u in all_users}
-
-    success_count = 0
-    skip_count = 0
-    reregister_count = 0
-    new_depts_count = 0
-
-    for _, row in df.iterrows():
-        if pd.isna(row.get("사번")) or pd.isna(row.get("성명")) or pd.isna(row.get("부서명")):
-            continue
-        emp_no = str(row["사번"]).strip()
-        name = str(row["성명"]).strip()
-        dept_name = str(row["부서명"]).strip()
-        if not emp_no or not name or not dept_name or emp_no.lower() == "nan":
-            continue
 
-        # 3. Handle department (for both new and re-register)
-        if dept_name not in existing_depts:
-            new_dept = Department(company_id=company_id, code=dept_name, name=dept_name)
-            db.add(new_dept)
-            db.flush()
-            existing_depts[dept_name] = new_dept.id
-            new_depts_count += 1
-        dept_id = existing_depts[dept_name]
+    # 1. 파일 정리: 앞뒤 공백 제거, 빈 행 제외, 필수 값 누락·길이 초과 행은 오류, 파일 안 중복 사번은 첫 행만
+    frame = df[required_cols].copy()
+    frame.columns = ["emp_no", "name", "dept_name"]
+    frame["row"] = frame.index + 2  # 엑셀 행 번호 (1행 머리글)
+    for col in ("emp_no", "name", "dept_name"):
+        frame[col] = frame[col].str.strip()
+    frame["emp_no"] = frame["emp_no"].str.replace(_FLOAT_EMP_NO, r"\1", regex=True)
+    blank = frame[["emp_no", "name", "dept_name"]].isna() | frame[["emp_no", "name", "dept_name"]].eq("")
+    frame, blank = frame[~blank.all(axis=1)], blank[~blank.all(axis=1)]
+    missing = blank.any(axis=1)
+    too_long = ~missing & (
+        (frame["emp_no"].str.len() > 50) | (frame["name"].str.len() > 100) | (frame["dept_name"].str.len() > 50)
+    )
+    errors = [
+        {"row": int(r), "emp_no": e if isinstance(e, str) else "", "reason": reason}
+        for mask, reason in ((missing, "필수 값(사번·성명·부서명) 누락"), (too_long, "값이 너무 김 (사번·부서명 50자, 성명 100자)"))
+        for r, e in zip(frame.loc[mask, "row"], frame.loc[mask, "emp_no"])
+    ]
+    frame = frame[~(missing | too_long)]
+    duplicated = frame["emp_no"].duplicated(keep="first")
+    skip_count = int(duplicated.sum())
+    frame = frame[~duplicated]
 
+    # 2. 부서: 이 회사 기존 부서 + 없는 부서명은 다중 행 INSERT 1회
+    existing_depts = dict(
+        db.execute(select(Department.name, Department.id).where(Department.company_id == company_id)).all()
+    )
+    new_dept_names = [n for n in frame["dept_name"].unique().tolist() if n not in existing_depts]
+    if new_dept_names:
+        db.execute(
+            insert(Department),
+            [{"company_id": company_id, "code": n, "name": n} for n in new_dept_names],
+        )
+        existing_depts.update(db.execute(
+            select(Department.name, Department.id).where(
+                and_(Department.company_id == company_id, Department.name.in_(new_dept_names))
+            )
+        ).all())
+        db.commit()
+    new_depts_count = len(new_dept_names)
+
+    # 3. 파일에 있는 사번만 조회 (회사 구분 없이 사번 기준, 기존과 동일).
+    #    DB 쪽도 같은 규칙으로 정규화해 비교: 숫자 사번은 예전 형식("1001.0")도 함께 조회, 둘 다 있으면 그대로 일치하는 행 우선
+    emp_nos = frame["emp_no"].tolist()
+    users_by_emp_no = {}
+    for i in range(0, len(emp_nos), _IMPORT_BATCH_SIZE):
+        chunk = emp_nos[i:i + _IMPORT_BATCH_SIZE]
+        candidates = chunk + [f"{e}.0" for e in chunk if e.isdigit()]
+        for user_id, emp_no, user_status in db.execute(
+            select(User.id, User.emp_no, User.status).where(User.emp_no.in_(candidates))
+        ):
+            key = _normalize_emp_no(emp_no)
+            if key == emp_no or key not in users_by_emp_no:
+                users_by_emp_no[key] = (user_id, user_status)
+    db.rollback()  # 조회만 한 읽기 트랜잭션 종료
+
+    new_rows, reregister_rows = [], []
+    for row_no, emp_no, name, dept_name in zip(frame["row"], frame["emp_no"], frame["name"], frame["dept_name"]):
+        dept_id = existing_depts[dept_name]
         existing_user = users_by_emp_no.get(emp_no)
-        if existing_user:
-            if existing_user.status == "RESIGNED":
-                existing_user.status = "ACTIVE"
-                existing_user.resigned_at = None
-                existing_user.company_id = company_id
-                existing_user.department_id = dept_id
-                existing_user.name = name
-                existing_user.is_verified = False
-                existing_user.password_hash = None
-                reregister_count += 1
-                success_count += 1
-            else:
-                skip_count += 1
-            continue
+        if existing_user is None:
+            new_rows.append((int(row_no), emp_no, {
+                "emp_no": emp_no, "name": name, "department_id": dept_id, "company_id": company_id,
+                "status": "ACTIVE", "is_verified": False,
+            }))
+        elif existing_user[1] == "RESIGNED":
+            reregister_rows.append((int(row_no), emp_no, {
+                "id": existing_user[0], "status": "ACTIVE", "resigned_at": None, "company_id": company_id,
+                "department_id": dept_id, "name": name, "is_verified": False, "password_hash": None,
+            }))
+        else:
+            skip_count += 1
 
-        # 4. Create new User
-        new_user = User(
-            emp_no=emp_no,
-            name=name,
-            department_id=dept_id,
-            company_id=company_id,
-            status="ACTIVE",
-            is_verified=False
-        )
-        db.add(new_user)
-        users_by_emp_no[emp_no] = new_user
-        success_count += 1
+    # 4. 묶음 저장 (묶음마다 커밋, 실패한 묶음만 행별 재시도)
+    total = len(new_rows) + len(reregister_rows)
 
-    db.commit()
+    def batch_progress(offset: int):
+        if progress is None:
+            return None
+        return lambda n: progress(offset + n, total, "사원 저장 중")
+
+    created = _import_in_batches(db, new_rows, _insert_users, errors, batch_progress(0))
+    reregistered = _import_in_batches(db, reregister_rows, _reregister_users, errors, batch_progress(len(new_rows)))
+    if progress is not None:
+        progress(total, total, "완료")
+    reregistered_ids = [values["id"] for _, _, values in reregistered]
+    reregister_count = len(reregistered)
+    success_count = len(created) + reregister_count
+
+    invalidate_users(reregistered_ids)
+    if success_count:
+        rebuild_employee_index(db)  # 신규·재등록 사원 일괄 반영
+    if reregistered_ids:
+        report_cache.invalidate_all()
 
+    errors.sort(key=lambda e: e["row"])
+    message = f"성공: {success_count}건 (재등록: {reregister_count}건), 건너뜀(중복): {skip_count}건, 신규 부서: {new_depts_count}건"
+    if errors:
+        message += f", 오류: {len(errors)}건"
     return {
         "success_count": success_count,
         "skip_count": skip_count,
         "reregister_count": reregister_count,
         "new_depts_count": new_depts_count,
-        "message": f"성공: {success_count}건 (재등록: {reregister_count}건), 건너뜀(중복): {skip_count}건, 신규 부서: {new_depts_count}건"
+        "error_count": len(errors),
+        "errors": errors[:_IMPORT_MAX_ERRORS],
+        "message": message,
     }
@@ -1,13 +1,25 @@
 """구역별 프린터·경광등: 별도 테이블·CRUD. WebSocket device 페이로드는 두 행을 합쳐 생성."""
-from typing import List, Optional, Set
+import time
+from typing import Dict, List, Optional, Set
 
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 
-from app.api.admin.settings import auth_id_to_code_map, get_device_settings_from_db
+from app.api.admin.settings import (
+    auth_id_to_code_map,
+    coalesce_allowed_qr_entries,
+    get_device_settings_from_db,
+)
 from app.api.auth import get_current_admin
 from app.core.database import get_db
+from app.core.qr_routing import (
+    QrRoute,
+    QrRoutingTable,
+    freeze_payload,
+    normalize_scan,
+    rebuild_qr_routing_table,
+)
 from app.models.models import MealPrinterTerminal, MealQlightTerminal
 from app.schemas.schemas import (
     MealPrinterTerminalCreate,
@@ -102,9 +114,12 @@ def has_binding_for_auth_id(db: Session, auth_id: int) -> bool:
     return q is not None
 
 
-def build_merged_device_payload(db: Session, auth_id: int, matched_scan: str = "") -> dict:
-    p = db.scalars(select(MealPrinterTerminal).where(MealPrinterTerminal.qr_auth_id == auth_id)).first()
-    q = db.scalars(select(MealQlightTerminal).where(MealQlightTerminal.qr_auth_id == auth_id)).first()
+def _merged_device_payload(
+    p: Optional[MealPrinterTerminal],
+    q: Optional[MealQlightTerminal],
+    auth_id: int,
+    matched_scan: str = "",
+) -> dict:
     p_on = p is not None and bool(p.is_active)
     q_on = q is not None and bool(q.is_active)
     return {
@@ -122,6 +137,50 @@ def build_merged_device_payload(db: Session, auth_id: int, matched_scan: str = "
     }
 
 
+def build_merged_device_payload(db: Session, auth_id: int, matched_scan: str = "") -> dict:
+    p = db.scalars(select(MealPrinterTerminal).where(MealPrinterTerminal.qr_auth_id == auth_id)).first()
+    q = db.scalars(select(MealQlightTerminal).where(MealQlightTerminal.qr_auth_id == auth_id)).first()
+    return _merged_device_payload(p, q, auth_id, matched_scan)
+
+
+def build_qr_routing_table(db: Session) -> QrRoutingTable:
+    """스캔 문자열 → (QR ID, 장치 페이로드) 전체를 한 번에 계산. 조회 3회(설정·프린터·경광등)."""
+    device = get_device_settings_from_db(db)
+    printers = {int(p.qr_auth_id): p for p in db.scalars(select(MealPrinterTerminal)).all()}
+    qlights = {int(q.qr_auth_id): q for q in db.scalars(select(MealQlightTerminal)).all()}
+    routes: Dict[str, QrRoute] = {}
+
+    if printers or qlights:
+        # 프린터·경광등 등록이 하나라도 있으면: 인증 QR 목록과 일치 + 해당 QR ID에 활성 장비 행이 있어야 함
+        for eid, code in auth_id_to_code_map(device).items():
+            if code in routes:
+                continue
+            p, q = printers.get(eid), qlights.get(eid)
+            if not ((p is not None and p.is_active) or (q is not None and q.is_active)):
+                continue
+            routes[code] = QrRoute(
+                qr_auth_id=int(eid),
+                device=freeze_payload(_merged_device_payload(p, q, eid, matched_scan=code)),
+            )
+        return QrRoutingTable(requires_scan=True, routes=routes, built_at=time.monotonic())
+
+    # 레거시: 터미널 없음 — allowed_qr_entries 의 code 만 허용 (목록이 비어 있으면 검사 생략)
+    entries = coalesce_allowed_qr_entries(device)
+    for e in entries:
+        code = normalize_scan(e.get("code"))
+        if code and code not in routes:
+            routes[code] = QrRoute(
+                qr_auth_id=None,
+                device=freeze_payload(legacy_device_payload_from_settings(device, matched_scan=code)),
+            )
+    return QrRoutingTable(
+        requires_scan=len(entries) > 0,
+        routes=routes,
+        open_device=freeze_payload(legacy_device_payload_from_settings(device)),
+        built_at=time.monotonic(),
+    )
+
+
 # --- 프린터 CRUD
 @printer_router.get("", response_model=List[MealPrinterTerminalResponse])
 def list_printer_terminals(
@@ -151,6 +210,7 @@ def create_printer_terminal(
     db.add(row)
     db.commit()
     db.refresh(row)
+    rebuild_qr_routing_table(db)
     return row
 
 
@@ -194,6 +254,7 @@ def update_printer_terminal(
         setattr(row, k, v)
     db.commit()
     db.refresh(row)
+    rebuild_qr_routing_table(db)
     return row
 
 
@@ -208,6 +269,7 @@ def delete_printer_terminal(
         raise HTTPException(status_code=404, detail="프린터 등록을 찾을 수 없습니다.")
     db.delete(row)
     db.commit()
+    rebuild_qr_routing_table(db)
     return {"ok": True}
 
 
@@ -240,6 +302,7 @@ def create_qlight_terminal(
     db.add(row)
     db.commit()
     db.refresh(row)
+    rebuild_qr_routing_table(db)
     return row
 
 
@@ -283,6 +346,7 @@ def update_qlight_terminal(
         setattr(row, k, v)
     db.commit()
     db.refresh(row)
+    rebuild_qr_routing_table(db)
     return row
 
 
@@ -297,4 +361,5 @@ def delete_qlight_terminal(
         raise HTTPException(status_code=404, detail="경광등 등록을 찾을 수 없습니다.")
     db.delete(row)
     db.commit()
+    rebuild_qr_routing_table(db)
     return {"ok": True}
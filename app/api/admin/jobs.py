@@ -0,0 +1,44 @@
+"""백그라운드 작업 상태·결과 조회 (app.core.jobs). 작업 등록은 각 기능 라우트
+(POST /employees/import/jobs, POST /reports/excel/jobs, POST /raw-data/bulk-void) 에서 하고 job_id 를 받음."""
+import os
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import FileResponse
+from sqlalchemy.orm import Session
+
+from app.api.auth import get_current_admin
+from app.core.database import get_db
+from app.core.jobs import STATUS_SUCCEEDED, job_payload, job_runner
+from app.models.models import BackgroundJob
+from app.schemas.schemas import JobResponse
+
+router = APIRouter()
+
+
+def _get_job(db: Session, job_id: str) -> BackgroundJob:
+    job = db.get(BackgroundJob, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    job_runner.expire_stale(db, job)
+    return job
+
+
+@router.get("/{job_id}", response_model=JobResponse)
+def get_job(job_id: str, db: Session = Depends(get_db), _admin=Depends(get_current_admin)):
+    """작업 상태·진행률. 끝나면 result(JSON) 또는 has_file=True (결과 파일)."""
+    return job_payload(_get_job(db, job_id))
+
+
+@router.get("/{job_id}/result")
+def get_job_result(job_id: str, db: Session = Depends(get_db), _admin=Depends(get_current_admin)):
+    """성공한 작업의 결과 파일 (보고서 엑셀 등)."""
+    job = _get_job(db, job_id)
+    if job.status != STATUS_SUCCEEDED:
+        raise HTTPException(status_code=409, detail=f"작업이 완료되지 않았습니다 ({job.status}).")
+    if not job.result_path or not os.path.exists(job.result_path):
+        raise HTTPException(status_code=404, detail="결과 파일이 없습니다 (보관 기간이 지났거나 다른 서버에서 실행됨).")
+    return FileResponse(
+        job.result_path,
+        media_type=job.result_media_type or "application/octet-stream",
+        filename=job.result_filename or os.path.basename(job.result_path),
+    )
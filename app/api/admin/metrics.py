@@ -0,0 +1,12 @@
+"""프로세스 로컬 운영 메트릭 조회 (캐시 적중률 등). 워커별 값이므로 다중 워커 시 워커마다 다름."""
+from fastapi import APIRouter, Depends
+
+from app.api.auth import get_current_admin
+from app.core.metrics import collect_metrics
+
+router = APIRouter()
+
+
+@router.get("/metrics")
+def get_metrics(_admin=Depends(get_current_admin)):
+    return collect_metrics()
@@ -1,17 +1,29 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.orm import Session
 from sqlalchemy import select, update
 from app.core.database import get_db
 from app.api.auth import get_current_admin
+from app.core.live_counters import live_counters
+from app.core.report_cache import report_cache
+from app.core.meal_rollups import delete_policy_rollups
+from app.core.meal_policy_resolver import rebuild_policy_resolver
+from app.core.delta_sync import delta_response, record_deletes
 from app.models.models import MealPolicy, AuditLog, Company
 from app.schemas.schemas import MealPolicyResponse, MealPolicyBase
 from .utils import record_audit_log
-from typing import List
+from typing import List, Optional
 
 router = APIRouter(tags=["policies"])
 
 @router.get("", response_model=List[MealPolicyResponse])
-def list_policies(db: Session = Depends(get_db), _admin=Depends(get_current_admin)):
+def list_policies(
+    request: Request,
+    since: Optional[str] = Query(None, description="델타 동기화 워터마크 (빈 값이면 전체). 응답 형식이 {rows, deleted, watermark, full} 로 바뀜"),
+    db: Session = Depends(get_db),
+    _admin=Depends(get_current_admin),
+):
+    if since is not None:
+        return delta_response(request, db, "meal_policies", MealPolicy, MealPolicyResponse, since)
     result = db.execute(select(MealPolicy))
     return result.scalars().all()
 
@@ -47,6 +59,7 @@ def create_policy(
     
     db.commit()
     db.refresh(new_policy)
+    rebuild_policy_resolver(db)
     return new_policy
 
 @router.put("/{policy_id}", response_model=MealPolicyResponse)
@@ -82,6 +95,7 @@ def update_policy(
     
     db.commit()
     db.refresh(policy)
+    rebuild_policy_resolver(db)
     return policy
 
 @router.delete("/{policy_id}")
@@ -103,7 +117,12 @@ def delete_policy(
         reason="Policy deletion"
     )
     
+    delete_policy_rollups(db, policy.id)
+    record_deletes(db, "meal_policies", [policy.id])
     db.delete(policy)
     db.commit()
+    rebuild_policy_resolver(db)
+    live_counters.invalidate()  # 해당 정책 식수 기록 연쇄 삭제
+    report_cache.invalidate_all()
     
     return {"ok": True}
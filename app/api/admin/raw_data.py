@@ -1,47 +1,51 @@
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
+import base64
+import json
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status, BackgroundTasks
 from sqlalchemy.orm import Session
 from sqlalchemy import select, and_, or_, func
 from sqlalchemy.orm import selectinload
 from app.core.database import get_db
 from app.api.auth import get_current_admin
-from app.models.models import MealLog, User, MealPolicy
-from app.schemas.schemas import MealLogAdminDetail, MealLogResponse, MealLogCreate, MealLogUpdate
-from .utils import record_audit_log
+from app.models.models import Department, MealLog, User, MealPolicy
+from app.schemas.schemas import (
+    JobResponse, MealLogAdminDetail, MealLogBulkVoid, MealLogPage, MealLogResponse, MealLogCreate, MealLogUpdate,
+)
+from .utils import record_audit_log, record_audit_logs
 from typing import List, Optional
 from datetime import datetime, date
 from pydantic import ValidationError
 
-from app.core.time_utils import utc_now, parse_created_at_kst_to_utc, kst_date_range_to_naive, kst_today, KST
+from app.core.meal_policy_resolver import get_policy_resolver
+from app.core.employee_search import user_search_clause
+from app.core.live_counters import live_counters
+from app.core.meal_rollups import add_log_delta, apply_log_delta, apply_rollup_deltas, department_ids_for, log_values
+from app.core.jobs import job_runner
+from app.core.principal_cache import AdminPrincipal
+from app.core.report_cache import report_cache
+from app.core.time_utils import utc_now, utc_to_kst_str, parse_created_at_kst_to_utc, kst_date_range_to_naive, kst_today, KST
 
 router = APIRouter(tags=["raw-data"])
 
-@router.get("", response_model=List[MealLogAdminDetail])
-def list_raw_data(
-    start_date: Optional[date] = None,
-    end_date: Optional[date] = None,
-    search: Optional[str] = None,
-    path: Optional[str] = None,
-    is_void: Optional[bool] = None,
-    db: Session = Depends(get_db),
-    _admin=Depends(get_current_admin),
-):
-    # selectinload: 비동기 세션에서 joinedload+수동 outerjoin 조합은 관계 미로딩 → lazy 접근 시 MissingGreenlet(500) 유발 가능
-    query = select(MealLog).options(
-        selectinload(MealLog.user).selectinload(User.department_ref),
-        selectinload(MealLog.policy),
-        # void_operator도 User → department_name 프로퍼티가 department_ref 접근 → 미로딩 시 MissingGreenlet(500)
-        selectinload(MealLog.void_operator).selectinload(User.department_ref),
-    )
+# view=compact 응답 열 순서 (rows 는 이 순서의 배열)
+COMPACT_COLUMNS = (
+    "id", "created_at", "user_id", "emp_no", "name", "department_id", "department_name",
+    "meal_type", "guest_count", "final_price", "is_void",
+)
 
+
+def _raw_data_filters(
+    db: Session,
+    start_date: Optional[date],
+    end_date: Optional[date],
+    search: Optional[str],
+    path: Optional[str],
+    is_void: Optional[bool],
+) -> list:
+    """목록·페이지·compact·내보내기 공통 조건. search 는 사원 검색 색인으로 user_id IN (...) (User 조인 불필요)."""
     filters = []
     if search:
-        query = query.join(User, MealLog.user_id == User.id)
-        filters.append(
-            or_(
-                User.name.icontains(search),
-                User.emp_no.icontains(search),
-            )
-        )
+        filters.append(user_search_clause(db, search, MealLog.user_id))
     if start_date and end_date:
         # 사용자 선택 날짜는 KST 기준, created_at(KST naive) 필터
         start_naive, end_naive = kst_date_range_to_naive(start_date, end_date)
@@ -60,13 +64,106 @@ def list_raw_data(
         filters.append(MealLog.path == path)
     if is_void is not None:
         filters.append(MealLog.is_void == is_void)
-        
+    return filters
+
+
+def _raw_data_query(
+    db: Session,
+    start_date: Optional[date],
+    end_date: Optional[date],
+    search: Optional[str],
+    path: Optional[str],
+    is_void: Optional[bool],
+):
+    """목록·페이지 공통 조회 (관계 selectinload + 필터). 정렬은 호출한 쪽에서."""
+    # selectinload: 비동기 세션에서 joinedload+수동 outerjoin 조합은 관계 미로딩 → lazy 접근 시 MissingGreenlet(500) 유발 가능
+    query = select(MealLog).options(
+        selectinload(MealLog.user).selectinload(User.department_ref),
+        selectinload(MealLog.policy),
+        # void_operator도 User → department_name 프로퍼티가 department_ref 접근 → 미로딩 시 MissingGreenlet(500)
+        selectinload(MealLog.void_operator).selectinload(User.department_ref),
+    )
+    filters = _raw_data_filters(db, start_date, end_date, search, path, is_void)
     if filters:
         query = query.where(and_(*filters))
-        
-    result = db.execute(query.order_by(MealLog.created_at.desc()))
-    logs = result.scalars().all()
+    return query
+
+
+def _compact_query(
+    db: Session,
+    start_date: Optional[date],
+    end_date: Optional[date],
+    search: Optional[str],
+    path: Optional[str],
+    is_void: Optional[bool],
+    *extra_columns,
+):
+    """필요한 열만 Core select + JOIN (ORM 객체·관계 로딩 없음). 열 순서는 COMPACT_COLUMNS (+ extra_columns)."""
+    query = (
+        select(
+            MealLog.id,
+            MealLog.created_at,
+            MealLog.user_id,
+            User.emp_no,
+            User.name,
+            User.department_id,
+            func.coalesce(Department.name, "N/A"),
+            MealPolicy.meal_type,
+            MealLog.guest_count,
+            MealLog.final_price,
+            MealLog.is_void,
+            *extra_columns,
+        )
+        .select_from(MealLog)
+        .outerjoin(User, MealLog.user_id == User.id)
+        .outerjoin(Department, User.department_id == Department.id)
+        .outerjoin(MealPolicy, MealLog.policy_id == MealPolicy.id)
+    )
+    filters = _raw_data_filters(db, start_date, end_date, search, path, is_void)
+    if filters:
+        query = query.where(and_(*filters))
+    return query
+
 
+def _compact_response(rows, next_cursor: Optional[str] = None, paged: bool = False) -> Response:
+    """행을 배열 그대로 JSON 으로. {"columns": [...], "rows": [[...], ...]} (+ 페이지면 next_cursor)."""
+    body = {
+        "columns": COMPACT_COLUMNS,
+        "rows": [
+            (log_id, utc_to_kst_str(created_at), user_id, emp_no, name, dept_id, dept_name,
+             meal_type, guest_count or 0, final_price or 0, bool(voided))
+            for log_id, created_at, user_id, emp_no, name, dept_id, dept_name, meal_type, guest_count, final_price, voided
+            in rows
+        ],
+    }
+    if paged:
+        body["next_cursor"] = next_cursor
+    return Response(
+        content=json.dumps(body, ensure_ascii=False, separators=(",", ":")),
+        media_type="application/json",
+    )
+
+
+def _apply_keyset(query, cursor: Optional[str], order: str):
+    """(created_at, id) 키셋 조건 + 정렬."""
+    if cursor:
+        after_created_at, after_id = _decode_cursor(cursor)
+        if order == "asc":
+            query = query.where(and_(
+                MealLog.created_at >= after_created_at,
+                or_(MealLog.created_at > after_created_at, MealLog.id > after_id),
+            ))
+        else:
+            query = query.where(and_(
+                MealLog.created_at <= after_created_at,
+                or_(MealLog.created_at < after_created_at, MealLog.id < after_id),
+            ))
+    if order == "asc":
+        return query.order_by(MealLog.created_at.asc(), MealLog.id.asc())
+    return query.order_by(MealLog.created_at.desc(), MealLog.id.desc())
+
+
+def _serialize_logs(logs) -> List[MealLogAdminDetail]:
     # 직렬화 실패 시 해당 로그만 제외하고 응답 (보고서 등에서 500 방지)
     out: List[MealLogAdminDetail] = []
     for log in logs:
@@ -87,11 +184,150 @@ def list_raw_data(
             continue
     return out
 
+
+def _encode_cursor(created_at: datetime, log_id: int) -> str:
+    raw = json.dumps([created_at.isoformat(), log_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(cursor: str):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, log_id = json.loads(raw)
+        return datetime.fromisoformat(created_at), int(log_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="잘못된 cursor 입니다.")
+
+
+@router.get("", response_model=List[MealLogAdminDetail])
+def list_raw_data(
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    search: Optional[str] = None,
+    path: Optional[str] = None,
+    is_void: Optional[bool] = None,
+    view: str = Query("full", pattern="^(full|compact)$"),
+    db: Session = Depends(get_db),
+    _admin=Depends(get_current_admin),
+):
+    """조건에 맞는 기록 전체 (기존 클라이언트 호환). 긴 기간은 /raw-data/page 사용.
+    view=compact: 필요한 열만 {"columns", "rows"} 배열로 (대시보드·보고서용)."""
+    if view == "compact":
+        query = _compact_query(db, start_date, end_date, search, path, is_void)
+        return _compact_response(db.execute(query.order_by(MealLog.created_at.desc(), MealLog.id.desc())).all())
+    query = _raw_data_query(db, start_date, end_date, search, path, is_void)
+    result = db.execute(query.order_by(MealLog.created_at.desc(), MealLog.id.desc()))
+    return _serialize_logs(result.scalars().all())
+
+
+@router.get("/page", response_model=MealLogPage)
+def list_raw_data_page(
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    search: Optional[str] = None,
+    path: Optional[str] = None,
+    is_void: Optional[bool] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(200, ge=1, le=1000),
+    order: str = Query("desc", pattern="^(asc|desc)$"),
+    view: str = Query("full", pattern="^(full|compact)$"),
+    db: Session = Depends(get_db),
+    _admin=Depends(get_current_admin),
+):
+    """(created_at, id) 키셋 페이지. order=desc(기본, 최신 순) 또는 asc(인증 순).
+    다음 페이지는 응답의 next_cursor 를 cursor 로 넘김 (같은 필터·order). 마지막 페이지면 next_cursor=null.
+    ix_meal_logs_created_id 인덱스 순서로 읽어 OFFSET 없이 페이지마다 limit 건만 조회.
+    view=compact: items 대신 {"columns", "rows", "next_cursor"}."""
+    if view == "compact":
+        query = _apply_keyset(_compact_query(db, start_date, end_date, search, path, is_void), cursor, order)
+        rows = db.execute(query.limit(limit + 1)).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        next_cursor = _encode_cursor(rows[-1][1], rows[-1][0]) if has_more and rows else None
+        return _compact_response(rows, next_cursor, paged=True)
+    query = _apply_keyset(_raw_data_query(db, start_date, end_date, search, path, is_void), cursor, order)
+    logs = db.execute(query.limit(limit + 1)).scalars().all()
+    has_more = len(logs) > limit
+    logs = logs[:limit]
+    return MealLogPage(
+        items=_serialize_logs(logs),
+        next_cursor=_encode_cursor(logs[-1].created_at, logs[-1].id) if has_more and logs else None,
+    )
+
+# /raw-data/export 열: compact 열 + 감사 추출용 경로·상태·취소 사유·취소 시각
+EXPORT_COLUMNS = COMPACT_COLUMNS + ("path", "status", "void_reason", "voided_at")
+_EXPORT_FETCH_ROWS = 1000
+
+
+def _export_lines(query, fmt: str):
+    """서버 측 커서(stream_results)로 _EXPORT_FETCH_ROWS 건씩 읽어 NDJSON/CSV 줄 단위로 내보냄.
+    요청 세션과 별도 연결을 응답이 끝날 때까지 사용하고 닫음 (범위와 무관하게 메모리 일정)."""
+    import csv
+    import io
+
+    from app.core.database import engine
+
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    if fmt == "csv":
+        writer.writerow(EXPORT_COLUMNS)
+        yield "\ufeff" + buf.getvalue()  # 엑셀에서 한글이 깨지지 않도록 BOM
+    with engine.connect() as conn:
+        result = conn.execution_options(stream_results=True, yield_per=_EXPORT_FETCH_ROWS).execute(query)
+        for partition in result.partitions():
+            out = []
+            for (log_id, created_at, user_id, emp_no, name, dept_id, dept_name, meal_type, guest_count,
+                 final_price, voided, log_path, log_status, void_reason, voided_at) in partition:
+                values = (
+                    log_id, utc_to_kst_str(created_at), user_id, emp_no, name, dept_id, dept_name, meal_type,
+                    guest_count or 0, final_price or 0, bool(voided), log_path, log_status, void_reason,
+                    utc_to_kst_str(voided_at),
+                )
+                if fmt == "csv":
+                    buf.seek(0)
+                    buf.truncate()
+                    writer.writerow(values)
+                    out.append(buf.getvalue())
+                else:
+                    out.append(json.dumps(dict(zip(EXPORT_COLUMNS, values)), ensure_ascii=False) + "\n")
+            yield "".join(out)
+
+
+@router.get("/export")
+def export_raw_data(
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    search: Optional[str] = None,
+    path: Optional[str] = None,
+    is_void: Optional[bool] = None,
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    db: Session = Depends(get_db),
+    _admin=Depends(get_current_admin),
+):
+    """조건(list_raw_data 와 동일)에 맞는 기록을 인증 순으로 NDJSON(한 줄 한 건) 또는 CSV 로 스트리밍."""
+    from fastapi.responses import StreamingResponse
+
+    query = _compact_query(
+        db, start_date, end_date, search, path, is_void,
+        MealLog.path, MealLog.status, MealLog.void_reason, MealLog.voided_at,
+    ).order_by(MealLog.created_at.asc(), MealLog.id.asc())
+    period = "_".join(d.strftime("%Y%m%d") for d in (start_date, end_date) if d) or "all"
+    if format == "csv":
+        media_type, filename = "text/csv; charset=utf-8", f"RawData_{period}.csv"
+    else:
+        media_type, filename = "application/x-ndjson", f"RawData_{period}.ndjson"
+    return StreamingResponse(
+        _export_lines(query, format),
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename={filename}"},
+    )
+
+
 @router.post("/manual", response_model=MealLogResponse)
 def create_manual_meal(
     user_id: int,
-    policy_id: int,
     background_tasks: BackgroundTasks,
+    policy_id: Optional[int] = None,
     created_at: Optional[datetime] = None,
     guest_count: int = 0,
     reason: str = "Manual Entry",
@@ -99,17 +335,27 @@ def create_manual_meal(
     db: Session = Depends(get_db),
     _admin=Depends(get_current_admin),
 ):
-    # Fetch policy to get price snapshot
-    policy_result = db.execute(select(MealPolicy).where(MealPolicy.id == policy_id))
-    policy = policy_result.scalar_one_or_none()
+    created_at_naive_kst = (parse_created_at_kst_to_utc(created_at) if created_at is not None else utc_now()).astimezone(KST).replace(tzinfo=None)
+
+    # Fetch policy to get price snapshot (policy_id 생략 시 created_at 시각으로 정책 판정)
+    resolver = get_policy_resolver(db)
+    if policy_id is None:
+        policy = resolver.resolve(created_at_naive_kst)
+        if policy is None:
+            raise HTTPException(status_code=400, detail="해당 시각에 맞는 식사 정책이 없습니다. 식사 종류를 선택해 주세요.")
+    else:
+        policy = resolver.get(policy_id)
+        if policy is None:
+            policy_result = db.execute(select(MealPolicy).where(MealPolicy.id == policy_id))
+            policy = policy_result.scalar_one_or_none()
     if not policy:
         raise HTTPException(status_code=404, detail="Meal Policy not found")
+    policy_id = policy.id
 
     user_result = db.execute(select(User).where(User.id == user_id))
     if user_result.scalar_one_or_none() is None:
         raise HTTPException(status_code=404, detail="User not found")
         
-    created_at_naive_kst = (parse_created_at_kst_to_utc(created_at) if created_at is not None else utc_now()).astimezone(KST).replace(tzinfo=None)
     new_log = MealLog(
         user_id=user_id,
         policy_id=policy_id,
@@ -121,6 +367,7 @@ def create_manual_meal(
     )
     db.add(new_log)
     db.flush()
+    apply_log_delta(db, None, log_values(new_log))
     
     record_audit_log(
         db, operator_id, "CREATE", "meal_logs", new_log.id,
@@ -135,10 +382,14 @@ def create_manual_meal(
     
     db.commit()
     db.refresh(new_log)
+    live_counters.apply(new_log.created_at, new_log.policy_id, 1, new_log.guest_count or 0)
+    report_cache.invalidate_dates([new_log.created_at])
     
     # 수동 등록은 DB만 저장. 프린터·경광등 없음. 대시보드 숫자 갱신용 이벤트만 송신.
-    from app.api.websocket import manager
-    background_tasks.add_task(manager.broadcast, {"type": "STATS_REFRESH", "data": {}})
+    from app.api.websocket import TOPIC_RAW_DATA, TOPIC_STATS, manager
+    background_tasks.add_task(
+        manager.broadcast, {"type": "STATS_REFRESH", "data": {}}, (TOPIC_STATS, TOPIC_RAW_DATA)
+    )
     
     return new_log
 
@@ -159,6 +410,7 @@ def void_meal_log(
     if log.is_void:
         raise HTTPException(status_code=400, detail="Log is already voided")
         
+    before_rollup = log_values(log)
     log.is_void = True
     log.void_reason = reason
     log.void_operator_id = operator_id
@@ -170,19 +422,99 @@ def void_meal_log(
         after_value={"is_void": True, "void_reason": reason},
         reason="Admin voiding"
     )
+    apply_log_delta(db, before_rollup, log_values(log))
     
     db.commit()
     db.refresh(log)
+    stats_delta = live_counters.apply(log.created_at, log.policy_id, -1, -(log.guest_count or 0))
+    report_cache.invalidate_dates([log.created_at])
     
-    # WebSocket Broadcast (실시간 갱신용)
-    from app.api.websocket import manager
+    # WebSocket Broadcast (실시간 갱신용, stats_delta: 대시보드 증감분)
+    from app.api.websocket import TOPIC_RAW_DATA, TOPIC_STATS, manager
     background_tasks.add_task(
         manager.broadcast,
-        {"type": "MEAL_LOG_VOIDED", "data": {"log_id": log.id}},
+        {"type": "MEAL_LOG_VOIDED", "data": {"log_id": log.id, "stats_delta": stats_delta}},
+        (TOPIC_STATS, TOPIC_RAW_DATA),
     )
     
     return log
 
+# 일괄 취소: 이 건수씩 취소·집계 반영 후 커밋
+_BULK_VOID_BATCH_SIZE = 500
+
+
+@router.post("/bulk-void", response_model=JobResponse, status_code=status.HTTP_202_ACCEPTED)
+def bulk_void_meal_logs(
+    body: MealLogBulkVoid,
+    operator_id: int = 1, # Placeholder
+    db: Session = Depends(get_db),
+    admin: AdminPrincipal = Depends(get_current_admin),
+):
+    """식수 기록 일괄 취소를 백그라운드 작업으로 등록. log_ids 또는 기간(+ search·path) 조건의 취소되지 않은 기록 대상.
+    진행은 JOB_PROGRESS, 결과 {"voided": 건수} 는 GET /jobs/{id}."""
+    if not (body.reason or "").strip():
+        raise HTTPException(status_code=400, detail="취소 사유를 입력하세요.")
+    if not body.log_ids and not (body.start_date or body.end_date):
+        raise HTTPException(status_code=400, detail="log_ids 또는 기간(start_date·end_date)을 지정하세요.")
+    return job_runner.submit(
+        db, "bulk_void", _bulk_void_job, created_by=admin.id,
+        request=body.model_dump(), operator_id=operator_id,
+    )
+
+
+def _bulk_void_job(ctx, request: dict, operator_id: int) -> dict:
+    """대상 id 를 먼저 모은 뒤 _BULK_VOID_BATCH_SIZE 건씩 취소 + 감사 로그 + 일별 집계 증감 → 커밋.
+    커밋마다 오늘 카운터·보고서 캐시 반영, 끝나면 STATS_REFRESH 발행."""
+    from app.api.websocket import TOPIC_RAW_DATA, TOPIC_STATS
+
+    db = ctx.db
+    req = MealLogBulkVoid(**request)
+    query = select(MealLog.id).where(MealLog.is_void == False)
+    if req.log_ids:
+        query = query.where(MealLog.id.in_(req.log_ids))
+    filters = _raw_data_filters(db, req.start_date, req.end_date, req.search, req.path, None)
+    if filters:
+        query = query.where(and_(*filters))
+    ids = db.scalars(query.order_by(MealLog.id)).all()
+    total = len(ids)
+    ctx.progress(0, total, "취소 중")
+    voided = 0
+    for i in range(0, total, _BULK_VOID_BATCH_SIZE):
+        logs = db.scalars(
+            select(MealLog).where(MealLog.id.in_(ids[i:i + _BULK_VOID_BATCH_SIZE]), MealLog.is_void == False)
+        ).all()
+        depts = department_ids_for(db, (log.user_id for log in logs))
+        deltas = {}
+        changed = []
+        now = utc_now()
+        for log in logs:
+            add_log_delta(deltas, log_values(log), depts.get(log.user_id), -1)
+            changed.append((log.created_at, log.policy_id, log.guest_count or 0))
+            log.is_void = True
+            log.void_reason = req.reason
+            log.void_operator_id = operator_id
+            log.voided_at = now
+        record_audit_logs(db, [
+            {
+                "operator_id": operator_id, "action": "VOID", "target_table": "meal_logs", "target_id": log.id,
+                "before_value": {"is_void": False},
+                "after_value": {"is_void": True, "void_reason": req.reason},
+                "reason": "Admin bulk voiding",
+            }
+            for log in logs
+        ])
+        apply_rollup_deltas(db, deltas)
+        db.commit()
+        for created_at, policy_id, guests in changed:
+            live_counters.apply(created_at, policy_id, -1, -guests)
+        report_cache.invalidate_dates([created_at for created_at, _, _ in changed])
+        voided += len(changed)
+        ctx.progress(min(i + _BULK_VOID_BATCH_SIZE, total), total, "취소 중")
+    if voided:
+        ctx.publish({"type": "STATS_REFRESH", "data": {}}, (TOPIC_STATS, TOPIC_RAW_DATA))
+    return {"voided": voided, "matched": total}
+
+
 @router.put("/{log_id}", response_model=MealLogResponse)
 def update_raw_data(
     log_id: int,
@@ -196,6 +528,8 @@ def update_raw_data(
     if not log:
         raise HTTPException(status_code=404, detail="Meal log not found")
         
+    before_counted = (log.created_at, log.policy_id, log.guest_count or 0) if not log.is_void else None
+    before_rollup = log_values(log)
     before_value = {
         "user_id": log.user_id,
         "policy_id": log.policy_id,
@@ -212,6 +546,7 @@ def update_raw_data(
             log.final_price = policy.base_price
     if update_data.created_at is not None:
         log.created_at = (parse_created_at_kst_to_utc(update_data.created_at) or utc_now()).astimezone(KST).replace(tzinfo=None)
+        log.meal_date = log.created_at.date()
     if update_data.guest_count is not None: log.guest_count = update_data.guest_count
     
     record_audit_log(
@@ -225,9 +560,15 @@ def update_raw_data(
         },
         reason=update_data.reason or "Admin update"
     )
+    apply_log_delta(db, before_rollup, log_values(log))
     
     db.commit()
     db.refresh(log)
+    if before_counted is not None:
+        old_created_at, old_policy_id, old_guests = before_counted
+        live_counters.apply(old_created_at, old_policy_id, -1, -old_guests)
+        live_counters.apply(log.created_at, log.policy_id, 1, log.guest_count or 0)
+    report_cache.invalidate_dates([before_rollup["created_at"], log.created_at])
     return log
 
 @router.delete("/{log_id}")
@@ -248,6 +589,12 @@ def delete_raw_data(
         reason="Admin physical delete"
     )
     
+    counted = (log.created_at, log.policy_id, log.guest_count or 0) if not log.is_void else None
+    created_at = log.created_at
+    apply_log_delta(db, log_values(log), None)
     db.delete(log)
     db.commit()
+    if counted is not None:
+        live_counters.apply(counted[0], counted[1], -1, -counted[2])
+    report_cache.invalidate_dates([created_at])
     return {"message": "Deleted successfully"}
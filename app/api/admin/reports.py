@@ -1,10 +1,15 @@
-from fastapi import APIRouter, Depends, Query
+import json
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from sqlalchemy.orm import Session
 from sqlalchemy import select, func, and_
 from app.core.database import get_db
 from app.api.auth import get_current_admin
-from app.models.models import MealLog, User, MealPolicy, Department
-from app.core.time_utils import kst_date_range_to_naive, utc_to_kst_str
+from app.models.models import MealDailyRollup, User, MealPolicy, Department
+from app.core.jobs import job_runner
+from app.core.principal_cache import AdminPrincipal
+from app.core.report_cache import cached_report
+from app.schemas.schemas import JobResponse
 from datetime import date, datetime, timedelta
 from typing import List, Optional
 
@@ -14,6 +19,11 @@ router = APIRouter(tags=["reports"])
 MEAL_TYPE_DISPLAY_ORDER = ("조식", "중식", "석식", "야식(심야)", "야식(새벽)")
 
 
+def _json_body(rows) -> bytes:
+    # JSONResponse 와 같은 직렬화
+    return json.dumps(rows, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
 @router.get("/daily")
 def get_daily_report(
     target_date: date,
@@ -21,18 +31,15 @@ def get_daily_report(
     _admin=Depends(get_current_admin),
 ):
     """일별 식사 집계."""
-    start_naive, end_naive = kst_date_range_to_naive(target_date, target_date)
+    R = MealDailyRollup
     query = select(
         MealPolicy.meal_type,
-        func.count(MealLog.id).label("employee_count"),
-        func.sum(MealLog.guest_count).label("guest_count")
-    ).join(MealLog, MealPolicy.id == MealLog.policy_id)\
-     .where(and_(
-        MealLog.is_void == False,
-        MealLog.created_at >= start_naive,
-        MealLog.created_at < end_naive,
-    ))\
-     .group_by(MealPolicy.meal_type)
+        func.sum(R.meal_count).label("employee_count"),
+        func.sum(R.guest_count).label("guest_count")
+    ).join(R, MealPolicy.id == R.policy_id)\
+     .where(R.meal_date == target_date)\
+     .group_by(MealPolicy.meal_type)\
+     .having(func.sum(R.meal_count) > 0)
 
     result = db.execute(query)
     rows = [dict(row._asdict()) for row in result.all()]
@@ -45,145 +52,227 @@ def get_daily_report(
 def get_monthly_report(
     year: int,
     month: int,
+    request: Request,
     db: Session = Depends(get_db),
     _admin=Depends(get_current_admin),
 ):
+    """월간 일자별 합계. 지난달 이전은 결과 캐시(ETag·304)."""
     start_date = date(year, month, 1)
     end_date = date(year, month + 1, 1) if month < 12 else date(year + 1, 1, 1)
     end_date_last = end_date - timedelta(days=1)  # 해당 월 마지막 날
-    start_naive, end_naive = kst_date_range_to_naive(start_date, end_date_last)
-
-    # created_at은 KST naive → 일자별 집계는 KST 날짜 기준
-    query = select(MealLog).where(and_(
-        MealLog.created_at >= start_naive,
-        MealLog.created_at < end_naive,
-        MealLog.is_void == False
-    ))
-    result = db.execute(query)
-    logs = result.scalars().all()
-
-    from collections import defaultdict
-    by_date = defaultdict(lambda: {"employee_count": 0, "guest_count": 0, "total_amount": 0})
-    for log in logs:
-        kst_date_str = (utc_to_kst_str(log.created_at) or "")[:10]
-        if not kst_date_str:
-            continue
-        by_date[kst_date_str]["employee_count"] += 1
-        by_date[kst_date_str]["guest_count"] += (log.guest_count or 0)
-        by_date[kst_date_str]["total_amount"] += (log.final_price or 0) * (1 + (log.guest_count or 0))
+    return cached_report(
+        request, "monthly", start_date, end_date_last, {},
+        lambda: _json_body(_monthly_rows(db, start_date, end_date_last)), "application/json",
+    )
+
+
+def _monthly_rows(db: Session, start_date: date, end_date_last: date):
+    # 일별 집계 테이블(meal_date = KST 날짜)에서 일자별 합계
+    R = MealDailyRollup
+    rows = db.execute(
+        select(
+            R.meal_date,
+            func.sum(R.meal_count),
+            func.sum(R.guest_count),
+            func.sum(R.amount),
+        )
+        .where(and_(R.meal_date >= start_date, R.meal_date <= end_date_last))
+        .group_by(R.meal_date)
+        .having(func.sum(R.meal_count) > 0)
+        .order_by(R.meal_date)
+    ).all()
 
     return [
-        {"date": d, "employee_count": v["employee_count"], "guest_count": v["guest_count"], "total_amount": v["total_amount"]}
-        for d in sorted(by_date.keys())
-        for v in [by_date[d]]
+        {"date": d.isoformat(), "employee_count": int(cnt or 0), "guest_count": int(guests or 0), "total_amount": int(amount or 0)}
+        for d, cnt, guests, amount in rows
     ]
 
 @router.get("/department")
 def get_department_report(
     start_date: date,
     end_date: date,
+    request: Request,
     db: Session = Depends(get_db),
     _admin=Depends(get_current_admin),
 ):
-    start_naive, end_naive = kst_date_range_to_naive(start_date, end_date)
+    """기간 부서별 합계. 어제 이전으로 끝나는 기간은 결과 캐시(ETag·304)."""
+    return cached_report(
+        request, "department", start_date, end_date, {},
+        lambda: _json_body(_department_rows(db, start_date, end_date)), "application/json",
+    )
+
+
+def _department_rows(db: Session, start_date: date, end_date: date):
+    R = MealDailyRollup
     query = select(
         Department.name.label("department_name"),
-        func.count(MealLog.id).label("count"),
-        func.sum(MealLog.guest_count).label("guest_count")
-    ).join(MealLog, User.id == MealLog.user_id)\
-     .join(Department, User.department_id == Department.id)\
+        func.sum(R.meal_count).label("count"),
+        func.sum(R.guest_count).label("guest_count")
+    ).join(Department, R.department_id == Department.id)\
      .where(and_(
-        MealLog.created_at >= start_naive,
-        MealLog.created_at < end_naive,
-        MealLog.is_void == False
-     )).group_by(Department.name)
+        R.meal_date >= start_date,
+        R.meal_date <= end_date,
+     )).group_by(Department.name)\
+     .having(func.sum(R.meal_count) > 0)
      
     result = db.execute(query)
     return [dict(row._asdict()) for row in result.all()]
 
+# 엑셀 파일이 이 크기를 넘으면 메모리 대신 임시 파일에 씀
+_EXCEL_SPOOL_MAX_BYTES = 8 * 1024 * 1024
+_EXCEL_FETCH_ROWS = 1000
+
+
+def _excel_report_range(
+    year: Optional[int], month: Optional[int], start_date: Optional[date], end_date: Optional[date]
+):
+    """(시작일, 종료일, 파일명 접미사). year·month 또는 start_date·end_date 중 하나."""
+    if start_date is not None or end_date is not None:
+        if start_date is None or end_date is None:
+            raise HTTPException(status_code=400, detail="start_date 와 end_date 를 함께 지정하세요.")
+        if start_date > end_date:
+            raise HTTPException(status_code=400, detail="start_date 가 end_date 보다 늦습니다.")
+        return start_date, end_date, f"{start_date:%Y%m%d}_{end_date:%Y%m%d}"
+    if year is None or month is None or not 1 <= month <= 12:
+        raise HTTPException(status_code=400, detail="year·month 또는 start_date·end_date 를 지정하세요.")
+    first = date(year, month, 1)
+    last = (date(year, month + 1, 1) if month < 12 else date(year + 1, 1, 1)) - timedelta(days=1)
+    return first, last, f"{year}{month:02d}"
+
+
+def _write_sheet(wb, title: str, header, rows) -> None:
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font
+
+    ws = wb.create_sheet(title)
+    bold = Font(bold=True)
+    cells = []
+    for name in header:
+        cell = WriteOnlyCell(ws, value=name)
+        cell.font = bold
+        cells.append(cell)
+    ws.append(cells)
+    for row in rows:
+        ws.append(list(row))
+
+
 @router.get("/excel")
 def get_excel_report(
-    year: int,
-    month: int,
+    request: Request,
+    year: Optional[int] = None,
+    month: Optional[int] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
     db: Session = Depends(get_db),
     _admin=Depends(get_current_admin),
 ):
-    import pandas as pd
-    from io import BytesIO
-    from fastapi.responses import StreamingResponse
-    from sqlalchemy.orm import joinedload
-    
-    start_date = date(year, month, 1)
-    end_date = date(year, month + 1, 1) if month < 12 else date(year + 1, 1, 1)
-    end_date_last = end_date - timedelta(days=1)
-    start_naive, end_naive = kst_date_range_to_naive(start_date, end_date_last)
-    
-    query = select(MealLog).options(
-        joinedload(MealLog.user).joinedload(User.department_ref),
-        joinedload(MealLog.policy)
-    ).where(and_(
-        MealLog.created_at >= start_naive,
-        MealLog.created_at < end_naive,
-        MealLog.is_void == False
-    ))
-    
-    result = db.execute(query)
-    logs = result.scalars().all()
-    
-    if not logs:
-        data = []
-    else:
-        data = []
-        for log in logs:
-            kst_date_str = (utc_to_kst_str(log.created_at) or "")[:10]
-            data.append({
-                "날짜": kst_date_str or (log.created_at.date() if log.created_at else ""),
-                "사번": log.user.emp_no if log.user else "N/A",
-                "이름": log.user.name if log.user else "N/A",
-                "부서": log.user.department_name if log.user else "N/A",
-                "식사종류": (getattr(log.policy, "meal_type", None) if log.policy else None) or "번외",
-                "인원": 1 + (log.guest_count or 0),
-                "단가": log.final_price or 0,
-                "금액": (log.final_price or 0) * (1 + (log.guest_count or 0))
-            })
-    
-    df_raw = pd.DataFrame(data)
-    if df_raw.empty:
-        df_raw = pd.DataFrame(columns=["날짜", "사번", "이름", "부서", "식사종류", "인원", "단가", "금액"])
-    
-    # Sheet 1: 부서별 합계 (빈 DataFrame이어도 groupby 가능)
-    df_dept = df_raw.groupby("부서").agg({
-        "인원": "sum",
-        "금액": "sum"
-    }).reset_index()
-    df_dept.columns = ["부서명", "총 식수", "총 금액"]
-    
-    # Sheet 2: 개인별 합계
-    df_user = df_raw.groupby(["사번", "이름", "부서"]).agg({
-        "인원": "sum",
-        "금액": "sum"
-    }).reset_index()
-    df_user.columns = ["사번", "이름", "부서", "총 식수", "총 금액"]
-    
-    # Sheet 3: 일자별 합계
-    df_daily = df_raw.groupby("날짜").agg({
-        "인원": "sum",
-        "금액": "sum"
-    }).reset_index()
-    
-    # Create Excel in memory
-    output = BytesIO()
-    with pd.ExcelWriter(output, engine='openpyxl') as writer:
-        df_dept.to_sheet = "부서별합계"
-        df_dept.to_excel(writer, sheet_name="부서별합계", index=False)
-        df_user.to_excel(writer, sheet_name="개인별합계", index=False)
-        df_daily.to_excel(writer, sheet_name="일자별합계", index=False)
-    
-    output.seek(0)
-    filename = f"MealReport_{year}{month:02d}.xlsx"
-    
-    return StreamingResponse(
-        output,
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    """부서별·개인별·일자별 합계 엑셀. 시트마다 일별 집계 테이블에서 SQL GROUP BY 한 번,
+    write-only 워크북으로 행을 바로 써서 기간 길이와 무관하게 메모리 일정. 파일은 64KB 단위로 스트리밍.
+    어제 이전으로 끝나는 기간은 결과 캐시(ETag·304)."""
+    first, last, suffix = _excel_report_range(year, month, start_date, end_date)
+    filename = f"MealReport_{suffix}.xlsx"
+    return cached_report(
+        request, "excel", first, last, {"filename": filename},
+        lambda: _build_excel(db, first, last),
+        _EXCEL_MEDIA_TYPE,
+        {"Content-Disposition": f"attachment; filename={filename}"},
     )
+
+
+_EXCEL_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+
+@router.post("/excel/jobs", response_model=JobResponse, status_code=status.HTTP_202_ACCEPTED)
+def create_excel_report_job(
+    year: Optional[int] = None,
+    month: Optional[int] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    db: Session = Depends(get_db),
+    admin: AdminPrincipal = Depends(get_current_admin),
+):
+    """/excel 과 같은 엑셀을 백그라운드 작업으로 생성. 끝나면 GET /jobs/{id}/result 로 파일을 받음."""
+    first, last, suffix = _excel_report_range(year, month, start_date, end_date)
+    return job_runner.submit(
+        db, "excel_report", _excel_report_job, created_by=admin.id,
+        first=first, last=last, filename=f"MealReport_{suffix}.xlsx",
+    )
+
+
+def _excel_report_job(ctx, first: date, last: date, filename: str) -> dict:
+    import shutil
+
+    output = _build_excel(ctx.db, first, last, progress=ctx.progress)
+    try:
+        with open(ctx.result_file(filename, _EXCEL_MEDIA_TYPE), "wb") as f:
+            shutil.copyfileobj(output, f)
+    finally:
+        output.close()
+    return {"filename": filename, "start_date": first.isoformat(), "end_date": last.isoformat()}
+
+
+def _build_excel(db: Session, first: date, last: date, progress=None):
+    """워크북을 임시 파일(_EXCEL_SPOOL_MAX_BYTES 넘으면 디스크)에 쓰고 처음 위치로 되감아 반환.
+    progress(끝난 시트 수, 3, 시트명) 선택 (백그라운드 작업 진행률)."""
+    from tempfile import SpooledTemporaryFile
+    from openpyxl import Workbook
+
+    # 인원 = 기록 건수 + 동반 인원, 금액 = 정책 단가 × 인원 (집계 테이블 amount)
+    R = MealDailyRollup
+    people = func.sum(R.meal_count + R.guest_count)
+    amount = func.sum(R.amount)
+    in_range = and_(R.meal_date >= first, R.meal_date <= last)
+    dept_name = func.coalesce(Department.name, "N/A")
+
+    def stream(query):
+        for row in db.execute(query.execution_options(yield_per=_EXCEL_FETCH_ROWS)):
+            *keys, total_people, total_amount = row
+            yield (*keys, int(total_people or 0), int(total_amount or 0))
+
+    dept_query = (
+        select(dept_name, people, amount)
+        .select_from(R)
+        .outerjoin(Department, Department.id == R.department_id)
+        .where(in_range)
+        .group_by(dept_name)
+        .having(func.sum(R.meal_count) > 0)
+        .order_by(dept_name)
+    )
+    user_query = (
+        select(User.emp_no, User.name, dept_name, people, amount)
+        .select_from(R)
+        .join(User, User.id == R.user_id)
+        .outerjoin(Department, Department.id == R.department_id)
+        .where(in_range)
+        .group_by(User.emp_no, User.name, dept_name)
+        .having(func.sum(R.meal_count) > 0)
+        .order_by(User.emp_no, User.name, dept_name)
+    )
+    daily_query = (
+        select(R.meal_date, people, amount)
+        .where(in_range)
+        .group_by(R.meal_date)
+        .having(func.sum(R.meal_count) > 0)
+        .order_by(R.meal_date)
+    )
+
+    output = SpooledTemporaryFile(max_size=_EXCEL_SPOOL_MAX_BYTES)
+    try:
+        wb = Workbook(write_only=True)
+        sheets = (
+            ("부서별합계", ("부서명", "총 식수", "총 금액"), stream(dept_query)),
+            ("개인별합계", ("사번", "이름", "부서", "총 식수", "총 금액"), stream(user_query)),
+            ("일자별합계", ("날짜", "인원", "금액"), ((d.isoformat(), p, a) for d, p, a in stream(daily_query))),
+        )
+        for i, (title, header, rows) in enumerate(sheets):
+            if progress is not None:
+                progress(i, len(sheets), title)
+            _write_sheet(wb, title, header, rows)
+        wb.save(output)
+        if progress is not None:
+            progress(len(sheets), len(sheets), "완료")
+        output.seek(0)
+    except Exception:
+        output.close()
+        raise
+    return output
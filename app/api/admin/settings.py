@@ -7,6 +7,7 @@ from sqlalchemy.orm import Session
 
 from app.core.config import settings
 from app.core.database import get_db
+from app.core.qr_routing import rebuild_qr_routing_table
 from app.api.auth import get_current_admin
 from app.models.models import SystemSetting
 from app.schemas.schemas import AuthQrEntry, DeviceSettingsResponse, DeviceSettingsUpdate
@@ -148,4 +149,5 @@ def put_device_settings(
     else:
         db.add(SystemSetting(key=DEVICE_KEY, value=current))
     db.commit()
+    rebuild_qr_routing_table(db)
     return DeviceSettingsResponse(**current)
@@ -1,13 +1,15 @@
 """당일(한국시간) 식사인증 조회 API. 관리자 폰 PWA용. 식당관리자 로그인 필수."""
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
-from sqlalchemy import select, and_, or_
+from sqlalchemy import select, and_
 from sqlalchemy.orm import joinedload
 from datetime import date, datetime
 from app.core.database import get_db
-from app.models.models import MealLog, User, MealPolicy, CafeteriaAdmin
+from app.models.models import MealLog, User, MealPolicy
 from app.core.time_utils import kst_today, kst_date_range_to_naive
 from app.api.auth import get_current_admin
+from app.core.principal_cache import AdminPrincipal
+from app.core.employee_search import user_search_clause
 from typing import List, Optional
 
 router = APIRouter()
@@ -17,7 +19,7 @@ router = APIRouter()
 def today_meal_check(
     q: Optional[str] = None,
     db: Session = Depends(get_db),
-    admin: CafeteriaAdmin = Depends(get_current_admin)
+    admin: AdminPrincipal = Depends(get_current_admin)
 ):
     """한국시간 오늘 기준, 사원이름 또는 사번으로 식사인증 조회. 시간·식사종류 반환."""
     start_naive, end_naive = kst_date_range_to_naive(kst_today(), kst_today())
@@ -35,12 +37,7 @@ def today_meal_check(
         )
     )
     if q and q.strip():
-        query = query.where(
-            or_(
-                User.name.icontains(q.strip()),
-                User.emp_no.icontains(q.strip())
-            )
-        )
+        query = query.where(user_search_clause(db, q, MealLog.user_id))
     query = query.options(
         joinedload(MealLog.user),
         joinedload(MealLog.policy)
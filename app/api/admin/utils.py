@@ -1,7 +1,6 @@
-from typing import Optional
-from sqlalchemy import select
+from typing import Any, Dict, Iterable, Optional
 from sqlalchemy.orm import Session
-from app.models.models import AuditLog, User
+from app.core.audit_writer import audit_writer
 
 def record_audit_log(
     db: Session,
@@ -13,22 +12,19 @@ def record_audit_log(
     after_value: dict = None,
     reason: str = None
 ):
-    # Verify operator exists to avoid FK error
-    try:
-        op_check = db.execute(select(User).where(User.id == operator_id))
-        if op_check.scalar_one_or_none() is None:
-            operator_id = None  # Fallback to null if user doesn't exist
-    except Exception:
-        operator_id = None
-
-    audit_log = AuditLog(
-        operator_id=operator_id,
-        action=action,
-        target_table=target_table,
-        target_id=target_id,
-        before_value=before_value,
-        after_value=after_value,
-        reason=reason
-    )
-    db.add(audit_log)
+    # 없는 작업자 id 는 NULL 로 (FK 오류 방지, 확인 결과는 audit_writer 가 캐시)
     # Note: We assume the caller will commit the transaction
+    audit_writer.record_many(db, [{
+        "operator_id": operator_id,
+        "action": action,
+        "target_table": target_table,
+        "target_id": target_id,
+        "before_value": before_value,
+        "after_value": after_value,
+        "reason": reason,
+    }])
+
+
+def record_audit_logs(db: Session, entries: Iterable[Dict[str, Any]]):
+    """여러 건을 한 번에 (작업자 확인 1회 + 다중 행 INSERT). entries 는 record_audit_log 인자 이름의 dict."""
+    audit_writer.record_many(db, entries)
@@ -5,10 +5,17 @@ router = APIRouter()
 
 @router.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
-    await manager.connect(websocket)
+    # ?topics=stats,device:3 (접속 즉시 구독), ?since=<seq>&stream=<id> (재접속 시 놓친 이벤트 재전송)
+    q = websocket.query_params
+    topics = [t.strip() for t in q["topics"].split(",") if t.strip()] if q.get("topics") else None
+    since = int(q["since"]) if (q.get("since") or "").isdigit() else None
+    await manager.connect(websocket, topics=topics, since=since, stream=q.get("stream") or None)
     try:
         while True:
-            # Keep connection alive
-            await websocket.receive_text()
-    except WebSocketDisconnect:
+            # Keep connection alive + 토픽 구독 메시지 처리
+            await manager.handle_message(websocket, await websocket.receive_text())
+    except (WebSocketDisconnect, RuntimeError):
+        # RuntimeError: 송신 쪽에서 느린 연결을 먼저 닫은 경우
+        pass
+    finally:
         manager.disconnect(websocket)
@@ -1,25 +1,29 @@
 from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
-from sqlalchemy import select
+from sqlalchemy import select, update
+from starlette.concurrency import run_in_threadpool
 from jose import jwt, JWTError
-from app.core.database import get_db
+from app.core.database import SessionLocal, get_async_db, get_db
 from app.models.models import User, CafeteriaAdmin
 from app.schemas.schemas import Token, UserResponse, VerifyDeviceRequest
-from app.core.security import create_access_token, get_password_hash, verify_password
+from app.core.security import create_access_token
+from app.core.password_hasher import password_hasher
 from app.core.config import settings
+from app.core.principal_cache import (
+    AdminPrincipal,
+    UserPrincipal,
+    admin_cache,
+    invalidate_admin,
+    invalidate_user,
+)
 from app.api.meal import get_current_user
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 http_bearer = HTTPBearer(auto_error=True)
 
 
-def get_current_admin(
-    credentials: HTTPAuthorizationCredentials = Depends(http_bearer),
-    db: Session = Depends(get_db)
-) -> CafeteriaAdmin:
-    """Bearer 토큰에서 식당관리자(admin:{id}) 확인. PWA 당일 식사인증 조회 등에 사용."""
-    token = credentials.credentials
+def _admin_id_from_token(token: str) -> int:
     try:
         payload = jwt.decode(
             token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
@@ -27,37 +31,115 @@ def get_current_admin(
         sub = payload.get("sub")
         if not sub or not str(sub).startswith("admin:"):
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="관리자 인증이 필요합니다.")
-        admin_id = int(str(sub).replace("admin:", ""))
+        return int(str(sub).replace("admin:", ""))
     except (JWTError, ValueError):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="유효하지 않은 토큰입니다.")
+
+
+def _admin_not_found() -> HTTPException:
+    return HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="관리자를 찾을 수 없습니다.")
+
+
+def get_current_admin(
+    credentials: HTTPAuthorizationCredentials = Depends(http_bearer),
+    db: Session = Depends(get_db)
+) -> AdminPrincipal:
+    """Bearer 토큰에서 식당관리자(admin:{id}) 확인. PWA 당일 식사인증 조회 등에 사용.
+    DB 행 대신 스냅샷(AdminPrincipal)을 반환하며, 캐시 적중 시 DB 조회 없음."""
+    admin_id = _admin_id_from_token(credentials.credentials)
+    admin = admin_cache.get(admin_id)
+    if admin is not None:
+        return admin
+    generation = admin_cache.generation
     result = db.execute(select(CafeteriaAdmin).where(CafeteriaAdmin.id == admin_id))
-    admin = result.scalar_one_or_none()
-    if not admin:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="관리자를 찾을 수 없습니다.")
+    row = result.scalar_one_or_none()
+    if not row:
+        raise _admin_not_found()
+    admin = AdminPrincipal.from_admin(row)
+    admin_cache.set(admin_id, admin, generation=generation)
+    return admin
+
+
+async def get_current_admin_async(
+    credentials: HTTPAuthorizationCredentials = Depends(http_bearer),
+    db=Depends(get_async_db),
+) -> AdminPrincipal:
+    """get_current_admin 의 async 세션 버전 (스레드풀 미사용)."""
+    admin_id = _admin_id_from_token(credentials.credentials)
+    admin = admin_cache.get(admin_id)
+    if admin is not None:
+        return admin
+    generation = admin_cache.generation
+    result = await db.execute(select(CafeteriaAdmin).where(CafeteriaAdmin.id == admin_id))
+    row = result.scalar_one_or_none()
+    if not row:
+        raise _admin_not_found()
+    admin = AdminPrincipal.from_admin(row)
+    admin_cache.set(admin_id, admin, generation=generation)
     return admin
 
+def _login_row(model, emp_no: str):
+    """로그인 대상(사원·식당관리자) 행. 짧은 세션으로 읽고 분리 — 비밀번호 계산을 기다리는 동안 커넥션을 잡지 않도록."""
+    db = SessionLocal()
+    try:
+        row = db.execute(select(model).where(model.emp_no == emp_no)).scalar_one_or_none()
+        if row is not None:
+            db.expunge(row)
+        return row
+    finally:
+        db.close()
+
+
+def _store_password_hash(model, row_id: int, password_hash: str, verified: bool = False) -> bool:
+    """해시 저장. verified=True(최초 인증)면 아직 미인증인 경우에만 — 동시에 들어온 최초 로그인 중 먼저 저장한 쪽만 성공.
+    저장했으면 True."""
+    db = SessionLocal()
+    try:
+        stmt = update(model).where(model.id == row_id)
+        values = {"password_hash": password_hash}
+        if verified:
+            values["is_verified"] = True
+            stmt = stmt.where(model.is_verified == False)
+        stored = db.execute(stmt.values(**values)).rowcount > 0
+        db.commit()
+        return stored
+    finally:
+        db.close()
+
+
+async def _check_or_set_password(model, row, safe_password: str, mismatch_detail: str) -> None:
+    """최초 인증이면 비밀번호 저장(is_verified=True), 이미 인증됐으면 검증.
+    해시·검증은 password_hasher 프로세스 풀에서 (몰리면 429). 저장된 해시 비용이 BCRYPT_ROUNDS 와 다르면 새 비용으로 다시 저장."""
+    if not row.is_verified:
+        if not safe_password:
+            raise HTTPException(status_code=400, detail="최초 접속 시 비밀번호를 설정해야 합니다.")
+        password_hash = await password_hasher.hash(safe_password)
+        if await run_in_threadpool(_store_password_hash, model, row.id, password_hash, True):
+            return
+        # 해시 계산 사이 다른 요청이 먼저 최초 인증함 → 그 비밀번호로 검증
+        row = await run_in_threadpool(_login_row, model, row.emp_no)
+        if row is None:
+            raise HTTPException(status_code=400, detail="사번 또는 이름이 일치하지 않습니다.")
+    if not row.password_hash:
+        raise HTTPException(status_code=400, detail="기기 초기화된 사번입니다. 비밀번호를 다시 설정해 주세요.")
+    if not await password_hasher.verify(safe_password, row.password_hash):
+        raise HTTPException(status_code=400, detail=mismatch_detail)
+    if password_hasher.needs_rehash(row.password_hash):
+        password_hash = await password_hasher.rehash(safe_password)
+        await run_in_threadpool(_store_password_hash, model, row.id, password_hash)
+
+
 # 식당관리자(위탁사) PC 로그인용. token sub = "admin:{id}"
 @router.post("/verify_device_admin")
-def verify_device_admin(req: VerifyDeviceRequest, db: Session = Depends(get_db)):
+async def verify_device_admin(req: VerifyDeviceRequest):
     """식당관리(위탁사 운영자) PC 앱 로그인. cafeteria_admins 테이블 기준."""
     try:
-        result = db.execute(select(CafeteriaAdmin).where(CafeteriaAdmin.emp_no == req.emp_no))
-        admin = result.scalar_one_or_none()
+        admin = await run_in_threadpool(_login_row, CafeteriaAdmin, req.emp_no)
         if not admin or admin.name != req.name:
             raise HTTPException(status_code=400, detail="사번 또는 이름이 일치하지 않습니다.")
         safe_password = (req.password or "")[:72]
-        if not admin.is_verified:
-            if not safe_password:
-                raise HTTPException(status_code=400, detail="최초 접속 시 비밀번호를 설정해야 합니다.")
-            admin.password_hash = get_password_hash(safe_password)
-            admin.is_verified = True
-        else:
-            if not admin.password_hash:
-                raise HTTPException(status_code=400, detail="기기 초기화된 사번입니다. 비밀번호를 다시 설정해 주세요.")
-            if not verify_password(safe_password, admin.password_hash):
-                raise HTTPException(status_code=400, detail="비밀번호가 일치하지 않습니다.")
-        db.commit()
-        db.refresh(admin)
+        await _check_or_set_password(CafeteriaAdmin, admin, safe_password, "비밀번호가 일치하지 않습니다.")
+        invalidate_admin(admin.id)
         access_token = create_access_token(subject=f"admin:{admin.id}")
         return {
             "access_token": access_token,
@@ -73,10 +155,9 @@ def verify_device_admin(req: VerifyDeviceRequest, db: Session = Depends(get_db))
 
 
 @router.post("/verify_device")
-def verify_device(req: VerifyDeviceRequest, db: Session = Depends(get_db)):
+async def verify_device(req: VerifyDeviceRequest, background_tasks: BackgroundTasks):
     try:
-        result = db.execute(select(User).where(User.emp_no == req.emp_no))
-        user = result.scalar_one_or_none()
+        user = await run_in_threadpool(_login_row, User, req.emp_no)
         
         if not user or user.name != req.name:
             raise HTTPException(status_code=400, detail="사번 또는 이름이 일치하지 않습니다.")
@@ -89,27 +170,19 @@ def verify_device(req: VerifyDeviceRequest, db: Session = Depends(get_db)):
         
         safe_password = (req.password or "")[:72]
 
-        if not user.is_verified:
-            # 최초 인증: 비밀번호 저장, is_verified=True 로 설정
-            if not safe_password:
-                raise HTTPException(status_code=400, detail="최초 접속 시 비밀번호를 설정해야 합니다.")
-            user.password_hash = get_password_hash(safe_password)
-            user.is_verified = True
-        else:
-            # 이미 인증된 사용자(키 변경·토큰 만료 등으로 재로그인): 기존 비밀번호만 검증, DB는 수정하지 않음
-            if not user.password_hash:
-                raise HTTPException(status_code=400, detail="기기 초기화된 사번입니다. 비밀번호를 다시 설정해 주세요.")
-            if not verify_password(safe_password, user.password_hash):
-                raise HTTPException(status_code=400, detail="이미 인증된 사번이거나 비밀번호가 일치하지 않습니다.")
-        
-        db.commit()
-        db.refresh(user)
+        # 최초 인증: 비밀번호 저장 / 이미 인증된 사용자(키 변경·토큰 만료 등으로 재로그인): 기존 비밀번호 검증
+        # (해시 비용 변경 시 재해시 외에는 DB 수정 없음)
+        await _check_or_set_password(
+            User, user, safe_password, "이미 인증된 사번이거나 비밀번호가 일치하지 않습니다."
+        )
+        invalidate_user(user.id)
         
         try:
-            from app.api.websocket import manager
+            from app.api.websocket import TOPIC_STATS, manager
             background_tasks.add_task(
                 manager.broadcast,
                 {"type": "USER_VERIFIED", "data": {"emp_no": user.emp_no, "name": user.name}},
+                (TOPIC_STATS,),
             )
         except Exception:
             pass
@@ -133,7 +206,7 @@ def verify_device(req: VerifyDeviceRequest, db: Session = Depends(get_db)):
 
 @router.get("/status")
 def get_auth_status(
-    current_user: User = Depends(get_current_user)
+    current_user: UserPrincipal = Depends(get_current_user)
 ):
     """
     기기 인증: 인증된 사원(is_verified)은 기간 관계없이 2차 인증 없이 패스.
@@ -149,7 +222,7 @@ def get_auth_status(
 
 
 @router.get("/status_admin")
-def get_auth_status_admin(admin: CafeteriaAdmin = Depends(get_current_admin)):
+def get_auth_status_admin(admin: AdminPrincipal = Depends(get_current_admin)):
     """식당관리자 PWA(당일 식사인증 조회 등) 로그인 유효 여부 확인."""
     return {
         "status": "authenticated",
@@ -1,16 +1,24 @@
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
+from fastapi import APIRouter, Depends, Header, HTTPException, status, BackgroundTasks
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import joinedload
 from sqlalchemy.orm import Session
-from sqlalchemy import select, and_
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
 from jose import jwt, JWTError
 from typing import Optional
 from pydantic import BaseModel
-from app.core.database import get_db
+from app.core.database import get_async_db, get_db
 from app.core.config import settings
-from app.models.models import MealPolicy, User, MealLog
+from app.models.models import MealPolicy, MealScanIdempotency, User, MealLog
 from app.schemas.schemas import MealPolicyResponse
 from app.core.time_utils import utc_now, KST
+from app.core.qr_routing import cached_qr_routing_table, normalize_scan, rebuild_qr_routing_table
+from app.core.meal_policy_resolver import cached_policy_resolver, rebuild_policy_resolver
+from app.core.principal_cache import UserPrincipal, user_cache
+from app.core.meal_log_writer import meal_log_writer
+from app.core.live_counters import live_counters
+from app.core.meal_rollups import add_log_delta, apply_rollup_deltas
+from app.core import scan_dedup
 
 router = APIRouter(prefix="/meal", tags=["meal"])
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/verify_device")
@@ -20,27 +28,30 @@ class QRScanBody(BaseModel):
     qr_data: Optional[str] = None  # 스캔한 QR 내용. 허용 목록 사용 시 필수
 
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
-    credentials_exception = HTTPException(
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+
+def _user_id_from_token(token: str) -> int:
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
         user_id_str: str = payload.get("sub")
         if user_id_str is None:
-            raise credentials_exception
-        user_id = int(user_id_str)
+            raise _credentials_exception()
+        return int(user_id_str)
     except (JWTError, ValueError):
-        raise credentials_exception
-    
-    result = db.execute(
-        select(User).options(joinedload(User.department_ref)).where(User.id == user_id)
-    )
-    user = result.scalar_one_or_none()
-    if user is None:
-        raise credentials_exception
+        raise _credentials_exception()
+
+
+def _user_principal_query(user_id: int):
+    return select(User).options(joinedload(User.department_ref)).where(User.id == user_id)
+
+
+def _check_user_principal(user: UserPrincipal) -> UserPrincipal:
     if user.status == "RESIGNED":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -53,6 +64,36 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
         )
     return user
 
+
+def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> UserPrincipal:
+    user_id = _user_id_from_token(token)
+    user = user_cache.get(user_id)
+    if user is None:
+        generation = user_cache.generation
+        row = db.execute(_user_principal_query(user_id)).scalar_one_or_none()
+        if row is None:
+            raise _credentials_exception()
+        user = UserPrincipal.from_user(row)
+        # 조회 도중 무효화(퇴사·기기 초기화 등)가 있었으면 채우지 않음
+        user_cache.set(user_id, user, generation=generation)
+    return _check_user_principal(user)
+
+
+async def get_current_user_async(
+    token: str = Depends(oauth2_scheme), db=Depends(get_async_db)
+) -> UserPrincipal:
+    """get_current_user 의 async 세션 버전 (스레드풀 미사용)."""
+    user_id = _user_id_from_token(token)
+    user = user_cache.get(user_id)
+    if user is None:
+        generation = user_cache.generation
+        row = (await db.execute(_user_principal_query(user_id))).unique().scalar_one_or_none()
+        if row is None:
+            raise _credentials_exception()
+        user = UserPrincipal.from_user(row)
+        user_cache.set(user_id, user, generation=generation)
+    return _check_user_principal(user)
+
 @router.get("/today", response_model=list[MealPolicyResponse])
 def get_today_policies(db: Session = Depends(get_db)):
     # 금일 활성화된 식사 정책 조회
@@ -60,70 +101,55 @@ def get_today_policies(db: Session = Depends(get_db)):
     return result.scalars().all()
 
 @router.post("/qr-scan")
-def process_qr_scan(
+async def process_qr_scan(
     body: QRScanBody,
     background_tasks: BackgroundTasks,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user: UserPrincipal = Depends(get_current_user_async),
+    db=Depends(get_async_db),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
 ):
-    def _norm_qr(s):
-        if s is None or not isinstance(s, str):
-            return ""
-        return s.strip().replace("\ufeff", "").replace("\r", "").replace("\n", "").strip()
-
-    from app.api.admin.settings import coalesce_allowed_qr_entries, get_device_settings_from_db
-    from app.api.admin.hardware_terminals import (
-        auth_id_for_normalized_scan,
-        build_merged_device_payload,
-        has_binding_for_auth_id,
-        legacy_device_payload_from_settings,
-        total_hardware_rows,
-    )
+    """QR 식수 인증. async 세션 사용 — 라우팅 테이블·정책 판정은 메모리 조회, DB 왕복은 INSERT 커밋뿐.
+    Idempotency-Key 헤더가 있으면 같은 키 재전송에 최초 응답을 그대로 반환 (식수 기록·브로드캐스트 없음)."""
+    idem_key = scan_dedup.normalize_idempotency_key(idempotency_key)
+    if not idem_key:
+        return await _record_qr_scan(body, background_tasks, current_user, db)
 
-    qr_val = _norm_qr(body.qr_data)
-    n_hw = total_hardware_rows(db)
+    replay = await scan_dedup.acquire(db, current_user.id, idem_key)
+    if replay is not None:
+        return replay
+    response = None
+    try:
+        response = await _record_qr_scan(body, background_tasks, current_user, db, idem_key)
+        return response
+    finally:
+        scan_dedup.finish(current_user.id, idem_key, response)
+
+
+async def _record_qr_scan(
+    body: QRScanBody, background_tasks: BackgroundTasks, current_user: UserPrincipal, db, idem_key: Optional[str] = None,
+) -> dict:
+    """식수 기록. idem_key 가 있으면 meal_scan_idempotency 행을 식수 기록과 같은 트랜잭션에 넣고,
+    다른 워커가 같은 키를 먼저 커밋했으면(유일 제약 위반) 이 기록은 롤백하고 저장된 응답 반환."""
+    qr_val = normalize_scan(body.qr_data)
     qr_terminal_id = None
-    log_qr_auth_id = None
-    device_payload = None
-
-    if n_hw > 0:
-        # 프린터·경광등 등록이 하나라도 있으면: 스캔이 인증 QR 목록과 맞고, 해당 QR ID에 장비 행이 있어야 함
-        if not qr_val:
-            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="QR 코드를 스캔해 주세요.")
-        aid = auth_id_for_normalized_scan(db, qr_val)
-        if aid is None or not has_binding_for_auth_id(db, aid):
-            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="등록되지 않은 QR입니다. 인증할 수 없습니다.")
-        log_qr_auth_id = aid
-        device_payload = build_merged_device_payload(db, aid, matched_scan=qr_val)
-    else:
-        # 레거시: 터미널 없음 — allowed_qr_entries 의 code 만 허용 (목록이 비어 있으면 검사 생략)
-        device = get_device_settings_from_db(db)
-        entries = coalesce_allowed_qr_entries(device)
-        if len(entries) > 0:
-            if not qr_val:
-                raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="QR 코드를 스캔해 주세요.")
-            allowed_set = {_norm_qr(e["code"]) for e in entries if e.get("code")}
-            allowed_set.discard("")
-            if qr_val not in allowed_set:
-                raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="등록되지 않은 QR입니다. 인증할 수 없습니다.")
-        device_payload = legacy_device_payload_from_settings(device, matched_scan=qr_val)
+
+    # 스캔 문자열 → 구역(QR ID)·장치 페이로드: 미리 계산된 라우팅 테이블 dict 조회 (DB 조회 없음)
+    routing = cached_qr_routing_table() or await db.run_sync(rebuild_qr_routing_table)
+    if routing.requires_scan and not qr_val:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="QR 코드를 스캔해 주세요.")
+    route = routing.resolve(qr_val)
+    if route is None:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="등록되지 않은 QR입니다. 인증할 수 없습니다.")
+    log_qr_auth_id = route.qr_auth_id
+    device_payload = dict(route.device)
 
     # 저장할 시각을 한 번 정한 뒤, 그 시각의 한국 시간(KST)으로 식사 종류(정책) 판단 및 로그 저장 (서버의 "지금"이 아닌 로그 시각 기준)
     event_kst = utc_now().astimezone(KST)
     log_time_kst = event_kst.time()
 
-    # 식사 시간 범위 내에 있는 정책 검색 (로그에 저장될 시각 기준)
-    result = db.execute(
-        select(MealPolicy).where(
-            and_(
-                MealPolicy.is_active == True,
-                MealPolicy.start_time <= log_time_kst,
-                MealPolicy.end_time >= log_time_kst,
-            )
-        )
-    )
-    rows = result.scalars().all()
-    policy = rows[0] if rows else None
+    # 식사 시간 범위 내 정책 판정 (로그에 저장될 시각 기준, 분 단위 배열 조회 — 자정 넘김 구간 포함)
+    resolver = cached_policy_resolver() or await db.run_sync(rebuild_policy_resolver)
+    policy = resolver.resolve(log_time_kst)
 
     if not policy:
         raise HTTPException(
@@ -131,10 +157,16 @@ def process_qr_scan(
             detail="식사 시간이 아닙니다. 식사 정책에 안내된 식사 시간에 이용해 주세요."
         )
 
+    # 재스캔 억제 창(설정 시): 같은 사원·같은 식사의 연속 스캔은 DB 쓰기 전에 직전 응답으로 단락
+    suppressed = scan_dedup.suppressed_response(current_user.id, policy.id)
+    if suppressed is not None:
+        return suppressed
+
     # 매 QR 인증마다 프린터·경광등 트리거 (재스캔 포함)
     trigger_devices = True
 
-    new_log = MealLog(
+    created_at = event_kst.replace(tzinfo=None)  # 한국 시간 로컬 시각 그대로 저장 (naive)
+    log_values = dict(
         user_id=current_user.id,
         policy_id=policy.id,
         guest_count=0,
@@ -143,41 +175,14 @@ def process_qr_scan(
         qr_terminal_id=qr_terminal_id,
         qr_auth_id=log_qr_auth_id,
         final_price=policy.base_price,
-        created_at=event_kst.replace(tzinfo=None)  # 한국 시간 로컬 시각 그대로 저장 (naive)
-    )
-    db.add(new_log)
-    db.commit()
-    db.refresh(new_log)
-    
-    # WebSocket Broadcast (실시간 갱신 + PC 앱에서 프린터/경광등 신호용)
-    from app.api.websocket import manager
-    meal_type_label = {"breakfast": "조식", "lunch": "중식", "dinner": "석식"}.get(
-        (policy.meal_type or "").lower(), (policy.meal_type or "번외")
+        is_void=False,
+        created_at=created_at,
     )
-    date_time_str = event_kst.strftime("%Y-%m-%d %H:%M") if event_kst else ""
-    background_tasks.add_task(
-        manager.broadcast,
-        {
-            "type": "MEAL_LOG_CREATED",
-            "data": {
-                "log_id": new_log.id,
-                "emp_no": current_user.emp_no,
-                "name": current_user.name,
-                "meal_type_label": meal_type_label,
-                "date_time_str": date_time_str,
-                "path": "QR",
-                "created_at": event_kst.replace(tzinfo=None).isoformat(timespec="seconds"),
-                "trigger_devices": trigger_devices,
-                "device": device_payload,
-            },
-        },
-    )
-    
-    return {
+    response = {
         "status": "success",
         "message": "식수 인증이 완료되었습니다.",
-        "log_id": new_log.id,
-        "auth_time": (new_log.created_at.strftime("%H:%M:%S") if new_log.created_at else "00:00:00"),
+        "log_id": None,
+        "auth_time": created_at.strftime("%H:%M:%S"),
         "meal_type": (policy.meal_type if policy else "") or "",
         "user": {
             "name": current_user.name,
@@ -185,6 +190,75 @@ def process_qr_scan(
             "dept_name": current_user.department_name
         }
     }
+    try:
+        if settings.MEAL_LOG_BATCH_ENABLED:
+            # 그룹 커밋: 동시 스캔과 함께 다중 행 INSERT 1회로 저장, 커밋 후 id 수신.
+            # 대기 중 커넥션을 쥐고 있지 않도록 요청 세션 트랜잭션(인증 조회 등)을 먼저 끝내 풀에 반환
+            await db.commit()
+            idem = None
+            if idem_key:
+                idem = (current_user.id, idem_key, {k: v for k, v in response.items() if k != "log_id"})
+            log_id = await meal_log_writer.submit(log_values, idem)
+        else:
+            new_log = MealLog(**log_values)
+            db.add(new_log)
+            # 보고서용 일별 집계도 같은 트랜잭션에서 증감
+            rollup = {}
+            add_log_delta(rollup, log_values, current_user.department_id)
+            await db.run_sync(apply_rollup_deltas, rollup)
+            if idem_key:
+                await db.flush()
+                db.add(MealScanIdempotency(**scan_dedup.idempotency_values(
+                    current_user.id, idem_key, new_log.id, {**response, "log_id": new_log.id}
+                )))
+            await db.commit()
+            log_id = new_log.id
+    except IntegrityError:
+        if not idem_key:
+            raise
+        await db.rollback()
+        stored = await scan_dedup.stored_response(db, current_user.id, idem_key)
+        if stored is None:
+            raise
+        return stored
+    response["log_id"] = log_id
+    if idem_key:
+        await scan_dedup.remember_response(db, current_user.id, idem_key, response)
+    stats_delta = live_counters.apply(created_at, policy.id, 1, 0)
+    
+    # WebSocket Broadcast (실시간 갱신 + PC 앱에서 프린터/경광등 신호용)
+    # 장치 페이로드는 해당 구역(device:<QR ID>) 구독자에게만, stats·raw-data 구독자에게는 장치 정보 없이 전송
+    from app.api.websocket import TOPIC_RAW_DATA, TOPIC_STATS, device_topic, manager
+    meal_type_label = {"breakfast": "조식", "lunch": "중식", "dinner": "석식"}.get(
+        (policy.meal_type or "").lower(), (policy.meal_type or "번외")
+    )
+    date_time_str = event_kst.strftime("%Y-%m-%d %H:%M") if event_kst else ""
+    event_data = {
+        "log_id": log_id,
+        "emp_no": current_user.emp_no,
+        "name": current_user.name,
+        "meal_type_label": meal_type_label,
+        "date_time_str": date_time_str,
+        "path": "QR",
+        "created_at": created_at.isoformat(timespec="seconds"),
+        "qr_auth_id": log_qr_auth_id,
+        "trigger_devices": trigger_devices,
+        "device": device_payload,
+        # 대시보드 증감분: PC 앱은 /stats/today 재조회 없이 화면 숫자에 더함
+        "stats_delta": stats_delta,
+    }
+    summary_data = {**event_data, "trigger_devices": False}
+    summary_data.pop("device")
+    background_tasks.add_task(
+        manager.publish,
+        [
+            ((device_topic(log_qr_auth_id),), {"type": "MEAL_LOG_CREATED", "data": event_data}),
+            ((TOPIC_STATS, TOPIC_RAW_DATA), {"type": "MEAL_LOG_CREATED", "data": summary_data}),
+        ],
+    )
+    
+    scan_dedup.remember_scan(current_user.id, policy.id, response)
+    return response
 
 @router.post("/pre-check")
 def pre_check_meal(policy_id: int, guest_count: int = 0):
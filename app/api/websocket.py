@@ -1,31 +1,326 @@
-from fastapi import WebSocket
-from typing import List
+"""관리자·PC 앱 WebSocket 브로드캐스트.
+
+연결마다 상한 있는 송신 큐 + 전용 송신 태스크를 두고, broadcast 는 JSON 을 한 번만 인코딩해 각 큐에 넣고 바로 반환.
+느린 단말 하나가 다른 단말(프린터·경광등 트리거)의 수신을 늦추지 않음.
+큐가 차면 WS_OVERFLOW_POLICY 에 따라 가장 오래된 메시지를 버리거나(drop_oldest) 그 연결을 끊음(disconnect).
+한 메시지 전송이 WS_SEND_TIMEOUT_SECONDS 를 넘으면 끊긴 연결로 보고 정리.
+
+토픽 구독: 접속 후 {"type": "SUBSCRIBE", "topics": ["stats", "raw-data", "device:3"]} 를 보내면
+해당 토픽 메시지만 수신 (UNSUBSCRIBE 로 해제, 응답은 SUBSCRIBED). 구독 메시지를 보내지 않은 연결은 기존처럼 전체 수신.
+- stats: 대시보드 숫자 갱신 (USER_VERIFIED, MEAL_LOG_CREATED, STATS_REFRESH, MEAL_LOG_VOIDED)
+- raw-data: 식수 기록 변경 (MEAL_LOG_CREATED, STATS_REFRESH, MEAL_LOG_VOIDED)
+- jobs: 백그라운드 작업 진행 (JOB_PROGRESS, app.core.jobs)
+- device:<qr_auth_id>: 해당 구역 QR 인증의 장치 트리거 (device 페이로드 포함 MEAL_LOG_CREATED).
+  QR ID 없는 레거시 스캔은 device:default, device:* 는 모든 구역.
+
+재접속 이어받기: publish 된 이벤트마다 프로세스별 stream(시작 시 무작위 id)과 단조 증가 seq 를 붙이고,
+최근 WS_REPLAY_BUFFER_SIZE 건을 링 버퍼에 보관. /api/admin/ws?since=<seq>&stream=<id>&topics=a,b 로 재접속하면
+WELCOME 뒤에 놓친 이벤트만 다시 보내고, 버퍼를 넘는 공백·stream 불일치(서버 재시작·다른 워커)면 RESYNC_REQUIRED 전송.
+
+다중 워커: publish 는 자기 소켓에 전달한 뒤 백플레인(app.core.event_backplane)으로 다른 워커에 보내고,
+각 워커는 받은 이벤트를 자기 소켓에 다시 전달. start() 는 앱 시작 시 한 번 호출.
+같은 백플레인으로 인증 캐시 무효화(app.core.principal_cache)도 워커끼리 주고받음."""
+import asyncio
 import json
+import logging
+import time
+import uuid
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from fastapi import WebSocket
+
+from app.core.config import settings
+from app.core import principal_cache
+from app.core.event_backplane import CONTROL_RESUBSCRIBED, InProcessBackplane, create_backplane
+from app.core.metrics import register_metrics
+
+logger = logging.getLogger(__name__)
+
+OVERFLOW_DROP_OLDEST = "drop_oldest"
+OVERFLOW_DISCONNECT = "disconnect"
+
+TOPIC_STATS = "stats"
+TOPIC_RAW_DATA = "raw-data"
+TOPIC_JOBS = "jobs"
+DEVICE_TOPIC_PREFIX = "device:"
+DEVICE_TOPIC_ALL = "device:*"
+DEVICE_TOPIC_DEFAULT = "device:default"
+MAX_TOPICS_PER_CONNECTION = 64
+
+
+def device_topic(qr_auth_id: Optional[int]) -> str:
+    return f"{DEVICE_TOPIC_PREFIX}{int(qr_auth_id)}" if qr_auth_id is not None else DEVICE_TOPIC_DEFAULT
+
+
+def _valid_topic(topic) -> bool:
+    if not isinstance(topic, str):
+        return False
+    if topic in (TOPIC_STATS, TOPIC_RAW_DATA, TOPIC_JOBS, DEVICE_TOPIC_ALL, DEVICE_TOPIC_DEFAULT):
+        return True
+    return topic.startswith(DEVICE_TOPIC_PREFIX) and topic[len(DEVICE_TOPIC_PREFIX):].isdigit()
+
+
+class _Client:
+    """연결 1개: 송신 큐·송신 태스크·지표."""
+
+    def __init__(self, websocket: WebSocket, maxsize: int):
+        self.websocket = websocket
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, maxsize))
+        self.task: asyncio.Task = None
+        # None: 구독 메시지를 보낸 적 없음 → 전체 수신 (기존 클라이언트 호환)
+        self.topics: Optional[Set[str]] = None
+        self.connected_at = time.time()
+        self.sent = 0
+        self.dropped = 0
+        self.max_depth = 0
+        self._latency_ms = deque(maxlen=200)
+
+    def wants(self, topics: Optional[Iterable[str]]) -> bool:
+        if self.topics is None or topics is None:
+            return True
+        for topic in topics:
+            if topic in self.topics:
+                return True
+            if topic.startswith(DEVICE_TOPIC_PREFIX) and DEVICE_TOPIC_ALL in self.topics:
+                return True
+        return False
+
+    def record_sent(self, enqueued_at: float) -> None:
+        self.sent += 1
+        self._latency_ms.append((time.perf_counter() - enqueued_at) * 1000)
+
+    def stats(self) -> Dict:
+        lat = sorted(self._latency_ms)
+        client = self.websocket.client
+        return {
+            "client": f"{client.host}:{client.port}" if client else None,
+            "connected_seconds": round(time.time() - self.connected_at, 1),
+            "topics": sorted(self.topics) if self.topics is not None else None,
+            "queue_depth": self.queue.qsize(),
+            "max_queue_depth": self.max_depth,
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "send_ms_avg": round(sum(lat) / len(lat), 2) if lat else 0.0,
+            "send_ms_p95": round(lat[max(0, int(len(lat) * 0.95) - 1)], 2) if lat else 0.0,
+            "send_ms_max": round(lat[-1], 2) if lat else 0.0,
+        }
+
 
 class ConnectionManager:
     def __init__(self):
-        self.active_connections: List[WebSocket] = []
+        self._clients: Dict[WebSocket, _Client] = {}
+        self.backplane = InProcessBackplane()
+        self.stream_id = uuid.uuid4().hex[:12]
+        self.seq = 0
+        # (seq, [(topics, 인코딩된 메시지), ...])
+        self._replay: deque = deque(maxlen=max(0, settings.WS_REPLAY_BUFFER_SIZE))
+        self.replayed = 0
+        self.resyncs = 0
+        self.broadcasts = 0
+        self.dropped = 0
+        self.overflow_disconnects = 0
+        self.send_failures = 0
+
+    @property
+    def active_connections(self) -> List[WebSocket]:
+        return list(self._clients)
+
+    async def start(self) -> None:
+        """설정된 백플레인 연결 (다른 워커 이벤트 → 이 프로세스 소켓으로 전달, 인증 캐시 무효화 송수신)."""
+        self.backplane = create_backplane()
+        await self.backplane.start(self.fan_out, self._on_control)
+        principal_cache.set_broadcaster(self.backplane.send_control)
 
-    async def connect(self, websocket: WebSocket):
+    def _on_control(self, message: dict) -> None:
+        """다른 워커의 제어 메시지."""
+        kind = message.get("type")
+        if kind == principal_cache.AUTH_INVALIDATE:
+            principal_cache.apply_remote_invalidation(message)
+        elif kind == CONTROL_RESUBSCRIBED:
+            principal_cache.clear_local()
+
+    async def connect(
+        self,
+        websocket: WebSocket,
+        topics: Optional[Iterable[str]] = None,
+        since: Optional[int] = None,
+        stream: Optional[str] = None,
+    ):
+        """접속 등록. since 가 있으면 놓친 이벤트 재전송 (불가하면 RESYNC_REQUIRED)."""
         await websocket.accept()
-        self.active_connections.append(websocket)
+        client = _Client(websocket, settings.WS_SEND_QUEUE_SIZE)
+        if topics is not None:
+            client.topics = {t for t in topics if _valid_topic(t)}
+        # 재전송분을 큐에 넣은 뒤 같은 동기 구간에서 등록 → 그 사이 이벤트 누락·중복 없음
+        missed = self._missed_events(client, since, stream) if since is not None else []
+        welcome = {"type": "WELCOME", "stream": self.stream_id, "seq": self.seq}
+        now = time.perf_counter()
+        if missed is None:
+            self.resyncs += 1
+            client.queue.put_nowait((now, json.dumps({**welcome, "type": "RESYNC_REQUIRED"})))
+        else:
+            client.queue.put_nowait((now, json.dumps({**welcome, "replay": len(missed)})))
+            for text in missed:
+                client.queue.put_nowait((now, text))
+            self.replayed += len(missed)
+        client.task = asyncio.get_running_loop().create_task(self._sender(client))
+        self._clients[websocket] = client
+
+    def _missed_events(self, client: _Client, since: int, stream: Optional[str]) -> Optional[List[str]]:
+        """since 이후 이 연결이 받았어야 할 이벤트. 버퍼로 메울 수 없으면 None."""
+        if (stream and stream != self.stream_id) or since > self.seq:
+            return None
+        if since == self.seq:
+            return []
+        if not self._replay or self._replay[0][0] > since + 1:
+            return None
+        out: List[str] = []
+        for seq, variants in self._replay:
+            if seq <= since:
+                continue
+            text = next((t for topics, t in variants if client.wants(topics)), None)
+            if text is not None:
+                out.append(text)
+        # WELCOME 자리 1개 제외하고 송신 큐에 다 들어가야 함
+        if len(out) >= client.queue.maxsize:
+            return None
+        return out
 
     def disconnect(self, websocket: WebSocket):
-        if websocket in self.active_connections:
-            self.active_connections.remove(websocket)
-
-    async def broadcast(self, message: dict):
-        # Convert dict to JSON string
-        json_msg = json.dumps(message)
-        dead_connections = []
-        for connection in self.active_connections:
-            try:
-                await connection.send_text(json_msg)
-            except Exception:
-                # Add to removal list if connection is dead/broken
-                dead_connections.append(connection)
-                
-        for connection in dead_connections:
-            self.disconnect(connection)
+        client = self._clients.pop(websocket, None)
+        if client is None:
+            return
+        if client.task is not None and client.task is not asyncio.current_task():
+            client.task.cancel()
+
+    async def _sender(self, client: _Client) -> None:
+        timeout = settings.WS_SEND_TIMEOUT_SECONDS
+        try:
+            while True:
+                enqueued_at, text = await client.queue.get()
+                await asyncio.wait_for(client.websocket.send_text(text), timeout if timeout > 0 else None)
+                client.record_sent(enqueued_at)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.send_failures += 1
+            logger.info("WebSocket send failed, closing connection: %s", e)
+            self.disconnect(client.websocket)
+            await self._close(client.websocket)
+
+    async def _close(self, websocket: WebSocket) -> None:
+        try:
+            await websocket.close()
+        except Exception:
+            pass
+
+    def _enqueue(self, client: _Client, item) -> bool:
+        """큐에 넣기. 넘침 정책상 연결을 끊어야 하면 False."""
+        q = client.queue
+        if q.full():
+            if settings.WS_OVERFLOW_POLICY == OVERFLOW_DISCONNECT:
+                return False
+            q.get_nowait()
+            client.dropped += 1
+            self.dropped += 1
+        q.put_nowait(item)
+        client.max_depth = max(client.max_depth, q.qsize())
+        return True
+
+    async def handle_message(self, websocket: WebSocket, text: str) -> None:
+        """클라이언트 수신 메시지 처리 (SUBSCRIBE / UNSUBSCRIBE). 그 외는 무시."""
+        client = self._clients.get(websocket)
+        if client is None:
+            return
+        try:
+            msg = json.loads(text)
+        except (json.JSONDecodeError, TypeError):
+            return
+        if not isinstance(msg, dict) or msg.get("type") not in ("SUBSCRIBE", "UNSUBSCRIBE"):
+            return
+        raw_topics = msg.get("topics")
+        topics = {t for t in raw_topics if _valid_topic(t)} if isinstance(raw_topics, list) else set()
+        current = set(client.topics or ())
+        if msg["type"] == "SUBSCRIBE":
+            current |= topics
+        else:
+            current -= topics
+        client.topics = set(sorted(current)[:MAX_TOPICS_PER_CONNECTION])
+        item = (time.perf_counter(), json.dumps({"type": "SUBSCRIBED", "topics": sorted(client.topics)}))
+        if not self._enqueue(client, item):
+            await self._drop_overflowed([client])
+
+    async def broadcast(self, message: dict, topics: Optional[Sequence[str]] = None):
+        """topics 중 하나라도 구독한 연결(및 구독하지 않은 연결)에 전송. topics=None 이면 모든 연결."""
+        await self.publish([(topics, message)])
+
+    async def publish(self, deliveries: Sequence[Tuple[Optional[Sequence[str]], dict]]):
+        """(토픽, 메시지) 목록 중 연결마다 처음 맞는 메시지 하나만 전송.
+        같은 이벤트를 구독자에 따라 다른 모양(예: 장치 구독자만 device 페이로드 포함)으로 보낼 때 사용.
+        이 프로세스 소켓에 전달 후 백플레인으로 다른 워커에도 발행."""
+        await self.fan_out(deliveries)
+        await self.backplane.publish(list(deliveries))
+
+    async def fan_out(self, deliveries: Sequence[Tuple[Optional[Sequence[str]], dict]]):
+        """이 프로세스 소켓에만 전달. seq·stream 을 붙여 재전송 버퍼에 보관."""
+        self.seq += 1
+        stamp = {"seq": self.seq, "stream": self.stream_id}
+        # 메시지마다 한 번만 인코딩해 해당 연결들이 같은 문자열 공유
+        variants = [(topics, json.dumps({**message, **stamp})) for topics, message in deliveries]
+        if self._replay.maxlen:
+            self._replay.append((self.seq, variants))
+        now = time.perf_counter()
+        encoded = [(now, text) for _, text in variants]
+        self.broadcasts += 1
+        overflowed = []
+        for client in list(self._clients.values()):
+            for i, (topics, _) in enumerate(variants):
+                if not client.wants(topics):
+                    continue
+                if not self._enqueue(client, encoded[i]):
+                    overflowed.append(client)
+                break
+        await self._drop_overflowed(overflowed)
+
+    async def _drop_overflowed(self, overflowed: List[_Client]) -> None:
+        for client in overflowed:
+            self.overflow_disconnects += 1
+            logger.warning("WebSocket send queue full, disconnecting slow client")
+            self.disconnect(client.websocket)
+            await self._close(client.websocket)
+
+    async def close(self) -> None:
+        """종료 시 백플레인·송신 태스크 정리."""
+        principal_cache.set_broadcaster(None)
+        await self.backplane.close()
+        clients = list(self._clients.values())
+        self._clients.clear()
+        for client in clients:
+            if client.task is not None:
+                client.task.cancel()
+        if clients:
+            await asyncio.gather(*(c.task for c in clients if c.task is not None), return_exceptions=True)
+
+    def stats(self) -> Dict:
+        return {
+            "connections": len(self._clients),
+            "queue_size": settings.WS_SEND_QUEUE_SIZE,
+            "overflow_policy": settings.WS_OVERFLOW_POLICY,
+            "broadcasts": self.broadcasts,
+            "dropped": self.dropped,
+            "overflow_disconnects": self.overflow_disconnects,
+            "send_failures": self.send_failures,
+            "stream": self.stream_id,
+            "seq": self.seq,
+            "replay_buffer": len(self._replay),
+            "replay_buffer_size": self._replay.maxlen,
+            "replayed": self.replayed,
+            "resyncs": self.resyncs,
+            "backplane": self.backplane.stats(),
+            "clients": [c.stats() for c in self._clients.values()],
+        }
+
 
 manager = ConnectionManager()
+register_metrics("websocket", manager.stats)
@@ -0,0 +1,367 @@
+"""감사 로그(audit_logs) 기록.
+
+- 작업자 확인: operator_id(employees.id FK) 존재 여부를 호출마다 SELECT 하던 것을 캐시(AUDIT_OPERATOR_CACHE_TTL_SECONDS).
+  없는 id 는 기존처럼 NULL 로 저장. 사원 완전 삭제·회사 삭제 시 invalidate_operator(s) 로 같은 프로세스 캐시 정리
+- record_many: 일괄 작업(일괄 취소 등)은 작업자 확인 1회 + 다중 행 INSERT 1회
+- 기본은 호출 측 트랜잭션에 함께 기록 (변경과 감사 행이 같이 커밋·롤백)
+- AUDIT_WRITE_BEHIND=True: 호출 측 세션에 모아 두었다가 커밋 후에만 큐로 넘기고(롤백되면 버림), 백그라운드 스레드가
+  AUDIT_BATCH_MAX_SIZE 건 / AUDIT_BATCH_MAX_WAIT_MS 마다 다중 행 INSERT.
+  DB 에 못 쓰거나 큐가 가득 차면 AUDIT_SPILL_PATH(JSON lines)에 fsync 로 남기고, 이후 배치 성공·재시작 때 다시 넣음.
+  다시 넣을 때 배치가 실패하면 한 행씩 넣어 보고, 연결 문제가 아닌 오류(FK·값 오류 등)로 실패한 행은
+  AUDIT_SPILL_PATH.rejected 로 옮겨 더 시도하지 않음 (뒤의 정상 행이 막히지 않게)
+- created_at 은 두 방식 모두 기록 요청 시각(KST naive, 다른 시각 컬럼과 같은 기준)을 직접 넣음 — DB 서버 시간대와 무관
+  커밋 후 프로세스가 비정상 종료되면 큐에 남은 행은 잃을 수 있음 (정상 종료 시 close 에서 모두 기록·보관)."""
+import glob
+import json
+import logging
+import os
+import queue
+import tempfile
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from sqlalchemy import event, insert, select
+from sqlalchemy.exc import DBAPIError, IntegrityError, OperationalError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.metrics import register_metrics
+from app.core.time_utils import kst_now_naive
+from app.core.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+_FIELDS = ("operator_id", "action", "target_table", "target_id", "before_value", "after_value", "reason")
+# 쓰기 지연 모드에서 커밋 전까지 감사 행을 모아 두는 Session.info 키
+_PENDING_KEY = "audit_log_rows"
+# 보관 파일 재입력 시도 최소 간격(초)
+_REPLAY_INTERVAL_SECONDS = 30.0
+
+
+def _row(entry: Dict[str, Any]) -> Dict[str, Any]:
+    return {name: entry.get(name) for name in _FIELDS}
+
+
+class AuditWriter:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._file_lock = threading.Lock()
+        self._operators = TTLCache(maxsize=4096, ttl=settings.AUDIT_OPERATOR_CACHE_TTL_SECONDS)
+        self._queue: "queue.Queue[Dict[str, Any]]" = queue.Queue(maxsize=max(1, settings.AUDIT_QUEUE_MAX))
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._last_replay = 0.0
+        self.recorded = 0
+        self.written = 0
+        self.batches = 0
+        self.spilled = 0
+        self.replayed = 0
+        self.rejected = 0
+
+    # --- 작업자 확인 ---
+
+    def _valid_operators(self, db: Session, ids: Set[int]) -> Set[int]:
+        from app.models.models import User
+
+        valid, missing = set(), []
+        for operator_id in ids:
+            known = self._operators.get(operator_id)
+            if known is None:
+                missing.append(operator_id)
+            elif known:
+                valid.add(operator_id)
+        if missing:
+            generation = self._operators.generation
+            try:
+                found = set(db.scalars(select(User.id).where(User.id.in_(missing))).all())
+            except Exception:
+                return valid  # 확인 실패 시 NULL 로 기록 (캐시에 남기지 않음)
+            for operator_id in missing:
+                self._operators.set(operator_id, operator_id in found, generation=generation)
+            valid |= found
+        return valid
+
+    def invalidate_operator(self, operator_id: int) -> None:
+        self._operators.pop(operator_id)
+
+    def invalidate_operators(self) -> None:
+        self._operators.clear()
+
+    # --- 기록 ---
+
+    def record_many(self, db: Session, entries: Iterable[Dict[str, Any]]) -> None:
+        """entries: operator_id·action·target_table·target_id·before_value·after_value·reason 키의 dict.
+        커밋은 호출 측."""
+        from app.models.models import AuditLog
+
+        rows = [_row(e) for e in entries]
+        if not rows:
+            return
+        valid = self._valid_operators(db, {r["operator_id"] for r in rows if r["operator_id"] is not None})
+        for r in rows:
+            if r["operator_id"] not in valid:
+                r["operator_id"] = None
+        now = kst_now_naive()
+        for r in rows:
+            r["created_at"] = now
+        with self._lock:
+            self.recorded += len(rows)
+        if settings.AUDIT_WRITE_BEHIND:
+            db.info.setdefault(_PENDING_KEY, []).extend(rows)
+            return
+        if len(rows) == 1:
+            db.add(AuditLog(**rows[0]))
+        else:
+            db.flush()  # 앞서 add 한 감사 행보다 먼저 들어가지 않게 (id 순서 = 기록 순서)
+            db.execute(insert(AuditLog), rows)
+
+    def enqueue(self, rows: List[Dict[str, Any]]) -> None:
+        """커밋된 감사 행을 쓰기 큐로. 큐가 가득 차면 기다리지 않고 보관 파일로."""
+        self._ensure_thread()
+        overflow = []
+        for r in rows:
+            try:
+                self._queue.put_nowait(r)
+            except queue.Full:
+                overflow.append(r)
+        if overflow:
+            self._spill(overflow)
+
+    # --- 백그라운드 쓰기 ---
+
+    def start(self) -> None:
+        """앱 시작 시. 쓰기 지연 모드이거나 보관 파일이 남아 있으면 스레드 시작 (보관 행 재입력 포함)."""
+        path = self._spill_path()
+        if settings.AUDIT_WRITE_BEHIND or os.path.exists(path) or glob.glob(f"{glob.escape(path)}.*.replaying"):
+            self._ensure_thread()
+
+    def _ensure_thread(self) -> None:
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name="audit-writer", daemon=True)
+            self._thread.start()
+
+    def _loop(self) -> None:
+        self._replay_leftovers()
+        self._maybe_replay(force=True)
+        while not self._stop.is_set():
+            try:
+                first = self._queue.get(timeout=1.0)
+            except queue.Empty:
+                self._maybe_replay()
+                continue
+            self._write(self._collect(first))
+
+    def _collect(self, first: Dict[str, Any]) -> List[Dict[str, Any]]:
+        batch = [first]
+        deadline = time.monotonic() + max(0, settings.AUDIT_BATCH_MAX_WAIT_MS) / 1000.0
+        while len(batch) < max(1, settings.AUDIT_BATCH_MAX_SIZE):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _insert(self, rows: List[Dict[str, Any]]) -> None:
+        """다중 행 INSERT (별도 트랜잭션). 그 사이 삭제된 작업자로 FK 오류가 나면 작업자 재확인 후 한 번 더."""
+        from app.core.database import engine
+        from app.models.models import AuditLog, User
+
+        table = AuditLog.__table__
+        try:
+            with engine.begin() as conn:
+                conn.execute(insert(table), rows)
+            return
+        except IntegrityError:
+            self.invalidate_operators()
+        with engine.begin() as conn:
+            ids = {r["operator_id"] for r in rows if r["operator_id"] is not None}
+            found = set(conn.scalars(select(User.id).where(User.id.in_(ids))).all()) if ids else set()
+            for r in rows:
+                if r["operator_id"] not in found:
+                    r["operator_id"] = None
+            conn.execute(insert(table), rows)
+
+    def _write(self, rows: List[Dict[str, Any]]) -> bool:
+        try:
+            self._insert(rows)
+        except Exception as e:
+            logger.warning("audit log batch insert failed (%s rows, spilled to file): %s", len(rows), e)
+            self._spill(rows)
+            return False
+        with self._lock:
+            self.written += len(rows)
+            self.batches += 1
+        self._maybe_replay()
+        return True
+
+    # --- 보관 파일 ---
+
+    def _spill_path(self) -> str:
+        return settings.AUDIT_SPILL_PATH or os.path.join(tempfile.gettempdir(), "meal_manage_audit_spill.jsonl")
+
+    @staticmethod
+    def _line(row: Dict[str, Any]) -> str:
+        created_at = row.get("created_at")
+        return json.dumps(
+            {**row, "created_at": created_at.isoformat() if created_at else None}, ensure_ascii=False, default=str,
+        ) + "\n"
+
+    def _append(self, path: str, lines: str) -> bool:
+        try:
+            with self._file_lock:
+                with open(path, "a", encoding="utf-8") as f:
+                    f.write(lines)
+                    f.flush()
+                    os.fsync(f.fileno())
+        except OSError as e:
+            logger.error("audit log file write failed (%s), rows lost: %s\n%s", path, e, lines)
+            return False
+        return True
+
+    def _spill(self, rows: List[Dict[str, Any]]) -> None:
+        if not self._append(self._spill_path(), "".join(self._line(r) for r in rows)):
+            return
+        with self._lock:
+            self.spilled += len(rows)
+
+    def _reject(self, lines: List[str]) -> None:
+        """다시 넣어도 계속 실패하는 행 → .rejected (재시도하지 않음, 운영자가 확인)."""
+        if lines and self._append(self._spill_path() + ".rejected", "".join(lines)):
+            with self._lock:
+                self.rejected += len(lines)
+
+    def _maybe_replay(self, force: bool = False) -> None:
+        now = time.monotonic()
+        if not force and now - self._last_replay < _REPLAY_INTERVAL_SECONDS:
+            return
+        self._last_replay = now
+        path = self._spill_path()
+        if not os.path.exists(path):
+            return
+        self._replay_file(path)
+
+    def _replay_leftovers(self) -> None:
+        """재입력 도중 종료돼 남은 파일 (다른 프로세스 것 포함)."""
+        for path in glob.glob(f"{glob.escape(self._spill_path())}.*.replaying"):
+            self._replay_file(path)
+
+    def _replay_file(self, path: str) -> None:
+        # 다른 워커와 같은 행을 두 번 넣지 않도록 파일을 이름 바꿔 먼저 가져감
+        claimed = f"{self._spill_path()}.{os.getpid()}.{threading.get_ident()}.replaying"
+        try:
+            os.replace(path, claimed)
+        except OSError:
+            return
+        rows, unreadable = [], []
+        with open(claimed, encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                    if row.get("created_at"):
+                        row["created_at"] = datetime.fromisoformat(row["created_at"])
+                except (ValueError, TypeError):
+                    logger.warning("audit spill: unreadable line moved to rejected: %s", line[:200])
+                    unreadable.append(line if line.endswith("\n") else line + "\n")
+                    continue
+                rows.append(row)
+        self._reject(unreadable)
+        done, keep = 0, []
+        size = max(1, settings.AUDIT_BATCH_MAX_SIZE)
+        for i in range(0, len(rows), size):
+            batch = rows[i:i + size]
+            try:
+                self._insert(batch)
+                done += len(batch)
+                continue
+            except Exception as e:
+                logger.warning("audit spill replay batch failed, retrying row by row: %s", e)
+            written, rest = self._insert_each(batch)
+            done += written
+            if rest:
+                # 연결 문제 → 이 배치의 남은 행과 뒤의 행은 다음 재입력 때
+                keep = rest + rows[i + size:]
+                break
+        if keep:
+            logger.warning("audit spill replay stopped (%s rows kept)", len(keep))
+            self._spill(keep)
+        os.remove(claimed)
+        if done:
+            logger.info("audit spill: replayed %s rows", done)
+            with self._lock:
+                self.replayed += done
+                self.written += done
+
+    def _insert_each(self, rows: List[Dict[str, Any]]):
+        """한 행씩 INSERT. 연결·잠금 문제(OperationalError, 끊긴 연결)면 멈추고 남은 행을 돌려줌,
+        그 밖의 오류로 실패한 행은 .rejected 로. (넣은 행 수, 남은 행)."""
+        written = 0
+        for n, row in enumerate(rows):
+            try:
+                self._insert([row])
+                written += 1
+            except Exception as e:
+                if isinstance(e, OperationalError) or (isinstance(e, DBAPIError) and e.connection_invalidated):
+                    return written, rows[n:]
+                logger.warning("audit spill: row rejected (%s): %s", e.__class__.__name__, e)
+                self._reject([self._line(row)])
+        return written, []
+
+    def close(self) -> None:
+        """종료 시 스레드를 멈추고 큐에 남은 행을 기록 (실패하면 보관 파일로)."""
+        thread = self._thread
+        if thread is None:
+            return
+        self._stop.set()
+        thread.join(timeout=5)
+        rows = []
+        while True:
+            try:
+                rows.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        size = max(1, settings.AUDIT_BATCH_MAX_SIZE)
+        for i in range(0, len(rows), size):
+            self._write(rows[i:i + size])
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            out = {
+                "write_behind": settings.AUDIT_WRITE_BEHIND,
+                "queued": self._queue.qsize(),
+                "recorded": self.recorded,
+                "written": self.written,
+                "batches": self.batches,
+                "spilled": self.spilled,
+                "replayed": self.replayed,
+                "rejected": self.rejected,
+            }
+        out["operators"] = self._operators.stats()
+        return out
+
+
+audit_writer = AuditWriter()
+register_metrics("audit_writer", audit_writer.stats)
+
+
+@event.listens_for(Session, "after_commit")
+def _enqueue_committed(session: Session) -> None:
+    rows = session.info.pop(_PENDING_KEY, None)
+    if rows:
+        audit_writer.enqueue(rows)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _discard_uncommitted(session: Session, transaction) -> None:
+    # 커밋 없이 끝난(롤백·close) 바깥 트랜잭션의 감사 행은 버림
+    if transaction.parent is None:
+        session.info.pop(_PENDING_KEY, None)
@@ -37,6 +37,45 @@ class Settings(BaseSettings):
     def normalize_database_url(cls, v: str) -> str:
         return _normalize_database_url(v) if isinstance(v, str) else v
     
+    # async 엔진 (선택). 비우면 DATABASE_URL 에서 유도 (mysql+aiomysql / sqlite+aiosqlite)
+    ASYNC_DB_ENABLED: bool = True
+    ASYNC_DATABASE_URL: str = ""
+    ASYNC_DB_POOL_SIZE: int = 20
+    ASYNC_DB_MAX_OVERFLOW: int = 20
+    # async 엔진이 없을 때 get_async_db 동시 세션 상한 (동기 엔진 기본 풀 5 + overflow 10)
+    DB_THREADPOOL_SESSION_LIMIT: int = 15
+
+    # 오늘 대시보드 메모리 카운터를 DB 재집계로 맞추는 주기(초). 0이면 날짜가 바뀔 때만 재집계
+    LIVE_COUNTERS_RECONCILE_SECONDS: int = 60
+
+    # 마감된 기간(어제 이전) 보고서 결과 캐시. 디렉터리 비우면 시스템 임시 폴더 아래, 메모리는 건수·바이트 상한 LRU
+    REPORT_CACHE_ENABLED: bool = True
+    REPORT_CACHE_DIR: str = ""
+    REPORT_CACHE_MAX_ENTRIES: int = 256
+    REPORT_CACHE_MEMORY_MAX_BYTES: int = 32 * 1024 * 1024
+    REPORT_CACHE_DISK_MAX_BYTES: int = 512 * 1024 * 1024
+
+    # QR 스캔 MealLog 그룹 커밋 (동시 스캔을 모아 다중 행 INSERT 1회). 기본 꺼짐
+    MEAL_LOG_BATCH_ENABLED: bool = False
+    MEAL_LOG_BATCH_MAX_SIZE: int = 50
+    MEAL_LOG_BATCH_MAX_WAIT_MS: int = 5
+
+    # QR 스캔 중복 방지: Idempotency-Key 응답 보관 기간, 같은 사원·식사 재스캔 억제 창(초, 0이면 억제 안 함)
+    SCAN_IDEMPOTENCY_TTL_SECONDS: int = 60 * 60 * 24
+    SCAN_IDEMPOTENCY_MAX_ENTRIES: int = 20000
+    SCAN_SUPPRESS_WINDOW_SECONDS: int = 0
+
+    # WebSocket 브로드캐스트: 연결별 송신 큐 크기, 넘칠 때 정책(drop_oldest | disconnect), 전송 1건 제한 시간(초)
+    WS_SEND_QUEUE_SIZE: int = 256
+    WS_OVERFLOW_POLICY: str = "drop_oldest"
+    WS_SEND_TIMEOUT_SECONDS: float = 5.0
+    # 재접속(?since=) 시 다시 보낼 최근 이벤트 수
+    WS_REPLAY_BUFFER_SIZE: int = 1000
+    # 다중 워커 WebSocket 백플레인. 비우면 단일 프로세스. redis://[:pw@]host:6379 또는 unix:///tmp/meal_ws.sock
+    WS_BACKPLANE_URL: str = ""
+    WS_BACKPLANE_CHANNEL: str = "meal_manage:ws"
+    WS_BACKPLANE_QUEUE_SIZE: int = 1000
+
     # JWT
     SECRET_KEY: str = _DEFAULT_SECRET_KEY
     ALGORITHM: str = "HS256"
@@ -55,6 +94,44 @@ class Settings(BaseSettings):
     # 경광등 (Q라이트). DB 장치 설정에서 우선 사용
     QLIGHT_HOST: str = ""
     QLIGHT_PORT: int = 20000
+    # QR 스캔 라우팅 테이블(프로세스 로컬) 재구성 주기(초). 같은 프로세스의 변경은 즉시 반영, 0이면 주기 재구성 안 함
+    QR_ROUTING_TTL_SECONDS: int = 30
+    # 식사 정책 판정 배열(프로세스 로컬) 재구성 주기(초). 0이면 주기 재구성 안 함
+    POLICY_RESOLVER_TTL_SECONDS: int = 30
+    # 인증 사원·관리자 스냅샷 캐시 (get_current_user/get_current_admin). TTL 0이면 캐시 안 함.
+    # 다중 워커는 WS_BACKPLANE_URL 로 무효화를 공유, 백플레인 없이 여러 워커면 퇴사·기기 초기화가 다른 워커에 최대 TTL 만큼 늦게 반영
+    AUTH_CACHE_TTL_SECONDS: int = 60
+    AUTH_CACHE_MAX_ENTRIES: int = 10000
+    # 사원 이름·사번 검색 색인(프로세스 로컬) 재구성 주기(초). 같은 프로세스의 변경은 즉시 반영, 0이면 주기 재구성 안 함
+    EMPLOYEE_SEARCH_TTL_SECONDS: int = 60
+    # 일치 사원이 이보다 많으면 IN (...) 대신 LIKE 하위 조회로 검색
+    EMPLOYEE_SEARCH_MAX_IN_IDS: int = 2000
+    # 백그라운드 작업 (엑셀 일괄 등록·보고서 엑셀·일괄 취소). 작업 스레드 수, 결과 파일 디렉터리(비우면 임시 디렉터리)
+    JOB_WORKERS: int = 2
+    JOB_RESULT_DIR: str = ""
+    # 끝난 작업 행·결과 파일 보관(초), 진행률 DB 기록·JOB_PROGRESS 발행 최소 간격(초)
+    JOB_RETENTION_SECONDS: int = 24 * 3600
+    JOB_PROGRESS_INTERVAL_SECONDS: float = 0.5
+    # 이 시간 동안 진행 기록이 없는 대기·실행 작업은 중단(서버 재시작 등)으로 보고 FAILED 처리
+    JOB_STALE_SECONDS: int = 900
+    # 목록 델타 동기화(?since=): 커밋 지연을 감안해 워터마크를 현재보다 이만큼(초) 이전으로 유지
+    SYNC_WATERMARK_LAG_SECONDS: int = 5
+    # 삭제 기록(sync_tombstones) 보관 일수. 이보다 오래된 since 는 전체 목록으로 응답
+    SYNC_TOMBSTONE_RETENTION_DAYS: int = 30
+    # 비밀번호 해시(bcrypt) 비용. 바꾸면 기존 해시는 다음 로그인 때 새 비용으로 다시 해시
+    BCRYPT_ROUNDS: int = 10
+    # bcrypt 계산 전용 프로세스 수 (0이면 프로세스 없이 스레드에서 계산), 대기 포함 동시 처리 한도 (넘으면 429)
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_PENDING: int = 16
+    # 감사 로그 작업자 id(employees.id) 존재 확인 캐시(초). 호출마다 하던 SELECT 대신
+    AUDIT_OPERATOR_CACHE_TTL_SECONDS: int = 300
+    # 감사 로그 쓰기 지연: 커밋된 변경의 감사 행을 백그라운드 스레드가 모아 다중 행 INSERT (끄면 변경과 같은 트랜잭션에 기록)
+    AUDIT_WRITE_BEHIND: bool = False
+    AUDIT_BATCH_MAX_SIZE: int = 500
+    AUDIT_BATCH_MAX_WAIT_MS: int = 200
+    AUDIT_QUEUE_MAX: int = 10000
+    # DB 에 못 쓴 감사 행을 보관했다가 다시 넣을 파일 (JSON lines, 비우면 임시 디렉터리 meal_manage_audit_spill.jsonl)
+    AUDIT_SPILL_PATH: str = ""
     
     @model_validator(mode="after")
     def require_secrets_in_production(self):
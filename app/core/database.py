@@ -1,7 +1,14 @@
+import logging
+from typing import Optional
+
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, Session, DeclarativeBase
+import anyio
+from starlette.concurrency import run_in_threadpool
 from .config import settings
 
+logger = logging.getLogger(__name__)
+
 try:
     engine = create_engine(
         settings.DATABASE_URL,
@@ -39,3 +46,107 @@ def get_db():
         raise
     finally:
         db.close()
+
+
+def async_database_url(url: str) -> Optional[str]:
+    """동기 URL → async 드라이버 URL. mysql+pymysql → mysql+aiomysql, sqlite → sqlite+aiosqlite."""
+    u = (url or "").strip()
+    if u.startswith("mysql+pymysql://"):
+        return "mysql+aiomysql://" + u[len("mysql+pymysql://") :]
+    if u.startswith("sqlite://") and not u.startswith("sqlite+"):
+        return "sqlite+aiosqlite://" + u[len("sqlite://") :]
+    return None
+
+
+def _create_async_sessionmaker():
+    """async 엔진(선택). ASYNC_DB_ENABLED=False 이거나 드라이버(aiomysql/aiosqlite, greenlet) 미설치면 None."""
+    if not settings.ASYNC_DB_ENABLED:
+        return None, None
+    url = settings.ASYNC_DATABASE_URL or async_database_url(settings.DATABASE_URL)
+    if not url:
+        return None, None
+    try:
+        import greenlet  # noqa: F401 — AsyncSession 이 내부적으로 사용
+        from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+        kwargs = {"echo": False, "pool_pre_ping": True}
+        if not url.startswith("sqlite"):
+            kwargs.update(
+                pool_recycle=300,
+                pool_size=settings.ASYNC_DB_POOL_SIZE,
+                max_overflow=settings.ASYNC_DB_MAX_OVERFLOW,
+            )
+        eng = create_async_engine(url, **kwargs)
+    except Exception as e:
+        logger.warning("[DB] async engine unavailable, falling back to threadpool sessions: %s", e)
+        return None, None
+    return eng, async_sessionmaker(bind=eng, autoflush=False, expire_on_commit=False)
+
+
+async_engine, AsyncSessionLocal = _create_async_sessionmaker()
+
+
+class ThreadpoolAsyncSession:
+    """async 엔진이 없을 때 get_async_db 대체. 동기 세션 호출을 스레드풀에서 실행 (기존 sync 라우트와 동일한 비용).
+    AsyncSession 에서 라우트가 쓰는 메서드만 같은 시그니처로 제공."""
+
+    def __init__(self, session: Session):
+        self.sync_session = session
+
+    def add(self, instance) -> None:
+        self.sync_session.add(instance)
+
+    async def execute(self, statement, *args, **kwargs):
+        return await run_in_threadpool(self.sync_session.execute, statement, *args, **kwargs)
+
+    async def scalar(self, statement, *args, **kwargs):
+        return await run_in_threadpool(self.sync_session.scalar, statement, *args, **kwargs)
+
+    async def run_sync(self, fn, *args, **kwargs):
+        return await run_in_threadpool(fn, self.sync_session, *args, **kwargs)
+
+    async def flush(self) -> None:
+        await run_in_threadpool(self.sync_session.flush)
+
+    async def refresh(self, instance) -> None:
+        await run_in_threadpool(self.sync_session.refresh, instance)
+
+    async def commit(self) -> None:
+        await run_in_threadpool(self.sync_session.commit)
+
+    async def rollback(self) -> None:
+        await run_in_threadpool(self.sync_session.rollback)
+
+    async def close(self) -> None:
+        await run_in_threadpool(self.sync_session.close)
+
+
+# 대체 경로에서 한 요청의 세션 작업이 여러 스레드풀 호출로 나뉘므로, 동시 세션 수를 커넥션 풀 크기 이하로 제한
+# (스레드가 전부 커넥션 대기에 묶여 커밋·반환할 스레드가 없는 교착 방지). 대기는 이벤트 루프에서.
+_threadpool_session_slots = anyio.Semaphore(settings.DB_THREADPOOL_SESSION_LIMIT)
+
+
+async def get_async_db():
+    """async 라우트용 세션. async 엔진이 있으면 AsyncSession, 없으면 ThreadpoolAsyncSession."""
+    if AsyncSessionLocal is not None:
+        db = AsyncSessionLocal()
+        try:
+            yield db
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
+        finally:
+            await db.close()
+        return
+
+    async with _threadpool_session_slots:
+        db = ThreadpoolAsyncSession(SessionLocal())
+        try:
+            yield db
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
+        finally:
+            await db.close()
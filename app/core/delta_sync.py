@@ -0,0 +1,135 @@
+"""사원·부서·회사·식사 정책 목록 델타 동기화 (GET 목록 ?since=워터마크).
+
+PC 앱은 화면 전환·회사 변경 때마다 목록 전체를 다시 받았으므로, since 를 주면 바뀐 것만 보냄:
+- rows: updated_at >= since 인 행 (워터마크 시각의 행은 다음 번에 다시 올 수 있음 → 클라이언트는 id 로 덮어쓰기)
+- deleted: since 이후 삭제된 id (sync_tombstones)
+- watermark: 다음 요청의 since. 아직 커밋 전일 수 있는 최근 SYNC_WATERMARK_LAG_SECONDS 는 넘지 않음
+- full: since 가 비었거나 삭제 기록 보관 기간보다 오래돼 전체 목록을 보낸 경우 (클라이언트는 캐시 교체)
+ETag 는 목록 버전(행 수·최대 updated_at·최근 삭제 시각·워터마크)으로 만들어, If-None-Match 가 맞으면 행을 읽지 않고 304.
+updated_at 은 ORM·Core UPDATE 시 자동 갱신 (models onupdate). 연쇄 삭제는 삭제하는 쪽에서 record_deletes 로 남김."""
+import hashlib
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, Optional
+
+from fastapi import HTTPException
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.metrics import register_metrics
+from app.core.time_utils import KST, kst_now_naive
+
+# 워터마크 기준 최솟값 (updated_at 이 모두 NULL 인 예전 행만 있을 때)
+_EPOCH = datetime(2000, 1, 1)
+
+
+class _DeltaStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.not_modified = 0
+        self.full = 0
+        self.rows = 0
+        self.deleted = 0
+
+    def add(self, **counts: int) -> None:
+        with self._lock:
+            for name, n in counts.items():
+                setattr(self, name, getattr(self, name) + n)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "not_modified": self.not_modified,
+                "full": self.full,
+                "rows": self.rows,
+                "deleted": self.deleted,
+            }
+
+
+delta_stats = _DeltaStats()
+register_metrics("delta_sync", delta_stats.stats)
+
+
+def parse_since(value: Optional[str]) -> Optional[datetime]:
+    """since 쿼리값 → KST naive. 빈 값이면 None (전체)."""
+    value = (value or "").strip()
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="since 형식이 올바르지 않습니다. (응답의 watermark 값을 사용)")
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(KST).replace(tzinfo=None)
+    return parsed
+
+
+def record_deletes(db: Session, entity: str, ids: Iterable[int]) -> None:
+    """삭제된 id 기록 (삭제와 같은 트랜잭션, 커밋은 호출 측). 보관 기간 지난 기록은 함께 정리."""
+    from app.models.models import SyncTombstone
+
+    ids = [int(i) for i in ids]
+    if not ids:
+        return
+    now = kst_now_naive()
+    cutoff = now - timedelta(days=max(1, settings.SYNC_TOMBSTONE_RETENTION_DAYS))
+    db.execute(delete(SyncTombstone).where(SyncTombstone.deleted_at < cutoff))
+    db.execute(
+        insert(SyncTombstone),
+        [{"entity": entity, "entity_id": i, "deleted_at": now} for i in ids],
+    )
+
+
+def _etag(*parts: Any) -> str:
+    digest = hashlib.sha1(repr(parts).encode("utf-8")).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def _not_modified(request, etag: str) -> bool:
+    inm = request.headers.get("if-none-match")
+    if not inm:
+        return False
+    return etag in {t.strip() for t in inm.split(",")}
+
+
+def delta_response(request, db: Session, entity: str, model, schema, since: Optional[str], *criteria, options=()):
+    """목록 델타 응답 (JSONResponse 또는 304). criteria 는 목록 기본 조건 (예: 시스템 계정 제외)."""
+    from fastapi import Response
+    from fastapi.responses import JSONResponse
+
+    from app.models.models import SyncTombstone
+
+    since_at = parse_since(since)
+    now = kst_now_naive()
+    count, newest_row = db.execute(select(func.count(model.id), func.max(model.updated_at)).where(*criteria)).one()
+    newest_delete = db.execute(
+        select(func.max(SyncTombstone.deleted_at)).where(SyncTombstone.entity == entity)
+    ).scalar()
+    newest = max((t for t in (newest_row, newest_delete) if t is not None), default=_EPOCH)
+    watermark = min(newest, now - timedelta(seconds=max(0, settings.SYNC_WATERMARK_LAG_SECONDS)))
+    etag = _etag(entity, count, newest_row, newest_delete, watermark)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if _not_modified(request, etag):
+        delta_stats.add(requests=1, not_modified=1)
+        return Response(status_code=304, headers=headers)
+
+    retention = timedelta(days=max(1, settings.SYNC_TOMBSTONE_RETENTION_DAYS))
+    full = since_at is None or since_at < now - retention
+    query = select(model).where(*criteria).options(*options).order_by(model.id)
+    deleted = []
+    if not full:
+        query = query.where(model.updated_at >= since_at)
+        deleted = db.scalars(
+            select(SyncTombstone.entity_id)
+            .where(SyncTombstone.entity == entity, SyncTombstone.deleted_at >= since_at)
+            .distinct()
+        ).all()
+    rows = [schema.model_validate(row).model_dump(mode="json") for row in db.scalars(query).unique()]
+    delta_stats.add(requests=1, full=int(full), rows=len(rows), deleted=len(deleted))
+    return JSONResponse(
+        {"rows": rows, "deleted": sorted(deleted), "watermark": watermark.isoformat(), "full": full},
+        headers=headers,
+    )
@@ -0,0 +1,182 @@
+"""사원 이름·사번 검색 색인 (프로세스 로컬).
+
+User.name / User.emp_no icontains (LIKE '%q%') 는 인덱스를 못 타 매번 users 전체 스캔이므로,
+사원 전체를 메모리에 1·2글자 n-gram 역색인으로 두고 검색어 → 사원 id 집합을 먼저 구한 뒤 user_id IN (...) 으로 조회.
+- 일치 규칙은 기존과 같음: 이름 또는 사번에 검색어 포함 (대소문자 무시, 앞뒤 공백 무시)
+- 검색어가 한글 초성(ㄱ~ㅎ)으로만 되어 있으면 이름 초성에서도 찾음 (예: ㅎㄱㄷ → 홍길동)
+사원 등록·수정·삭제 커밋 직후 index_user / unindex_user, 엑셀 일괄 등록은 전체 재구성.
+다른 워커의 변경은 EMPLOYEE_SEARCH_TTL_SECONDS 마다 재구성해 맞춤."""
+import logging
+import threading
+import time as _time
+from collections import defaultdict
+from typing import Any, Dict, Optional, Set, Tuple
+
+from sqlalchemy import or_, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.metrics import register_metrics
+
+logger = logging.getLogger(__name__)
+
+_CHOSEONG = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+_CHOSEONG_SET = frozenset(_CHOSEONG)
+_HANGUL_FIRST, _HANGUL_LAST = 0xAC00, 0xD7A3
+
+
+def choseong(text: str) -> str:
+    """한글 음절은 초성으로, 나머지 글자는 그대로."""
+    return "".join(
+        _CHOSEONG[(ord(ch) - _HANGUL_FIRST) // 588] if _HANGUL_FIRST <= ord(ch) <= _HANGUL_LAST else ch
+        for ch in text
+    )
+
+
+def is_choseong_query(q: str) -> bool:
+    return bool(q) and all(ch in _CHOSEONG_SET for ch in q)
+
+
+def _grams(text: str) -> Set[str]:
+    """1글자 + 2글자 n-gram."""
+    out = set(text)
+    out.update(text[i:i + 2] for i in range(len(text) - 1))
+    return out
+
+
+class EmployeeSearchIndex:
+    def __init__(self, built_at: float = 0.0):
+        self.built_at = built_at
+        self._lock = threading.Lock()
+        # id → (이름 소문자, 사번 소문자, 이름 초성)
+        self._docs: Dict[int, Tuple[str, str, str]] = {}
+        self._postings: Dict[str, Set[int]] = defaultdict(set)
+        self.searches = 0
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def _remove_locked(self, user_id: int) -> None:
+        doc = self._docs.pop(user_id, None)
+        if doc is None:
+            return
+        for gram in _grams(doc[0]) | _grams(doc[1]) | _grams(doc[2]):
+            ids = self._postings.get(gram)
+            if ids is not None:
+                ids.discard(user_id)
+                if not ids:
+                    del self._postings[gram]
+
+    def upsert(self, user_id: int, name: Optional[str], emp_no: Optional[str]) -> None:
+        name_l, emp_l = (name or "").lower(), (emp_no or "").lower()
+        doc = (name_l, emp_l, choseong(name_l))
+        with self._lock:
+            self._remove_locked(int(user_id))
+            self._docs[int(user_id)] = doc
+            for gram in _grams(doc[0]) | _grams(doc[1]) | _grams(doc[2]):
+                self._postings[gram].add(int(user_id))
+
+    def remove(self, user_id: int) -> None:
+        with self._lock:
+            self._remove_locked(int(user_id))
+
+    def search(self, q: str) -> Set[int]:
+        """이름·사번(초성 검색어면 이름 초성 포함)에 q 가 들어 있는 사원 id 집합."""
+        q = (q or "").strip().lower()
+        if not q:
+            return set()
+        keys = [q] if len(q) == 1 else [q[i:i + 2] for i in range(len(q) - 1)]
+        cho = is_choseong_query(q)
+        with self._lock:
+            self.searches += 1
+            postings = sorted((self._postings.get(k, ()) for k in set(keys)), key=len)
+            if not postings or not postings[0]:
+                return set()
+            candidates = set(postings[0]).intersection(*postings[1:])
+            if len(q) == 1:
+                return candidates
+            return {
+                uid for uid in candidates
+                if q in self._docs[uid][0] or q in self._docs[uid][1] or (cho and q in self._docs[uid][2])
+            }
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"employees": len(self._docs), "grams": len(self._postings), "searches": self.searches}
+
+
+_lock = threading.Lock()
+_index: Optional[EmployeeSearchIndex] = None
+
+
+def _is_fresh(index: Optional[EmployeeSearchIndex]) -> bool:
+    if index is None:
+        return False
+    ttl = settings.EMPLOYEE_SEARCH_TTL_SECONDS
+    return ttl <= 0 or (_time.monotonic() - index.built_at) < ttl
+
+
+def rebuild_employee_index(db: Session) -> EmployeeSearchIndex:
+    """users 전체(id·이름·사번)로 색인을 새로 만들어 교체. 시작 시·엑셀 일괄 등록 직후 호출."""
+    global _index
+    from app.models.models import User
+
+    index = EmployeeSearchIndex(built_at=_time.monotonic())
+    for user_id, name, emp_no in db.execute(select(User.id, User.name, User.emp_no)).yield_per(5000):
+        index.upsert(user_id, name, emp_no)
+    with _lock:
+        _index = index
+    logger.info("Employee search index rebuilt: %s employees", len(index))
+    return index
+
+
+def get_employee_index(db: Session) -> EmployeeSearchIndex:
+    """현재 색인. 없거나 TTL 경과 시에만 DB에서 재구성."""
+    index = _index
+    if _is_fresh(index):
+        return index
+    return rebuild_employee_index(db)
+
+
+def index_user(user_id: int, name: Optional[str], emp_no: Optional[str]) -> None:
+    """사원 등록·이름/사번 변경 커밋 직후 반영. 색인이 아직 없으면 다음 검색 때 만듦."""
+    index = _index
+    if index is not None:
+        index.upsert(user_id, name, emp_no)
+
+
+def unindex_user(user_id: int) -> None:
+    index = _index
+    if index is not None:
+        index.remove(user_id)
+
+
+def invalidate_employee_index() -> None:
+    """사원이 연쇄 삭제되는 경우(회사 삭제 등). 다음 검색 때 재구성."""
+    global _index
+    with _lock:
+        _index = None
+
+
+def user_search_clause(db: Session, q: str, column):
+    """검색어 → column(User.id 또는 MealLog.user_id) IN (일치 사원 id) 조건.
+    일치 사원이 EMPLOYEE_SEARCH_MAX_IN_IDS 를 넘는 짧은 검색어는 긴 IN 목록 대신 기존 LIKE 하위 조회 사용."""
+    from app.models.models import User
+
+    ids = get_employee_index(db).search(q)
+    if len(ids) > settings.EMPLOYEE_SEARCH_MAX_IN_IDS and not is_choseong_query(q.strip()):
+        q = q.strip()
+        return column.in_(select(User.id).where(or_(User.name.icontains(q), User.emp_no.icontains(q))))
+    return column.in_(sorted(ids))
+
+
+def _stats() -> Dict[str, Any]:
+    index = _index
+    out: Dict[str, Any] = {"built": index is not None, "ttl_seconds": settings.EMPLOYEE_SEARCH_TTL_SECONDS}
+    if index is not None:
+        out.update(index.stats())
+        out["age_seconds"] = round(_time.monotonic() - index.built_at, 1)
+    return out
+
+
+register_metrics("employee_search", _stats)
@@ -0,0 +1,302 @@
+"""WebSocket 이벤트 백플레인 (다중 워커·다중 레플리카용 pub/sub).
+
+ConnectionManager.publish 는 자기 프로세스 소켓에 바로 전달하고, 백플레인으로 다른 워커에도 이벤트를 보냄.
+다른 워커가 보낸 이벤트를 받으면 각자 자기 소켓으로 다시 전달(re-fan-out). 자기 이벤트는 origin 으로 걸러냄.
+소켓으로 보내지 않는 워커 간 제어 메시지(인증 캐시 무효화 등)는 send_control → 다른 워커의 on_control 로 전달.
+- WS_BACKPLANE_URL 비움(기본): InProcessBackplane — 단일 프로세스, 기존 동작과 동일
+- redis://[:password@]host:port : Redis PUBLISH/SUBSCRIBE (RESP 직접 구현, 추가 패키지 없음)
+- unix:///path/to.sock : 같은 호스트 워커끼리 로컬 소켓 (ws_backplane_server.py 를 그 경로로 실행)
+백플레인이 끊겨도 로컬 전달은 계속되고, 다른 워커로 가는 이벤트만 재연결 전까지 버려짐."""
+import asyncio
+import json
+import logging
+import os
+import socket
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from urllib.parse import unquote, urlparse
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# [(topics | None, message), ...] — ConnectionManager.publish 인자와 같은 모양
+Deliveries = List[Tuple[Optional[List[str]], Dict[str, Any]]]
+EventHandler = Callable[[Deliveries], Awaitable[None]]
+# 제어 메시지 {"type": ..., ...} 처리 (이벤트 루프에서 동기 호출)
+ControlHandler = Callable[[Dict[str, Any]], None]
+
+# 구독 연결이 끊겼다 다시 붙으면 on_control 로 전달 (끊긴 동안 놓친 제어 메시지가 있을 수 있음)
+CONTROL_RESUBSCRIBED = "BACKPLANE_RESUBSCRIBED"
+
+_RECONNECT_MAX_SECONDS = 10.0
+
+
+# --- RESP (Redis 직렬화 프로토콜) ---
+
+def encode_command(*args) -> bytes:
+    out = [b"*%d\r\n" % len(args)]
+    for a in args:
+        b = a if isinstance(a, bytes) else str(a).encode("utf-8")
+        out.append(b"$%d\r\n%s\r\n" % (len(b), b))
+    return b"".join(out)
+
+
+class RespError(Exception):
+    pass
+
+
+async def read_resp(reader: asyncio.StreamReader):
+    """응답 1개 읽기. bulk string 은 bytes, 오류 응답은 RespError 인스턴스로 반환."""
+    line = await reader.readline()
+    if not line:
+        raise ConnectionError("backplane connection closed")
+    prefix, body = line[:1], line[1:].rstrip(b"\r\n")
+    if prefix == b"+":
+        return body.decode("utf-8", "replace")
+    if prefix == b"-":
+        return RespError(body.decode("utf-8", "replace"))
+    if prefix == b":":
+        return int(body)
+    if prefix == b"$":
+        n = int(body)
+        if n < 0:
+            return None
+        data = await reader.readexactly(n + 2)
+        return data[:-2]
+    if prefix == b"*":
+        n = int(body)
+        if n < 0:
+            return None
+        return [await read_resp(reader) for _ in range(n)]
+    # 인라인 명령 (예: telnet 으로 PING)
+    return [part.encode("utf-8") for part in line.decode("utf-8", "replace").split()]
+
+
+async def open_backplane_connection(url: str) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+    """redis://[:password@]host:port 또는 unix:///path 연결. 비밀번호가 있으면 AUTH."""
+    parsed = urlparse(url)
+    if parsed.scheme == "unix":
+        reader, writer = await asyncio.open_unix_connection(parsed.path)
+    elif parsed.scheme in ("redis", "tcp"):
+        reader, writer = await asyncio.open_connection(parsed.hostname or "127.0.0.1", parsed.port or 6379)
+    else:
+        raise ValueError(f"지원하지 않는 백플레인 URL: {url}")
+    if parsed.password:
+        writer.write(encode_command("AUTH", unquote(parsed.password)))
+        await writer.drain()
+        reply = await read_resp(reader)
+        if isinstance(reply, RespError):
+            writer.close()
+            raise ConnectionError(f"backplane AUTH failed: {reply}")
+    return reader, writer
+
+
+# --- 백플레인 구현 ---
+
+class InProcessBackplane:
+    """단일 프로세스: 다른 워커가 없으므로 전달할 곳 없음."""
+
+    name = "in-process"
+
+    async def start(self, on_event: EventHandler, on_control: Optional[ControlHandler] = None) -> None:
+        pass
+
+    async def publish(self, deliveries: Deliveries) -> None:
+        pass
+
+    def send_control(self, message: Dict[str, Any]) -> None:
+        pass
+
+    async def close(self) -> None:
+        pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": self.name}
+
+
+class RedisBackplane:
+    """Redis 프로토콜 PUBLISH/SUBSCRIBE. 발행은 큐에 넣고 전용 태스크가 전송해 요청 경로를 막지 않음."""
+
+    name = "redis"
+
+    def __init__(self, url: str, channel: str, queue_size: int = 1000):
+        self.url = url
+        self.channel = channel
+        self.origin = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self._outbox: asyncio.Queue = None
+        self._queue_size = max(1, queue_size)
+        self._tasks: List[asyncio.Task] = []
+        self._on_event: Optional[EventHandler] = None
+        self._on_control: Optional[ControlHandler] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.connected_pub = False
+        self.connected_sub = False
+        self.published = 0
+        self.received = 0
+        self.dropped = 0
+        self.errors = 0
+
+    async def start(self, on_event: EventHandler, on_control: Optional[ControlHandler] = None) -> None:
+        self._on_event = on_event
+        self._on_control = on_control
+        self._outbox = asyncio.Queue(maxsize=self._queue_size)
+        self._loop = loop = asyncio.get_running_loop()
+        self._tasks = [loop.create_task(self._publisher()), loop.create_task(self._subscriber())]
+
+    async def publish(self, deliveries: Deliveries) -> None:
+        self._enqueue(json.dumps({"origin": self.origin, "deliveries": deliveries}))
+
+    def send_control(self, message: Dict[str, Any]) -> None:
+        """제어 메시지 발행. 동기 라우트·작업 스레드에서도 호출 가능 (이벤트 루프로 넘겨 큐에 넣음)."""
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        payload = json.dumps({"origin": self.origin, "control": message})
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            self._enqueue(payload)
+            return
+        try:
+            loop.call_soon_threadsafe(self._enqueue, payload)
+        except RuntimeError:  # 종료 중 닫힌 루프
+            pass
+
+    def _enqueue(self, payload: str) -> None:
+        if self._outbox is None:
+            return
+        try:
+            self._outbox.put_nowait(payload)
+        except asyncio.QueueFull:
+            self.dropped += 1
+
+    async def _publisher(self) -> None:
+        delay = 0.5
+        while True:
+            writer = None
+            try:
+                reader, writer = await open_backplane_connection(self.url)
+                self.connected_pub = True
+                delay = 0.5
+                while True:
+                    payload = await self._outbox.get()
+                    writer.write(encode_command("PUBLISH", self.channel, payload))
+                    await writer.drain()
+                    reply = await read_resp(reader)
+                    if isinstance(reply, RespError):
+                        self.errors += 1
+                        logger.warning("backplane PUBLISH error: %s", reply)
+                    else:
+                        self.published += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.errors += 1
+                logger.warning("backplane publisher disconnected (%s), retry in %.1fs", e, delay)
+            finally:
+                self.connected_pub = False
+                if writer is not None:
+                    writer.close()
+            # 끊긴 동안 쌓인 이벤트는 버림 (재연결 후 오래된 장치 트리거가 몰려가지 않도록)
+            while not self._outbox.empty():
+                self._outbox.get_nowait()
+                self.dropped += 1
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, _RECONNECT_MAX_SECONDS)
+
+    async def _subscriber(self) -> None:
+        delay = 0.5
+        subscribed_before = False
+        while True:
+            writer = None
+            try:
+                reader, writer = await open_backplane_connection(self.url)
+                writer.write(encode_command("SUBSCRIBE", self.channel))
+                await writer.drain()
+                self.connected_sub = True
+                delay = 0.5
+                if subscribed_before:
+                    self._control({"type": CONTROL_RESUBSCRIBED})
+                subscribed_before = True
+                while True:
+                    msg = await read_resp(reader)
+                    if isinstance(msg, list) and len(msg) == 3 and msg[0] == b"message":
+                        await self._dispatch(msg[2])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.errors += 1
+                logger.warning("backplane subscriber disconnected (%s), retry in %.1fs", e, delay)
+            finally:
+                self.connected_sub = False
+                if writer is not None:
+                    writer.close()
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, _RECONNECT_MAX_SECONDS)
+
+    async def _dispatch(self, raw: bytes) -> None:
+        try:
+            event = json.loads(raw)
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            return
+        if not isinstance(event, dict) or event.get("origin") == self.origin:
+            return
+        self.received += 1
+        if "control" in event:
+            if isinstance(event["control"], dict):
+                self._control(event["control"])
+            return
+        try:
+            await self._on_event([(topics, message) for topics, message in event.get("deliveries") or []])
+        except Exception as e:
+            logger.warning("backplane event fan-out failed: %s", e)
+
+    def _control(self, message: Dict[str, Any]) -> None:
+        if self._on_control is None:
+            return
+        try:
+            self._on_control(message)
+        except Exception as e:
+            logger.warning("backplane control message failed: %s", e)
+
+    async def close(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": self.name,
+            "url": _redact(self.url),
+            "channel": self.channel,
+            "origin": self.origin,
+            "connected_publisher": self.connected_pub,
+            "connected_subscriber": self.connected_sub,
+            "published": self.published,
+            "received": self.received,
+            "dropped": self.dropped,
+            "errors": self.errors,
+            "outbox": self._outbox.qsize() if self._outbox is not None else 0,
+        }
+
+
+def _redact(url: str) -> str:
+    parsed = urlparse(url)
+    if parsed.password:
+        return url.replace(parsed.password, "***")
+    return url
+
+
+def create_backplane():
+    """설정(WS_BACKPLANE_URL)에 맞는 백플레인."""
+    url = (settings.WS_BACKPLANE_URL or "").strip()
+    if not url:
+        return InProcessBackplane()
+    if urlparse(url).scheme not in ("redis", "tcp", "unix"):
+        raise ValueError(f"지원하지 않는 백플레인 URL: {_redact(url)}")
+    return RedisBackplane(url, settings.WS_BACKPLANE_CHANNEL, settings.WS_BACKPLANE_QUEUE_SIZE)
@@ -0,0 +1,305 @@
+"""백그라운드 작업 실행기 (사원 엑셀 일괄 등록·보고서 엑셀·식수 기록 일괄 취소 등 오래 걸리는 작업).
+
+HTTP 요청은 작업을 등록(background_jobs 행 QUEUED)하고 job_id 를 바로 돌려주며, 실제 작업은 JOB_WORKERS 개 스레드 풀에서 실행.
+- 상태·진행률·결과(JSON)는 background_jobs 에 기록 → GET /api/admin/jobs/{id} 는 어느 워커에서나 조회
+- 결과 파일(엑셀 등)은 JOB_RESULT_DIR 에 두고 GET /api/admin/jobs/{id}/result 로 받음 (같은 디렉터리를 보는 워커끼리 공유)
+- 진행 상황은 JOB_PROGRESS_INTERVAL_SECONDS 간격으로 WebSocket JOB_PROGRESS 메시지(토픽 jobs) 발행, 시작·종료는 항상 발행
+- 서버 재시작 등으로 JOB_STALE_SECONDS 동안 기록이 없는 대기·실행 작업은 조회 시 FAILED 로 정리.
+  살아 있는 워커는 자기 작업의 updated_at 을 JOB_STALE_SECONDS/3 마다 갱신(하트비트)하므로 느린 작업은 정리되지 않음
+- 끝난 지 JOB_RETENTION_SECONDS 지난 작업 행·결과 파일은 새 작업 등록 시 삭제
+작업 함수는 fn(ctx: JobContext, **params) 형태, 반환값(dict)이 result. 예외는 FAILED (HTTPException 이면 detail 을 오류로)."""
+import asyncio
+import logging
+import os
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import timedelta
+from typing import Any, Callable, Dict, Optional, Sequence
+
+from fastapi import HTTPException
+from sqlalchemy import and_, delete, select, update
+
+from app.core.config import settings
+from app.core.metrics import register_metrics
+from app.core.time_utils import kst_now
+
+logger = logging.getLogger(__name__)
+
+STATUS_QUEUED = "QUEUED"
+STATUS_RUNNING = "RUNNING"
+STATUS_SUCCEEDED = "SUCCEEDED"
+STATUS_FAILED = "FAILED"
+FINISHED_STATUSES = (STATUS_SUCCEEDED, STATUS_FAILED)
+
+
+def _now():
+    return kst_now().replace(tzinfo=None)
+
+
+def _error_text(e: Exception) -> str:
+    detail = getattr(e, "detail", None)
+    text = detail if isinstance(detail, str) else (str(detail) if detail is not None else str(e))
+    return (text or e.__class__.__name__)[:1000]
+
+
+def job_payload(job) -> Dict[str, Any]:
+    """BackgroundJob 행 → API 응답·JOB_PROGRESS 데이터."""
+    from app.core.time_utils import utc_to_kst_str
+
+    return {
+        "id": job.id,
+        "kind": job.kind,
+        "status": job.status,
+        "done": int(job.done or 0),
+        "total": job.total,
+        "message": job.message,
+        "result": job.result,
+        "error": job.error,
+        "has_file": bool(job.result_path),
+        "created_at": utc_to_kst_str(job.created_at),
+        "started_at": utc_to_kst_str(job.started_at),
+        "finished_at": utc_to_kst_str(job.finished_at),
+    }
+
+
+class JobContext:
+    """작업 함수에 넘기는 실행 정보. db 는 이 작업 전용 세션 (작업이 끝나면 닫힘)."""
+
+    def __init__(self, runner: "JobRunner", job_id: str, kind: str, db):
+        self.runner = runner
+        self.job_id = job_id
+        self.kind = kind
+        self.db = db
+        self._last_report = 0.0
+        self._file: Optional[tuple] = None
+
+    def progress(self, done: int, total: Optional[int] = None, message: Optional[str] = None) -> None:
+        """진행률 기록. JOB_PROGRESS_INTERVAL_SECONDS 보다 잦은 호출은 건너뜀 (끝(done == total)은 항상 기록)."""
+        now = time.monotonic()
+        if now - self._last_report < settings.JOB_PROGRESS_INTERVAL_SECONDS and (total is None or done < total):
+            return
+        self._last_report = now
+        values = {"done": int(done)}
+        if total is not None:
+            values["total"] = int(total)
+        if message is not None:
+            values["message"] = message[:255]
+        self.runner._update(self.job_id, **values)
+
+    def result_file(self, filename: str, media_type: str) -> str:
+        """결과 파일을 쓸 경로 (JOB_RESULT_DIR/<job_id>.<확장자>). 작업이 성공하면 /jobs/{id}/result 로 제공."""
+        directory = self.runner.result_dir()
+        path = os.path.join(directory, f"{self.job_id}{os.path.splitext(filename)[1]}")
+        self._file = (path, filename, media_type)
+        return path
+
+    def publish(self, message: dict, topics: Optional[Sequence[str]] = None) -> None:
+        """작업 스레드에서 WebSocket 이벤트 발행 (예: 일괄 취소 후 STATS_REFRESH)."""
+        self.runner.publish(message, topics)
+
+
+class JobRunner:
+    def __init__(self):
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
+        self._futures: Dict[str, Future] = {}
+        self._dir: Optional[str] = None
+        self._heartbeat: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.submitted = 0
+        self.succeeded = 0
+        self.failed = 0
+
+    def start(self, loop: asyncio.AbstractEventLoop) -> None:
+        """앱 시작 시 이벤트 루프 등록 (작업 스레드 → WebSocket 발행용)."""
+        self._loop = loop
+
+    def result_dir(self) -> str:
+        if self._dir is None:
+            path = settings.JOB_RESULT_DIR or os.path.join(tempfile.gettempdir(), "meal_manage_jobs")
+            os.makedirs(path, exist_ok=True)
+            self._dir = path
+        return self._dir
+
+    def _pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=max(1, settings.JOB_WORKERS), thread_name_prefix="job"
+                )
+            if settings.JOB_STALE_SECONDS > 0 and (self._heartbeat is None or not self._heartbeat.is_alive()):
+                self._stop.clear()
+                self._heartbeat = threading.Thread(target=self._heartbeat_loop, name="job-heartbeat", daemon=True)
+                self._heartbeat.start()
+            return self._executor
+
+    # --- 등록·실행 ---
+
+    def submit(self, db, kind: str, fn: Callable[..., Optional[dict]], created_by: Optional[int] = None,
+               **params) -> Dict[str, Any]:
+        """작업 등록 후 바로 반환 (job_payload). fn(ctx, **params) 는 작업 스레드에서 실행."""
+        from app.models.models import BackgroundJob
+
+        self._prune(db)
+        now = _now()
+        job = BackgroundJob(
+            id=uuid.uuid4().hex, kind=kind, status=STATUS_QUEUED, done=0,
+            created_by=created_by, created_at=now, updated_at=now,
+        )
+        db.add(job)
+        db.commit()
+        payload = job_payload(job)
+        future = self._pool().submit(self._run, job.id, kind, fn, params)
+        with self._lock:
+            self._futures[job.id] = future
+            self.submitted += 1
+        future.add_done_callback(lambda _f, job_id=job.id: self._forget(job_id))
+        self.publish_progress(payload)
+        return payload
+
+    def _forget(self, job_id: str) -> None:
+        with self._lock:
+            self._futures.pop(job_id, None)
+
+    def _run(self, job_id: str, kind: str, fn, params: Dict[str, Any]) -> None:
+        from app.core.database import SessionLocal
+
+        db = SessionLocal()
+        ctx = JobContext(self, job_id, kind, db)
+        try:
+            self._update(job_id, status=STATUS_RUNNING, started_at=_now())
+            result = fn(ctx, **params)
+        except Exception as e:
+            db.rollback()
+            if isinstance(e, HTTPException) and e.status_code < 500:
+                logger.warning("job %s (%s) rejected: %s", job_id, kind, e.detail)
+            else:
+                logger.exception("job %s (%s) failed", job_id, kind)
+            with self._lock:
+                self.failed += 1
+            self._update(job_id, status=STATUS_FAILED, error=_error_text(e), finished_at=_now())
+            return
+        finally:
+            db.close()
+        values = {"status": STATUS_SUCCEEDED, "result": result, "finished_at": _now()}
+        if ctx._file is not None and os.path.exists(ctx._file[0]):
+            values.update(result_path=ctx._file[0], result_filename=ctx._file[1], result_media_type=ctx._file[2])
+        with self._lock:
+            self.succeeded += 1
+        self._update(job_id, **values)
+
+    def _heartbeat_loop(self) -> None:
+        """이 프로세스가 맡은(대기·실행 중) 작업의 updated_at 갱신 — 진행률 기록이 뜸한 작업이 다른 워커에서 FAILED 로 정리되지 않게."""
+        from app.core.database import engine
+        from app.models.models import BackgroundJob
+
+        while not self._stop.wait(max(1.0, settings.JOB_STALE_SECONDS / 3)):
+            with self._lock:
+                job_ids = list(self._futures)
+            if not job_ids:
+                continue
+            try:
+                with engine.begin() as conn:
+                    conn.execute(
+                        update(BackgroundJob)
+                        .where(BackgroundJob.id.in_(job_ids), BackgroundJob.status.notin_(FINISHED_STATUSES))
+                        .values(updated_at=_now())
+                    )
+            except Exception as e:
+                logger.warning("job heartbeat failed: %s", e)
+
+    def _update(self, job_id: str, **values) -> None:
+        """상태 행 갱신(작업 트랜잭션과 별도 연결) 후 JOB_PROGRESS 발행."""
+        from app.core.database import engine
+        from app.models.models import BackgroundJob
+
+        values["updated_at"] = _now()
+        try:
+            with engine.begin() as conn:
+                conn.execute(update(BackgroundJob).where(BackgroundJob.id == job_id).values(**values))
+                row = conn.execute(select(BackgroundJob).where(BackgroundJob.id == job_id)).first()
+        except Exception as e:
+            logger.warning("job %s status update failed: %s", job_id, e)
+            return
+        if row is not None:
+            self.publish_progress(job_payload(row))
+
+    # --- 조회·정리 ---
+
+    def expire_stale(self, db, job) -> None:
+        """이 프로세스에서 돌고 있지 않고 JOB_STALE_SECONDS 동안 기록 없는 대기·실행 작업 → FAILED."""
+        if job is None or job.status in FINISHED_STATUSES or settings.JOB_STALE_SECONDS <= 0:
+            return
+        with self._lock:
+            if job.id in self._futures:
+                return
+        if job.updated_at is not None and _now() - job.updated_at < timedelta(seconds=settings.JOB_STALE_SECONDS):
+            return
+        job.status = STATUS_FAILED
+        job.error = "작업이 중단되었습니다 (서버 재시작 등). 다시 실행하세요."
+        job.finished_at = job.updated_at = _now()
+        db.commit()
+
+    def _prune(self, db) -> None:
+        from app.models.models import BackgroundJob
+
+        cutoff = _now() - timedelta(seconds=max(0, settings.JOB_RETENTION_SECONDS))
+        old = and_(BackgroundJob.status.in_(FINISHED_STATUSES), BackgroundJob.finished_at < cutoff)
+        paths = db.scalars(select(BackgroundJob.result_path).where(old, BackgroundJob.result_path.isnot(None))).all()
+        db.execute(delete(BackgroundJob).where(old))
+        db.commit()
+        for path in paths:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    # --- WebSocket ---
+
+    def publish(self, message: dict, topics: Optional[Sequence[str]] = None) -> None:
+        """작업·요청 스레드에서 이벤트 루프로 넘겨 발행. 루프가 없으면(스크립트 등) 생략."""
+        from app.api.websocket import manager
+
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(manager.broadcast(message, topics), loop)
+        except RuntimeError:
+            pass
+
+    def publish_progress(self, payload: Dict[str, Any]) -> None:
+        from app.api.websocket import TOPIC_JOBS
+
+        self.publish({"type": "JOB_PROGRESS", "data": payload}, (TOPIC_JOBS,))
+
+    def close(self) -> None:
+        """종료 시 아직 시작하지 않은 작업 취소 (FAILED 기록), 실행 중인 작업은 기다리지 않음."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+            pending = [job_id for job_id, f in self._futures.items() if not f.running() and not f.done()]
+        self._stop.set()
+        if executor is None:
+            return
+        executor.shutdown(wait=False, cancel_futures=True)
+        for job_id in pending:
+            self._update(job_id, status=STATUS_FAILED, error="서버 종료로 취소되었습니다.", finished_at=_now())
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            active = len(self._futures)
+        return {
+            "workers": settings.JOB_WORKERS,
+            "active": active,
+            "submitted": self.submitted,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+        }
+
+
+job_runner = JobRunner()
+register_metrics("jobs", job_runner.stats)
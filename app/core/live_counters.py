@@ -0,0 +1,124 @@
+"""오늘(KST) 대시보드 실시간 카운터 (프로세스 로컬).
+
+policy_id 별 (식수 기록 건수, 동반 인원 합) 을 메모리에 두고, 식수 기록 생성·취소·수정·삭제 커밋 직후 증감.
+/stats/today 는 DB 대신 여기서 응답. 처음 조회·날짜 변경 시 DB 집계 1회로 채우고,
+다른 워커의 변경·재집계 도중 커밋된 건 등 어긋난 부분은 LIVE_COUNTERS_RECONCILE_SECONDS 마다 DB 재집계로 맞춤.
+사원·회사·정책 삭제처럼 식수 기록이 연쇄 삭제되는 경우는 invalidate() 로 다음 조회 때 재집계."""
+import logging
+import threading
+import time
+from datetime import date, datetime
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import and_, func, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.metrics import register_metrics
+from app.core.time_utils import kst_today
+
+logger = logging.getLogger(__name__)
+
+# policy_id → (건수, 동반 인원 합). None 키 = 정책 없는(번외) 기록
+DayCounts = Dict[Optional[int], Tuple[int, int]]
+
+
+def load_day_counts(db: Session, day: date) -> DayCounts:
+    """해당 일자(meal_date, KST) 취소 제외 기록을 policy_id 별로 한 번에 집계 (ix_meal_logs_meal_date)."""
+    from app.models.models import MealLog
+
+    rows = db.execute(
+        select(
+            MealLog.policy_id,
+            func.count(MealLog.id),
+            func.coalesce(func.sum(MealLog.guest_count), 0),
+        )
+        .where(
+            and_(
+                MealLog.meal_date == day,
+                MealLog.is_void == False,
+            )
+        )
+        .group_by(MealLog.policy_id)
+    ).all()
+    return {pid: (int(cnt or 0), int(guests or 0)) for pid, cnt, guests in rows}
+
+
+class LiveCounterStore:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._day: Optional[date] = None
+        self._counts: Dict[Optional[int], list] = {}
+        self._seeded_at = 0.0
+        self.seeds = 0
+        self.applied = 0
+        self.served = 0
+        self.last_drift = 0
+
+    def snapshot(self) -> Optional[DayCounts]:
+        """오늘 카운터. 채워진 적 없거나 날짜가 바뀌었거나 재집계 주기가 지났으면 None (seed 필요)."""
+        ttl = settings.LIVE_COUNTERS_RECONCILE_SECONDS
+        with self._lock:
+            if self._day != kst_today():
+                return None
+            if ttl > 0 and time.monotonic() - self._seeded_at >= ttl:
+                return None
+            self.served += 1
+            return {pid: (c[0], c[1]) for pid, c in self._counts.items()}
+
+    def seed(self, db: Session) -> DayCounts:
+        """DB 집계로 오늘 카운터를 교체하고 반환. 같은 날 재집계면 메모리와의 차이를 drift 로 기록."""
+        day = kst_today()
+        counts = load_day_counts(db, day)
+        with self._lock:
+            if self._day == day:
+                self.last_drift = sum(
+                    abs(counts.get(pid, (0, 0))[0] - self._counts.get(pid, (0, 0))[0])
+                    for pid in set(counts) | set(self._counts)
+                )
+                if self.last_drift:
+                    logger.info("live counters reconciled: drift=%s", self.last_drift)
+            self._day = day
+            self._counts = {pid: [c, g] for pid, (c, g) in counts.items()}
+            self._seeded_at = time.monotonic()
+            self.seeds += 1
+        return counts
+
+    def apply(
+        self, created_at: Optional[datetime], policy_id: Optional[int], count: int, guests: int
+    ) -> Optional[Dict[str, Any]]:
+        """커밋된 변경 반영. created_at(KST naive) 이 오늘이면 대시보드 증감분(stats_delta) 반환, 아니면 None."""
+        if created_at is None or (count == 0 and guests == 0):
+            return None
+        day = created_at.date()
+        if day != kst_today():
+            return None
+        with self._lock:
+            if self._day == day:
+                entry = self._counts.setdefault(policy_id, [0, 0])
+                entry[0] += count
+                entry[1] += guests
+                self.applied += 1
+        return {"date": day.isoformat(), "policy_id": policy_id, "count": count, "guests": guests}
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._day = None
+            self._counts = {}
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "day": self._day.isoformat() if self._day else None,
+                "policies": len(self._counts),
+                "age_seconds": round(time.monotonic() - self._seeded_at, 1) if self._day else None,
+                "reconcile_seconds": settings.LIVE_COUNTERS_RECONCILE_SECONDS,
+                "seeds": self.seeds,
+                "applied": self.applied,
+                "served": self.served,
+                "last_drift": self.last_drift,
+            }
+
+
+live_counters = LiveCounterStore()
+register_metrics("live_counters", live_counters.stats)
@@ -0,0 +1,188 @@
+"""MealLog 그룹 커밋 파이프라인 (선택, MEAL_LOG_BATCH_ENABLED).
+
+동시에 들어온 QR 스캔의 MealLog 를 MEAL_LOG_BATCH_MAX_WAIT_MS 동안(또는 MEAL_LOG_BATCH_MAX_SIZE 건까지)
+모아 다중 행 INSERT 1회 + 커밋 1회로 저장하고, 생성된 id 를 각 요청에 돌려줌.
+- RETURNING 지원 DB(SQLite 3.35+, MariaDB 10.5+, PostgreSQL): insertmanyvalues + RETURNING 으로 id 수집
+- MySQL: 다중 행 INSERT 후 LAST_INSERT_ID() 부터 연속 id (InnoDB 는 행 수가 정해진 simple insert 에 연속 값 할당)
+배치 INSERT 가 실패하면 행별로 다시 넣어 실패한 요청만 오류 처리.
+Idempotency-Key 가 있는 스캔은 meal_scan_idempotency 행도 같은 트랜잭션에서 INSERT (유일 제약 위반이면 그 요청만 IntegrityError)."""
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import insert, text
+from sqlalchemy.engine import Connection
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.meal_rollups import add_log_delta, apply_rollup_deltas, department_ids_for
+from app.core.metrics import register_metrics
+from app.core.scan_dedup import idempotency_values
+
+logger = logging.getLogger(__name__)
+
+
+def _insert_rows(
+    conn: Connection, rows: List[Dict[str, Any]], idempotency: Optional[List[Optional[tuple]]] = None,
+) -> List[int]:
+    """한 트랜잭션 안에서 rows 를 INSERT(+ 보고서용 일별 집계 증감) 하고 입력 순서대로 id 반환.
+    idempotency[i] = (user_id, 키, 응답(log_id 제외)) 이면 그 행의 meal_scan_idempotency 도 함께 INSERT."""
+    ids = _insert_meal_logs(conn, rows)
+    idem_rows = []
+    for log_id, idem in zip(ids, idempotency or ()):
+        if idem is not None:
+            user_id, key, response = idem
+            idem_rows.append(idempotency_values(user_id, key, log_id, {**response, "log_id": log_id}))
+    if idem_rows:
+        from app.models.models import MealScanIdempotency
+
+        conn.execute(insert(MealScanIdempotency.__table__), idem_rows)
+    return ids
+
+
+def _insert_meal_logs(conn: Connection, rows: List[Dict[str, Any]]) -> List[int]:
+    from app.models.models import MealLog
+
+    depts = department_ids_for(conn, (r.get("user_id") for r in rows))
+    rollup: Dict[Any, list] = {}
+    for r in rows:
+        add_log_delta(rollup, r, depts.get(r.get("user_id")))
+    apply_rollup_deltas(conn, rollup)
+
+    table = MealLog.__table__
+    dialect = conn.dialect
+    if dialect.insert_executemany_returning_sort_by_parameter_order:
+        result = conn.execute(
+            insert(table).returning(table.c.id, sort_by_parameter_order=True),
+            rows,
+        )
+        return [int(r[0]) for r in result.all()]
+    if len(rows) == 1:
+        return [int(conn.execute(insert(table).values(rows[0])).inserted_primary_key[0])]
+    conn.execute(insert(table).values(rows))
+    first_id = int(conn.execute(text("SELECT LAST_INSERT_ID()")).scalar_one())
+    return list(range(first_id, first_id + len(rows)))
+
+
+class MealLogBatchWriter:
+    def __init__(self, max_batch: int, max_wait_ms: float):
+        self.max_batch = max(1, int(max_batch))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+        self._pending: List[Tuple[Dict[str, Any], Optional[tuple], asyncio.Future]] = []
+        self._timer: Optional[asyncio.Task] = None
+        self._inflight: set = set()
+        # 메트릭
+        self.batches = 0
+        self.rows = 0
+        self.max_batch_seen = 0
+        self.failed_batches = 0
+        self._batch_sizes = deque(maxlen=1000)
+        self._commit_ms = deque(maxlen=1000)
+
+    async def submit(self, values: Dict[str, Any], idempotency: Optional[tuple] = None) -> int:
+        """MealLog 컬럼 값 dict → 커밋된 id. 배치에 실려 커밋될 때까지 대기.
+        idempotency=(user_id, 키, 응답(log_id 제외)) 이면 키 행도 같은 트랜잭션에 (이미 있으면 IntegrityError)."""
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        self._pending.append((values, idempotency, fut))
+        if len(self._pending) >= self.max_batch:
+            self._start_flush()
+        elif self._timer is None:
+            self._timer = loop.create_task(self._flush_after_wait())
+        return await fut
+
+    async def _flush_after_wait(self) -> None:
+        try:
+            await asyncio.sleep(self.max_wait)
+        finally:
+            self._timer = None
+        self._start_flush()
+
+    def _start_flush(self) -> None:
+        if not self._pending:
+            return
+        batch, self._pending = self._pending[: self.max_batch], self._pending[self.max_batch :]
+        task = asyncio.get_running_loop().create_task(self._flush(batch))
+        self._inflight.add(task)
+        task.add_done_callback(self._inflight.discard)
+        if self._pending and self._timer is None:
+            self._timer = asyncio.get_running_loop().create_task(self._flush_after_wait())
+
+    async def _execute(self, rows: List[Dict[str, Any]], idempotency: List[Optional[tuple]]) -> List[int]:
+        from app.core.database import async_engine, engine
+
+        if async_engine is not None:
+            async with async_engine.begin() as conn:
+                return await conn.run_sync(_insert_rows, rows, idempotency)
+
+        def _run():
+            with engine.begin() as conn:
+                return _insert_rows(conn, rows, idempotency)
+
+        return await run_in_threadpool(_run)
+
+    async def _flush(self, batch: List[Tuple[Dict[str, Any], Optional[tuple], asyncio.Future]]) -> None:
+        rows = [values for values, _, _ in batch]
+        idempotency = [idem for _, idem, _ in batch]
+        t0 = time.perf_counter()
+        try:
+            ids = await self._execute(rows, idempotency)
+        except Exception as e:
+            self.failed_batches += 1
+            logger.warning("meal_log batch insert failed (%s rows), retrying per row: %s", len(rows), e)
+            for values, idem, fut in batch:
+                t_row = time.perf_counter()
+                try:
+                    (log_id,) = await self._execute([values], [idem])
+                    # 행별 재시도도 1건짜리 커밋으로 메트릭 기록
+                    self._record(1, (time.perf_counter() - t_row) * 1000)
+                    if not fut.done():
+                        fut.set_result(log_id)
+                except Exception as row_err:
+                    if not fut.done():
+                        fut.set_exception(row_err)
+            return
+        self._record(len(rows), (time.perf_counter() - t0) * 1000)
+        for (_, _, fut), log_id in zip(batch, ids):
+            if not fut.done():
+                fut.set_result(log_id)
+
+    def _record(self, size: int, commit_ms: float) -> None:
+        self.batches += 1
+        self.rows += size
+        self.max_batch_seen = max(self.max_batch_seen, size)
+        self._batch_sizes.append(size)
+        self._commit_ms.append(commit_ms)
+
+    async def close(self) -> None:
+        """종료 시 대기 중인 행을 모두 커밋."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        while self._pending:
+            self._start_flush()
+        if self._inflight:
+            await asyncio.gather(*list(self._inflight), return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        sizes = list(self._batch_sizes)
+        lat = sorted(self._commit_ms)
+        return {
+            "enabled": settings.MEAL_LOG_BATCH_ENABLED,
+            "max_batch": self.max_batch,
+            "max_wait_ms": round(self.max_wait * 1000, 1),
+            "batches": self.batches,
+            "rows": self.rows,
+            "failed_batches": self.failed_batches,
+            "pending": len(self._pending),
+            "avg_batch_size": round(sum(sizes) / len(sizes), 2) if sizes else 0.0,
+            "max_batch_size": self.max_batch_seen,
+            "commit_ms_avg": round(sum(lat) / len(lat), 2) if lat else 0.0,
+            "commit_ms_p95": round(lat[max(0, int(len(lat) * 0.95) - 1)], 2) if lat else 0.0,
+        }
+
+
+meal_log_writer = MealLogBatchWriter(settings.MEAL_LOG_BATCH_MAX_SIZE, settings.MEAL_LOG_BATCH_MAX_WAIT_MS)
+register_metrics("meal_log_writer", meal_log_writer.stats)
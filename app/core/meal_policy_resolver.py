@@ -0,0 +1,141 @@
+"""식사 시각 → 식사 정책 판정 (프로세스 로컬 캐시).
+
+활성 MealPolicy 를 하루 1440분 슬롯 배열로 미리 펼쳐 두고, 시각 판정은 배열 인덱스 한 번으로 처리.
+- start_time > end_time 이면 자정을 넘는 구간(야식(심야)/야식(새벽) 등): [start, 24:00) + [00:00, end]
+- 분 단위 해상도: start_time·end_time 이 속한 분 전체를 포함
+- 구간이 겹치면 id 가 작은(먼저 등록된) 정책 우선 — 기존 rows[0] 동작과 동일
+정책 생성·수정·삭제 커밋 직후 재구성. 다중 워커 대비로 POLICY_RESOLVER_TTL_SECONDS 경과 시 재구성."""
+import logging
+import threading
+import time as _time
+from dataclasses import dataclass
+from datetime import datetime, time, timedelta
+from typing import Iterable, List, Optional, Tuple, Union
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+MINUTES_PER_DAY = 24 * 60
+
+
+@dataclass(frozen=True)
+class PolicySnapshot:
+    """판정 결과. 세션과 무관한 값 복사본이라 요청 간 공유 가능."""
+    id: int
+    meal_type: Optional[str]
+    start_time: time
+    end_time: time
+    base_price: int
+    guest_price: int
+
+
+def _coerce_time(v) -> Optional[time]:
+    """MySQL TIME 이 timedelta 로 오는 경우 포함."""
+    if v is None:
+        return None
+    if isinstance(v, time):
+        return v
+    if isinstance(v, timedelta):
+        sec = int(v.total_seconds()) % 86400
+        h, rem = divmod(sec, 3600)
+        m, s = divmod(rem, 60)
+        return time(h, m, s)
+    return None
+
+
+def minute_of_day(t: Union[time, datetime]) -> int:
+    return t.hour * 60 + t.minute
+
+
+def policy_minute_ranges(start: time, end: time) -> List[Tuple[int, int]]:
+    """정책 구간을 [시작분, 끝분] (양끝 포함) 목록으로. 자정을 넘으면 두 구간."""
+    s, e = minute_of_day(start), minute_of_day(end)
+    if s <= e:
+        return [(s, e)]
+    return [(s, MINUTES_PER_DAY - 1), (0, e)]
+
+
+class MealPolicyResolver:
+    def __init__(self, policies: Iterable[PolicySnapshot], built_at: float = 0.0):
+        self.policies = tuple(sorted(policies, key=lambda p: p.id))
+        self.built_at = built_at
+        slots: List[Optional[PolicySnapshot]] = [None] * MINUTES_PER_DAY
+        for p in self.policies:
+            for lo, hi in policy_minute_ranges(p.start_time, p.end_time):
+                for m in range(lo, hi + 1):
+                    if slots[m] is None:
+                        slots[m] = p
+        self._slots = tuple(slots)
+
+    def resolve(self, t: Union[time, datetime]) -> Optional[PolicySnapshot]:
+        """시각(KST) → 해당 정책. 식사 시간이 아니면 None."""
+        return self._slots[minute_of_day(t)]
+
+    def get(self, policy_id: int) -> Optional[PolicySnapshot]:
+        return next((p for p in self.policies if p.id == policy_id), None)
+
+
+def load_policy_snapshots(db: Session) -> List[PolicySnapshot]:
+    from app.models.models import MealPolicy
+
+    out: List[PolicySnapshot] = []
+    for p in db.scalars(select(MealPolicy).where(MealPolicy.is_active == True)).all():
+        start, end = _coerce_time(p.start_time), _coerce_time(p.end_time)
+        if start is None or end is None:
+            continue
+        out.append(
+            PolicySnapshot(
+                id=int(p.id),
+                meal_type=p.meal_type,
+                start_time=start,
+                end_time=end,
+                base_price=int(p.base_price or 0),
+                guest_price=int(p.guest_price or 0),
+            )
+        )
+    return out
+
+
+_lock = threading.Lock()
+_resolver: Optional[MealPolicyResolver] = None
+
+
+def _is_fresh(resolver: Optional[MealPolicyResolver]) -> bool:
+    if resolver is None:
+        return False
+    ttl = settings.POLICY_RESOLVER_TTL_SECONDS
+    return ttl <= 0 or (_time.monotonic() - resolver.built_at) < ttl
+
+
+def rebuild_policy_resolver(db: Session) -> MealPolicyResolver:
+    """활성 정책으로 판정 배열을 새로 만들어 교체. 정책 변경 커밋 직후 호출."""
+    global _resolver
+    resolver = MealPolicyResolver(load_policy_snapshots(db), built_at=_time.monotonic())
+    with _lock:
+        _resolver = resolver
+    logger.info("Meal policy resolver rebuilt: %s active policies", len(resolver.policies))
+    return resolver
+
+
+def cached_policy_resolver() -> Optional[MealPolicyResolver]:
+    """DB 없이 현재 판정기. 없거나 TTL 경과 시 None (async 라우트는 run_sync 로 재구성)."""
+    resolver = _resolver
+    return resolver if _is_fresh(resolver) else None
+
+
+def get_policy_resolver(db: Session) -> MealPolicyResolver:
+    """현재 판정기. 없거나 TTL 경과 시에만 DB에서 재구성."""
+    resolver = cached_policy_resolver()
+    if resolver is not None:
+        return resolver
+    return rebuild_policy_resolver(db)
+
+
+def invalidate_policy_resolver() -> None:
+    global _resolver
+    with _lock:
+        _resolver = None
@@ -0,0 +1,298 @@
+"""식수 일별 집계 테이블(meal_daily_rollups) 유지.
+
+키: (KST 날짜, policy_id, department_id, user_id) → 기록 건수·동반 인원·금액(final_price × (1 + 동반 인원)).
+정책·부서 없음은 0. 취소 기록은 포함하지 않음.
+식수 기록 생성·취소·수정·삭제 시 같은 트랜잭션에서 증감(apply_log_delta / apply_rollup_deltas),
+사원 부서 변경 시 해당 사원 행의 department_id 를 옮김 (보고서는 기존처럼 현재 소속 부서 기준).
+사원·부서·회사 삭제는 user_id FK CASCADE 로, 정책 삭제는 delete_policy_rollups 로 정리.
+범위 재구성은 rebuild_meal_rollups.py (rebuild_rollups)."""
+import logging
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import and_, delete, func, insert, select, update
+from sqlalchemy.engine import Connection
+
+
+logger = logging.getLogger(__name__)
+
+# (날짜, policy_id, department_id, user_id) → [건수, 동반 인원, 금액]
+RollupKey = Tuple[date, int, int, int]
+
+
+def rollup_key(created_at: datetime, policy_id: Optional[int], department_id: Optional[int], user_id: int) -> RollupKey:
+    return (created_at.date(), int(policy_id or 0), int(department_id or 0), int(user_id))
+
+
+def _upsert_statement(dialect_name: str, rows):
+    from app.models.models import MealDailyRollup
+
+    t = MealDailyRollup.__table__
+    if dialect_name == "mysql":
+        from sqlalchemy.dialects.mysql import insert as mysql_insert
+
+        stmt = mysql_insert(t).values(rows)
+        return stmt.on_duplicate_key_update(
+            meal_count=t.c.meal_count + stmt.inserted.meal_count,
+            guest_count=t.c.guest_count + stmt.inserted.guest_count,
+            amount=t.c.amount + stmt.inserted.amount,
+        )
+    if dialect_name in ("sqlite", "postgresql"):
+        if dialect_name == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+
+        stmt = dialect_insert(t).values(rows)
+        return stmt.on_conflict_do_update(
+            index_elements=["meal_date", "policy_id", "department_id", "user_id"],
+            set_={
+                "meal_count": t.c.meal_count + stmt.excluded.meal_count,
+                "guest_count": t.c.guest_count + stmt.excluded.guest_count,
+                "amount": t.c.amount + stmt.excluded.amount,
+            },
+        )
+    return None
+
+
+def apply_rollup_deltas(conn, deltas: Dict[RollupKey, list]) -> None:
+    """증감분 반영 (Session 또는 Connection). 호출한 쪽 트랜잭션 안에서 실행."""
+    from app.models.models import MealDailyRollup
+
+    rows = [
+        {
+            "meal_date": k[0], "policy_id": k[1], "department_id": k[2], "user_id": k[3],
+            "meal_count": v[0], "guest_count": v[1], "amount": v[2],
+        }
+        for k, v in deltas.items()
+        if any(v)
+    ]
+    if not rows:
+        return
+    dialect_name = (conn.dialect if isinstance(conn, Connection) else conn.get_bind().dialect).name
+    stmt = _upsert_statement(dialect_name, rows)
+    if stmt is not None:
+        conn.execute(stmt)
+        return
+    # 기타 DB: 행별 UPDATE 후 없으면 INSERT
+    t = MealDailyRollup.__table__
+    for r in rows:
+        res = conn.execute(
+            update(t)
+            .where(and_(
+                t.c.meal_date == r["meal_date"], t.c.policy_id == r["policy_id"],
+                t.c.department_id == r["department_id"], t.c.user_id == r["user_id"],
+            ))
+            .values(
+                meal_count=t.c.meal_count + r["meal_count"],
+                guest_count=t.c.guest_count + r["guest_count"],
+                amount=t.c.amount + r["amount"],
+            )
+        )
+        if not res.rowcount:
+            conn.execute(insert(t).values(**r))
+
+
+def add_log_delta(
+    deltas: Dict[RollupKey, list], values: dict, department_id: Optional[int], sign: int = 1
+) -> None:
+    """MealLog 값(dict: created_at·policy_id·user_id·guest_count·final_price·is_void) 1건을 deltas 에 누적."""
+    if values.get("is_void") or values.get("created_at") is None or values.get("user_id") is None:
+        return
+    guests = int(values.get("guest_count") or 0)
+    price = int(values.get("final_price") or 0)
+    entry = deltas.setdefault(
+        rollup_key(values["created_at"], values.get("policy_id"), department_id, values["user_id"]), [0, 0, 0]
+    )
+    entry[0] += sign
+    entry[1] += sign * guests
+    entry[2] += sign * price * (1 + guests)
+
+
+def log_values(log) -> dict:
+    """MealLog 객체 → add_log_delta 용 값 (커밋 전 변경 전 상태 보관에도 사용)."""
+    return {
+        "created_at": log.created_at,
+        "policy_id": log.policy_id,
+        "user_id": log.user_id,
+        "guest_count": log.guest_count,
+        "final_price": log.final_price,
+        "is_void": bool(log.is_void),
+    }
+
+
+def department_ids_for(conn, user_ids: Iterable[int]) -> Dict[int, Optional[int]]:
+    from app.models.models import User
+
+    ids = {int(u) for u in user_ids if u is not None}
+    if not ids:
+        return {}
+    return dict(conn.execute(select(User.id, User.department_id).where(User.id.in_(ids))).all())
+
+
+def apply_log_delta(db, before: Optional[dict], after: Optional[dict]) -> None:
+    """식수 기록 1건 변경(생성: before=None, 삭제: after=None)을 집계에 반영. commit 전에 호출."""
+    users = [v["user_id"] for v in (before, after) if v and v.get("user_id") is not None]
+    depts = department_ids_for(db, users)
+    deltas: Dict[RollupKey, list] = {}
+    if before:
+        add_log_delta(deltas, before, depts.get(before.get("user_id")), -1)
+    if after:
+        add_log_delta(deltas, after, depts.get(after.get("user_id")), 1)
+    apply_rollup_deltas(db, deltas)
+
+
+def reassign_user_department(db, user_id: int, department_id: Optional[int]) -> None:
+    """사원 부서 변경 시 집계 행 부서도 이동 (보고서는 현재 소속 부서 기준). 같은 키 충돌이 없도록 사원별로 옮김."""
+    from app.models.models import MealDailyRollup
+
+    t = MealDailyRollup.__table__
+    rows = db.execute(
+        select(t.c.meal_date, t.c.policy_id, t.c.meal_count, t.c.guest_count, t.c.amount).where(
+            and_(t.c.user_id == user_id, t.c.department_id != int(department_id or 0))
+        )
+    ).all()
+    if not rows:
+        return
+    db.execute(delete(t).where(and_(t.c.user_id == user_id, t.c.department_id != int(department_id or 0))))
+    deltas: Dict[RollupKey, list] = defaultdict(lambda: [0, 0, 0])
+    for meal_date, policy_id, cnt, guests, amount in rows:
+        entry = deltas[(meal_date, policy_id, int(department_id or 0), int(user_id))]
+        entry[0] += cnt
+        entry[1] += guests
+        entry[2] += amount
+    apply_rollup_deltas(db, dict(deltas))
+
+
+def delete_policy_rollups(db, policy_id: int) -> None:
+    """정책 삭제(식수 기록 CASCADE) 시 해당 정책 집계 행 삭제."""
+    from app.models.models import MealDailyRollup
+
+    db.execute(delete(MealDailyRollup).where(MealDailyRollup.policy_id == int(policy_id)))
+
+
+def rebuild_rollups(db, start_date: date, end_date: date, chunk_days: int = 31) -> int:
+    """[start_date, end_date] 집계 행을 meal_logs 에서 다시 계산해 교체.
+    chunk_days 일씩 meal_date GROUP BY 한 번으로 집계하고 구간마다 커밋. 만든 행 수 반환."""
+    from app.models.models import MealDailyRollup, MealLog, User
+
+    created = 0
+    day = start_date
+    while day <= end_date:
+        last = min(end_date, day + timedelta(days=max(1, chunk_days) - 1))
+        rows = db.execute(
+            select(
+                MealLog.meal_date,
+                MealLog.policy_id,
+                User.department_id,
+                MealLog.user_id,
+                func.count(MealLog.id),
+                func.coalesce(func.sum(MealLog.guest_count), 0),
+                func.coalesce(
+                    func.sum(func.coalesce(MealLog.final_price, 0) * (1 + func.coalesce(MealLog.guest_count, 0))), 0
+                ),
+            )
+            .join(User, User.id == MealLog.user_id)
+            .where(and_(
+                MealLog.meal_date >= day,
+                MealLog.meal_date <= last,
+                MealLog.is_void == False,
+            ))
+            .group_by(MealLog.meal_date, MealLog.policy_id, User.department_id, MealLog.user_id)
+        ).all()
+        db.execute(
+            delete(MealDailyRollup).where(and_(MealDailyRollup.meal_date >= day, MealDailyRollup.meal_date <= last))
+        )
+        if rows:
+            db.execute(
+                insert(MealDailyRollup),
+                [
+                    {
+                        "meal_date": meal_date, "policy_id": int(pid or 0), "department_id": int(dept or 0),
+                        "user_id": int(uid), "meal_count": int(cnt), "guest_count": int(guests),
+                        "amount": int(amount),
+                    }
+                    for meal_date, pid, dept, uid, cnt, guests, amount in rows
+                ],
+            )
+        db.commit()
+        created += len(rows)
+        day = last + timedelta(days=1)
+    return created
+
+
+def meal_log_date_bounds(db) -> Optional[Tuple[date, date]]:
+    from app.models.models import MealLog
+
+    lo, hi = db.execute(select(func.min(MealLog.meal_date), func.max(MealLog.meal_date))).one()
+    if lo is None or hi is None:
+        return None
+    if isinstance(lo, str):
+        lo, hi = date.fromisoformat(lo), date.fromisoformat(hi)
+    return lo, hi
+
+
+# 전체 기간 초기 구성 완료 표시 (system_settings). 마지막 구간까지 끝난 뒤에만 기록
+BACKFILL_MARKER_KEY = "meal_rollups_backfill"
+
+
+def mark_rollups_backfilled(db, start_date: Optional[date] = None, end_date: Optional[date] = None) -> None:
+    """전체 기간 재구성 완료 기록 (커밋은 호출 측). rebuild_meal_rollups.py 전체 기간 실행도 사용."""
+    from app.models.models import SystemSetting
+
+    value = {
+        "done": True,
+        "start": start_date.isoformat() if start_date else None,
+        "end": end_date.isoformat() if end_date else None,
+    }
+    marker = db.execute(select(SystemSetting).where(SystemSetting.key == BACKFILL_MARKER_KEY)).scalar_one_or_none()
+    if marker is None:
+        db.add(SystemSetting(key=BACKFILL_MARKER_KEY, value=value))
+    else:
+        marker.value = value
+
+
+def _backfill_done(value) -> bool:
+    return isinstance(value, dict) and bool(value.get("done"))
+
+
+def backfill_rollups_if_needed(db) -> None:
+    """전체 기간 초기 구성이 끝났다는 표시가 없으면 재구성 (배포 직후 1회, 중간에 끊겼으면 다음 시작 때 처음부터 다시).
+
+    rebuild_rollups 는 구간마다 커밋하므로 "행이 있음" 만으로는 완료를 알 수 없음 → system_settings 표시 행으로 판단.
+    여러 워커가 동시에 시작하면 표시 행을 별도 연결에서 SELECT … FOR UPDATE SKIP LOCKED 로 잡은 워커 하나만 실행
+    (잠금을 못 잡은 워커는 건너뜀). 표시는 마지막 구간 뒤 같은 잠금 트랜잭션에서 기록."""
+    from sqlalchemy.exc import IntegrityError
+
+    from app.core.database import SessionLocal
+    from app.models.models import SystemSetting
+
+    marker_query = select(SystemSetting).where(SystemSetting.key == BACKFILL_MARKER_KEY)
+    marker = db.execute(marker_query).scalar_one_or_none()
+    if marker is not None and _backfill_done(marker.value):
+        return
+    if marker is None:
+        try:
+            db.add(SystemSetting(key=BACKFILL_MARKER_KEY, value={"done": False}))
+            db.commit()
+        except IntegrityError:
+            db.rollback()  # 다른 워커가 먼저 만듦
+
+    # 잠금은 재구성(구간별 커밋)과 다른 세션에서 끝까지 유지
+    lock_db = SessionLocal()
+    try:
+        locked = lock_db.execute(marker_query.with_for_update(skip_locked=True)).scalar_one_or_none()
+        if locked is None:
+            logger.info("meal_daily_rollups backfill running in another process, skipped")
+            return
+        if _backfill_done(locked.value):
+            return
+        bounds = meal_log_date_bounds(db)
+        if bounds is not None:
+            n = rebuild_rollups(db, *bounds)
+            logger.info("meal_daily_rollups backfilled %s ~ %s: %s rows", bounds[0], bounds[1], n)
+        mark_rollups_backfilled(lock_db, *(bounds or (None, None)))
+        lock_db.commit()
+    finally:
+        lock_db.close()
@@ -0,0 +1,23 @@
+"""프로세스 로컬 운영 메트릭 모음. 각 모듈이 이름별 수집 함수를 등록하고 GET /api/admin/metrics 에서 조회."""
+import logging
+from typing import Any, Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+_providers: Dict[str, Callable[[], Dict[str, Any]]] = {}
+
+
+def register_metrics(name: str, provider: Callable[[], Dict[str, Any]]) -> None:
+    """같은 이름으로 다시 등록하면 교체."""
+    _providers[name] = provider
+
+
+def collect_metrics() -> Dict[str, Any]:
+    out: Dict[str, Any] = {}
+    for name, provider in list(_providers.items()):
+        try:
+            out[name] = provider()
+        except Exception as e:
+            logger.warning("metrics %s: %s", name, e)
+            out[name] = {"error": str(e)}
+    return out
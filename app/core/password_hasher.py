@@ -0,0 +1,121 @@
+"""비밀번호 해시·검증(bcrypt) 전용 프로세스 풀.
+
+bcrypt 는 한 번에 수십~수백 ms CPU 를 쓰므로, 기기 인증(verify_device·verify_device_admin)이 몰리면
+요청 스레드풀·CPU 를 잡아 /qr-scan 이 밀렸음. 계산은 PASSWORD_HASH_WORKERS 개 프로세스에서 하고 요청은 await 로 기다림.
+- 진행·대기 중인 계산이 PASSWORD_HASH_MAX_PENDING 이상이면 바로 429 (Retry-After) — 대기열이 끝없이 쌓이지 않게
+- BCRYPT_ROUNDS 를 바꾸면 needs_rehash 가 참 → 로그인 성공 시 새 비용으로 다시 해시해 저장
+- PASSWORD_HASH_WORKERS=0 이면 프로세스 없이 이벤트 루프 기본 스레드 풀에서 계산 (개발·단일 코어 환경)
+작업 프로세스는 spawn 으로 띄움 (스레드가 많은 서버 프로세스를 fork 하지 않음)."""
+import asyncio
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, Optional
+
+from fastapi import HTTPException
+
+from app.core.config import settings
+from app.core.metrics import register_metrics
+from app.core.security import bcrypt_rounds, effective_bcrypt_rounds, get_password_hash, verify_password
+
+logger = logging.getLogger(__name__)
+
+
+class PasswordHasher:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._pending = 0
+        self.hashed = 0
+        self.verified = 0
+        self.rehashed = 0
+        self.rejected = 0
+
+    def _pool(self) -> Optional[ProcessPoolExecutor]:
+        with self._lock:
+            if self._executor is None and settings.PASSWORD_HASH_WORKERS > 0:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=settings.PASSWORD_HASH_WORKERS,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
+
+    def _discard(self, executor: ProcessPoolExecutor) -> None:
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    async def _run(self, fn, *args):
+        with self._lock:
+            if self._pending >= max(1, settings.PASSWORD_HASH_MAX_PENDING):
+                self.rejected += 1
+                raise HTTPException(
+                    status_code=429,
+                    detail="인증 요청이 많습니다. 잠시 후 다시 시도해 주세요.",
+                    headers={"Retry-After": "1"},
+                )
+            self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            executor = self._pool()
+            try:
+                return await loop.run_in_executor(executor, fn, *args)
+            except BrokenProcessPool:
+                # 작업 프로세스가 죽은 경우(OOM 등) 풀을 새로 만들어 한 번 재시도
+                logger.warning("password hash pool broken, restarting")
+                self._discard(executor)
+                return await loop.run_in_executor(self._pool(), fn, *args)
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    async def hash(self, password: str) -> str:
+        hashed = await self._run(get_password_hash, password, settings.BCRYPT_ROUNDS)
+        with self._lock:
+            self.hashed += 1
+        return hashed
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        ok = await self._run(verify_password, password, hashed_password)
+        with self._lock:
+            self.verified += 1
+        return ok
+
+    def needs_rehash(self, hashed_password: Optional[str]) -> bool:
+        """저장된 해시의 비용이 지금 해시에 쓰는 비용(BCRYPT_ROUNDS 를 4~31 로 맞춘 값)과 다르면 True
+        (형식을 모르는 해시는 그대로 둠). 범위 밖 설정값과 비교하면 로그인마다 다시 해시하게 됨."""
+        rounds = bcrypt_rounds(hashed_password)
+        return rounds is not None and rounds != effective_bcrypt_rounds()
+
+    async def rehash(self, password: str) -> str:
+        """로그인 성공 후 새 비용으로 다시 해시 (needs_rehash 일 때)."""
+        hashed = await self.hash(password)
+        with self._lock:
+            self.rehashed += 1
+        return hashed
+
+    def close(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "workers": settings.PASSWORD_HASH_WORKERS,
+                "rounds": settings.BCRYPT_ROUNDS,
+                "pending": self._pending,
+                "max_pending": settings.PASSWORD_HASH_MAX_PENDING,
+                "hashed": self.hashed,
+                "verified": self.verified,
+                "rehashed": self.rehashed,
+                "rejected": self.rejected,
+            }
+
+
+password_hasher = PasswordHasher()
+register_metrics("password_hasher", password_hasher.stats)
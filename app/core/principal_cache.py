@@ -0,0 +1,132 @@
+"""인증된 사원·식당관리자 스냅샷 캐시 (get_current_user / get_current_admin 용).
+
+토큰 검증 후 매 요청 DB 조회 대신 상태·인증 여부·부서명 스냅샷을 AUTH_CACHE_TTL_SECONDS 동안 재사용.
+퇴사·기기 초기화·수정·삭제·엑셀 등록 등 해당 행을 바꾸는 라우트는 커밋 직후 반드시 invalidate_* 호출.
+다중 워커: invalidate_* 는 자기 캐시를 지운 뒤 백플레인(WS_BACKPLANE_URL)으로 AUTH_INVALIDATE 를 보내고, 다른 워커는
+apply_remote_invalidation 으로 같은 항목을 지움 (ConnectionManager.start 가 연결). 백플레인이 없거나 끊긴 동안 놓친
+무효화는 AUTH_CACHE_TTL_SECONDS 가 지나야 반영."""
+import logging
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from app.core.config import settings
+from app.core.metrics import register_metrics
+from app.core.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+AUTH_INVALIDATE = "AUTH_INVALIDATE"
+# 한 메시지에 담는 사원 id 상한. 넘으면 다른 워커에는 사원 캐시 전체 비우기로 보냄 (엑셀 일괄 등록 등)
+_MAX_IDS_PER_MESSAGE = 1000
+
+
+@dataclass(frozen=True)
+class UserPrincipal:
+    """사원 인증 스냅샷. 라우트에서는 User 대신 이 값만 사용 (id·emp_no·name·department_id·department_name)."""
+    id: int
+    emp_no: Optional[str]
+    name: Optional[str]
+    status: Optional[str]
+    is_verified: bool
+    department_name: str
+    department_id: Optional[int] = None
+
+    @classmethod
+    def from_user(cls, user) -> "UserPrincipal":
+        return cls(
+            id=int(user.id),
+            emp_no=user.emp_no,
+            name=user.name,
+            status=user.status,
+            is_verified=bool(user.is_verified),
+            department_name=user.department_name,
+            department_id=user.department_id,
+        )
+
+
+@dataclass(frozen=True)
+class AdminPrincipal:
+    """식당관리자 인증 스냅샷."""
+    id: int
+    emp_no: str
+    name: str
+    is_verified: bool
+
+    @classmethod
+    def from_admin(cls, admin) -> "AdminPrincipal":
+        return cls(
+            id=int(admin.id),
+            emp_no=admin.emp_no,
+            name=admin.name,
+            is_verified=bool(admin.is_verified),
+        )
+
+
+user_cache = TTLCache(settings.AUTH_CACHE_MAX_ENTRIES, settings.AUTH_CACHE_TTL_SECONDS)
+admin_cache = TTLCache(settings.AUTH_CACHE_MAX_ENTRIES, settings.AUTH_CACHE_TTL_SECONDS)
+
+
+# 다른 워커로 무효화를 보내는 함수 (백플레인 send_control). None 이면 이 프로세스만
+_broadcast: Optional[Callable[[Dict[str, Any]], None]] = None
+
+
+def set_broadcaster(broadcast: Optional[Callable[[Dict[str, Any]], None]]) -> None:
+    global _broadcast
+    _broadcast = broadcast
+
+
+def _announce(**targets) -> None:
+    if _broadcast is None:
+        return
+    try:
+        _broadcast({"type": AUTH_INVALIDATE, **targets})
+    except Exception as e:
+        logger.warning("auth cache invalidation broadcast failed: %s", e)
+
+
+def invalidate_user(user_id: Optional[int]) -> None:
+    invalidate_users([user_id])
+
+
+def invalidate_users(user_ids: Iterable[int]) -> None:
+    ids = [int(uid) for uid in user_ids if uid is not None]
+    if not ids:
+        return
+    for uid in ids:
+        user_cache.pop(uid)
+    if len(ids) > _MAX_IDS_PER_MESSAGE:
+        _announce(all_users=True)
+    else:
+        _announce(users=ids)
+
+
+def invalidate_all_users() -> None:
+    """부서명 변경·회사 삭제처럼 여러 사원 스냅샷이 한꺼번에 바뀌는 경우."""
+    user_cache.clear()
+    _announce(all_users=True)
+
+
+def invalidate_admin(admin_id: Optional[int]) -> None:
+    if admin_id is not None:
+        admin_cache.pop(int(admin_id))
+        _announce(admins=[int(admin_id)])
+
+
+def apply_remote_invalidation(message: Dict[str, Any]) -> None:
+    """다른 워커가 보낸 AUTH_INVALIDATE 를 이 프로세스 캐시에 반영 (다시 보내지 않음)."""
+    if message.get("all_users"):
+        user_cache.clear()
+    for uid in message.get("users") or ():
+        user_cache.pop(int(uid))
+    for aid in message.get("admins") or ():
+        admin_cache.pop(int(aid))
+
+
+def clear_local() -> None:
+    """백플레인 재연결 등으로 놓친 무효화가 있을 수 있을 때 이 프로세스 캐시 전체 비우기."""
+    user_cache.clear()
+    admin_cache.clear()
+
+
+register_metrics("auth_user_cache", user_cache.stats)
+register_metrics("auth_admin_cache", admin_cache.stats)
@@ -0,0 +1,99 @@
+"""QR 스캔 문자열 → 구역(QR ID)·장치 페이로드 라우팅 테이블 (프로세스 로컬 캐시).
+
+/api/meal/qr-scan 은 매 스캔마다 system_settings·프린터·경광등 테이블을 조회하던 것을
+미리 계산된 dict 조회 한 번으로 대체. 장치 설정(PUT /settings/device) 및 프린터·경광등 CRUD
+커밋 직후 재구성. 다중 워커(다른 프로세스에서 변경) 대비로 QR_ROUTING_TTL_SECONDS 경과 시 재구성."""
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_scan(s) -> str:
+    """스캔 문자열 정규화 (BOM·줄바꿈 제거). 라우팅 키와 스캔 값 모두 동일 규칙 적용."""
+    if s is None or not isinstance(s, str):
+        return ""
+    return s.strip().replace("\ufeff", "").replace("\r", "").replace("\n", "").strip()
+
+
+def freeze_payload(payload: Dict[str, Any]) -> Mapping[str, Any]:
+    """여러 요청이 공유하므로 읽기 전용으로 고정."""
+    return MappingProxyType(dict(payload))
+
+
+@dataclass(frozen=True)
+class QrRoute:
+    """스캔 1건의 라우팅 결과. device 는 WebSocket MEAL_LOG_CREATED 의 device 페이로드."""
+    qr_auth_id: Optional[int]
+    device: Mapping[str, Any]
+
+
+@dataclass(frozen=True)
+class QrRoutingTable:
+    """requires_scan=False 이면(레거시·허용 목록 없음) 어떤 스캔이든 open_device 로 통과."""
+    requires_scan: bool
+    routes: Mapping[str, QrRoute] = field(default_factory=dict)
+    open_device: Optional[Mapping[str, Any]] = None
+    built_at: float = 0.0
+
+    def resolve(self, qr_norm: str) -> Optional[QrRoute]:
+        """정규화된 스캔 문자열 → QrRoute. 허용되지 않으면 None."""
+        if self.requires_scan:
+            return self.routes.get(qr_norm) if qr_norm else None
+        device = dict(self.open_device or {})
+        device["qr_code"] = qr_norm
+        return QrRoute(qr_auth_id=None, device=MappingProxyType(device))
+
+
+_lock = threading.Lock()
+_table: Optional[QrRoutingTable] = None
+
+
+def _is_fresh(table: Optional[QrRoutingTable]) -> bool:
+    if table is None:
+        return False
+    ttl = settings.QR_ROUTING_TTL_SECONDS
+    return ttl <= 0 or (time.monotonic() - table.built_at) < ttl
+
+
+def rebuild_qr_routing_table(db: Session) -> QrRoutingTable:
+    """DB 기준으로 라우팅 테이블을 새로 만들어 교체. 관련 설정 커밋 직후 호출."""
+    global _table
+    from app.api.admin.hardware_terminals import build_qr_routing_table
+
+    table = build_qr_routing_table(db)
+    with _lock:
+        _table = table
+    logger.info(
+        "QR routing table rebuilt: %s routes (requires_scan=%s)", len(table.routes), table.requires_scan
+    )
+    return table
+
+
+def cached_qr_routing_table() -> Optional[QrRoutingTable]:
+    """DB 없이 현재 라우팅 테이블. 없거나 TTL 경과 시 None (async 라우트는 run_sync 로 재구성)."""
+    table = _table
+    return table if _is_fresh(table) else None
+
+
+def get_qr_routing_table(db: Session) -> QrRoutingTable:
+    """현재 라우팅 테이블. 없거나 TTL 경과 시에만 DB에서 재구성."""
+    table = cached_qr_routing_table()
+    if table is not None:
+        return table
+    return rebuild_qr_routing_table(db)
+
+
+def invalidate_qr_routing_table() -> None:
+    """다음 조회 시 재구성하도록 캐시 비우기 (커밋 전 세션을 쓸 수 없는 경우용)."""
+    global _table
+    with _lock:
+        _table = None
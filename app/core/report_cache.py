@@ -0,0 +1,474 @@
+"""마감된 기간 보고서 결과 캐시 (/reports/monthly, /reports/department, /reports/excel).
+
+어제 이전으로 끝나는 기간의 보고서는 식수 기록을 직접 고치기 전에는 바뀌지 않으므로, (엔드포인트, 기간, 파라미터) 별
+응답 본문을 디스크(REPORT_CACHE_DIR)와 메모리(건수·바이트 상한 LRU)에 두고 재사용. 오늘이 포함된 기간은 캐시하지 않음.
+- 무효화: raw_data 생성·수정·취소·삭제는 invalidate_dates(바뀐 날짜) 로 그 날짜를 포함한 항목만,
+  사원·부서·정책·회사 변경처럼 집계 전체에 영향을 주는 변경과 집계 재구성은 invalidate_all()
+- 디스크 파일명에 기간이 들어 있어 다른 워커·CLI 도 같은 디렉터리에서 무효화 가능. 메모리 적중 시 메타 파일을 stat 해
+  다른 프로세스의 무효화·재생성을 확인
+- 계산 도중 무효화된 결과는 저장하지 않음: 계산 전 token()(프로세스 내 generation + 디렉터리의 무효화 표시 파일 내용)을
+  받아 두고 put 에서 파일을 바꾸기 전·후에 다시 비교. 무효화는 표시 파일을 먼저 바꾼 뒤 항목을 지움 → 다른 워커의 무효화도 반영
+- 응답에 ETag·Last-Modified 를 붙이고 If-None-Match / If-Modified-Since 가 맞으면 304"""
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from app.core.config import settings
+from app.core.metrics import register_metrics
+from app.core.time_utils import kst_today
+
+logger = logging.getLogger(__name__)
+
+_CHUNK_BYTES = 64 * 1024
+# 캐시 디렉터리의 무효화 표시 파일 (무효화마다 새 임의 값으로 교체)
+_STAMP_NAME = ".invalidated"
+
+
+class CachedReport:
+    """보고서 응답 1건. body(메모리) 또는 path(디스크) 또는 fileobj(캐시하지 않은 임시 파일) 중 하나로 본문 제공."""
+
+    __slots__ = ("etag", "last_modified", "media_type", "headers", "size", "body", "path", "fileobj", "meta_mtime")
+
+    def __init__(self, etag, last_modified, media_type, headers=None, size=0, body=None, path=None, fileobj=None,
+                 meta_mtime=None):
+        self.etag = etag
+        self.last_modified = last_modified
+        self.media_type = media_type
+        self.headers = dict(headers or {})
+        self.size = size
+        self.body = body
+        self.path = path
+        self.fileobj = fileobj
+        self.meta_mtime = meta_mtime
+
+
+def _etag(digest: str) -> str:
+    return f'"{digest[:32]}"'
+
+
+def _entry_name(endpoint: str, start: date, end: date, params: Dict[str, Any]) -> str:
+    digest = hashlib.sha1(json.dumps([endpoint, params], sort_keys=True, default=str).encode("utf-8")).hexdigest()
+    return f"{start:%Y%m%d}-{end:%Y%m%d}-{digest[:20]}"
+
+
+def _name_range(name: str) -> Optional[Tuple[date, date]]:
+    try:
+        start, end, _ = name.split("-", 2)
+        return datetime.strptime(start, "%Y%m%d").date(), datetime.strptime(end, "%Y%m%d").date()
+    except ValueError:
+        return None
+
+
+class ReportCache:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, CachedReport]" = OrderedDict()
+        self._memory_bytes = 0
+        self._dir: Optional[str] = None
+        self._dir_checked = False
+        self.generation = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.stores = 0
+        self.invalidations = 0
+        self.evictions = 0
+
+    # --- 설정 ---
+
+    @staticmethod
+    def is_cacheable(end: date) -> bool:
+        return settings.REPORT_CACHE_ENABLED and end < kst_today()
+
+    def _directory(self) -> Optional[str]:
+        if not self._dir_checked:
+            self._dir_checked = True
+            path = settings.REPORT_CACHE_DIR or os.path.join(tempfile.gettempdir(), "meal_manage_report_cache")
+            try:
+                os.makedirs(path, exist_ok=True)
+                self._dir = path
+            except OSError as e:
+                logger.warning("report cache directory unavailable (%s), memory only: %s", path, e)
+        return self._dir
+
+    # --- 조회·저장 ---
+
+    def _read_stamp(self, directory: Optional[str]) -> Optional[str]:
+        if directory is None:
+            return None
+        try:
+            with open(os.path.join(directory, _STAMP_NAME), encoding="utf-8") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _write_stamp(self, directory: str) -> None:
+        path = os.path.join(directory, _STAMP_NAME)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(f"{time.time_ns()}-{os.getpid()}-{os.urandom(8).hex()}")
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.warning("report cache invalidation stamp write failed: %s", e)
+            _remove(tmp)
+
+    def token(self) -> Tuple[int, Optional[str]]:
+        """계산 시작 전에 받아 put(..., generation=token) 으로 넘김. 그 사이 (어느 프로세스에서든) 무효화되면 값이 바뀜."""
+        with self._lock:
+            generation = self.generation
+        return generation, self._read_stamp(self._directory())
+
+    def _is_stale(self, generation: Optional[Tuple[int, Optional[str]]]) -> bool:
+        return generation is not None and generation != self.token()
+
+    def get(self, endpoint: str, start: date, end: date, params: Dict[str, Any]) -> Optional[CachedReport]:
+        name = _entry_name(endpoint, start, end, params)
+        directory = self._directory()
+        meta_path = os.path.join(directory, name + ".json") if directory else None
+        meta_mtime = None
+        if meta_path:
+            try:
+                meta_mtime = os.stat(meta_path).st_mtime_ns
+            except OSError:
+                meta_mtime = None
+        with self._lock:
+            entry = self._memory.get(name)
+            if entry is not None:
+                if meta_path is None or entry.meta_mtime == meta_mtime:
+                    self._memory.move_to_end(name)
+                    self.hits += 1
+                    return entry
+                # 다른 프로세스가 무효화했거나 다시 만듦
+                self._drop_memory(name)
+        if meta_mtime is None:
+            with self._lock:
+                self.misses += 1
+            return None
+        try:
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+            return None
+        body_path = os.path.join(directory, name + ".body")
+        if not os.path.exists(body_path):
+            with self._lock:
+                self.misses += 1
+            return None
+        entry = CachedReport(
+            meta["etag"], meta["last_modified"], meta["media_type"], meta.get("headers"), int(meta.get("size") or 0),
+            path=body_path, meta_mtime=meta_mtime,
+        )
+        if entry.size <= self._memory_entry_limit():
+            try:
+                with open(body_path, "rb") as f:
+                    entry.body = f.read()
+            except OSError:
+                pass
+        with self._lock:
+            self.disk_hits += 1
+            self._remember(name, entry)
+        return entry
+
+    def put(
+        self, endpoint: str, start: date, end: date, params: Dict[str, Any], body, media_type: str,
+        headers: Optional[Dict[str, str]] = None, generation: Optional[Tuple[int, Optional[str]]] = None,
+    ) -> CachedReport:
+        """본문(bytes 또는 읽기 위치가 처음인 파일 객체)을 저장하고 응답용 항목 반환.
+        generation(계산 전 token()) 이 현재 값과 다르면(계산 도중 이 프로세스나 다른 프로세스에서 무효화)
+        저장하지 않고 그 본문 그대로 응답용 항목만 만듦."""
+        stale = self._is_stale(generation)
+        directory = None if stale else self._directory()
+        name = _entry_name(endpoint, start, end, params)
+        now = time.time()
+        if directory is None:
+            entry = uncached(body, media_type, headers)
+            if not stale and entry.body is not None and entry.size <= self._memory_entry_limit():
+                entry.last_modified = now
+                with self._lock:
+                    if generation is None or generation[0] == self.generation:
+                        self._remember(name, entry)
+                        self.stores += 1
+            return entry
+
+        body_path = os.path.join(directory, name + ".body")
+        meta_path = os.path.join(directory, name + ".json")
+        tmp_body = f"{body_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        digest = hashlib.sha1()
+        size = 0
+        data = body if isinstance(body, bytes) else None
+        try:
+            with open(tmp_body, "wb") as out:
+                if data is not None:
+                    out.write(data)
+                    digest.update(data)
+                    size = len(data)
+                else:
+                    while True:
+                        chunk = body.read(_CHUNK_BYTES)
+                        if not chunk:
+                            break
+                        out.write(chunk)
+                        digest.update(chunk)
+                        size += len(chunk)
+            if self._is_stale(generation):
+                # 계산·기록 도중 다른 프로세스가 무효화 → 공유 디스크에 옛 본문을 올리지 않음
+                _remove(tmp_body)
+                if data is None:
+                    body.seek(0)
+                return uncached(body, media_type, headers)
+            os.replace(tmp_body, body_path)
+            meta = {
+                "endpoint": endpoint, "etag": _etag(digest.hexdigest()), "last_modified": now,
+                "media_type": media_type, "headers": headers or {}, "size": size,
+            }
+            tmp_meta = f"{meta_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_meta, "w", encoding="utf-8") as f:
+                json.dump(meta, f)
+            os.replace(tmp_meta, meta_path)
+            meta_mtime = os.stat(meta_path).st_mtime_ns
+        except OSError as e:
+            logger.warning("report cache write failed: %s", e)
+            for path in (tmp_body, body_path):
+                _remove(path)
+            if data is None:
+                body.seek(0)
+            return uncached(body, media_type, headers)
+
+        entry = CachedReport(
+            meta["etag"], now, media_type, headers, size,
+            body=data if data is not None and size <= self._memory_entry_limit() else None,
+            path=body_path, meta_mtime=meta_mtime,
+        )
+        # 파일을 바꾸는 사이 무효화(표시 파일 먼저 바뀜) → 방금 쓴 파일도 버림 (응답은 이번 계산 결과 그대로)
+        invalidated = self._is_stale(generation)
+        with self._lock:
+            if not invalidated:
+                self._remember(name, entry)
+                self.stores += 1
+        if invalidated:
+            _remove(meta_path)
+        self._enforce_disk_limit(directory)
+        return entry
+
+    def _memory_entry_limit(self) -> int:
+        return max(0, settings.REPORT_CACHE_MEMORY_MAX_BYTES) // 8
+
+    def _remember(self, name: str, entry: CachedReport) -> None:
+        """메모리에 넣고 건수·바이트 상한을 넘으면 오래된 것부터 제거 (lock 안에서 호출)."""
+        self._drop_memory(name)
+        self._memory[name] = entry
+        self._memory_bytes += len(entry.body or b"")
+        while self._memory and (
+            len(self._memory) > max(1, settings.REPORT_CACHE_MAX_ENTRIES)
+            or self._memory_bytes > settings.REPORT_CACHE_MEMORY_MAX_BYTES
+        ):
+            _, old = self._memory.popitem(last=False)
+            self._memory_bytes -= len(old.body or b"")
+            self.evictions += 1
+
+    def _drop_memory(self, name: str) -> None:
+        old = self._memory.pop(name, None)
+        if old is not None:
+            self._memory_bytes -= len(old.body or b"")
+
+    def _enforce_disk_limit(self, directory: str) -> None:
+        limit = settings.REPORT_CACHE_DISK_MAX_BYTES
+        try:
+            files = [
+                (e.stat().st_mtime, e.stat().st_size, e.name[: -len(".body")])
+                for e in os.scandir(directory) if e.name.endswith(".body")
+            ]
+        except OSError:
+            return
+        total = sum(size for _, size, _ in files)
+        for _, size, name in sorted(files):
+            if total <= limit:
+                break
+            self._remove_entry(directory, name)
+            total -= size
+            self.evictions += 1
+
+    # --- 무효화 ---
+
+    def invalidate_dates(self, days: Iterable[Optional[date]]) -> None:
+        """해당 날짜(KST)를 기간에 포함한 항목 삭제. 식수 기록 커밋 직후 호출."""
+        days = {d.date() if isinstance(d, datetime) else d for d in days if d is not None}
+        if not days or not settings.REPORT_CACHE_ENABLED:
+            return
+
+        def covers(name: str) -> bool:
+            r = _name_range(name)
+            return r is None or any(r[0] <= d <= r[1] for d in days)
+
+        self._invalidate(covers)
+
+    def invalidate_all(self) -> None:
+        """전체 삭제. 사원·부서·정책·회사 변경, 집계 재구성·식수 기록 일괄 삭제 후 호출."""
+        if settings.REPORT_CACHE_ENABLED:
+            self._invalidate(lambda name: True)
+
+    def _invalidate(self, match: Callable[[str], bool]) -> None:
+        with self._lock:
+            self.generation += 1
+            self.invalidations += 1
+            for name in [n for n in self._memory if match(n)]:
+                self._drop_memory(name)
+        directory = self._directory()
+        if directory is None:
+            return
+        # 항목을 지우기 전에 표시 파일부터 바꿔, 계산 중인 다른 프로세스가 put 에서 알아채게 함
+        self._write_stamp(directory)
+        try:
+            names = {e.name.split(".", 1)[0] for e in os.scandir(directory) if e.name.endswith((".json", ".body"))}
+        except OSError:
+            return
+        for name in names:
+            if match(name):
+                self._remove_entry(directory, name)
+
+    @staticmethod
+    def _remove_entry(directory: str, name: str) -> None:
+        # 메타 먼저 지워 다른 프로세스가 반쯤 지워진 항목을 읽지 않게 함
+        _remove(os.path.join(directory, name + ".json"))
+        _remove(os.path.join(directory, name + ".body"))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "enabled": settings.REPORT_CACHE_ENABLED,
+                "directory": self._dir,
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "not_modified": self.not_modified,
+                "stores": self.stores,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "generation": self.generation,
+            }
+
+
+def _remove(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def uncached(body, media_type: str, headers: Optional[Dict[str, str]] = None) -> CachedReport:
+    """캐시하지 않는 응답(오늘 포함 기간 등)도 같은 방식으로 ETag 를 붙여 보내기 위한 항목."""
+    digest = hashlib.sha1()
+    if isinstance(body, bytes):
+        digest.update(body)
+        return CachedReport(_etag(digest.hexdigest()), None, media_type, headers, len(body), body=body)
+    size = 0
+    while True:
+        chunk = body.read(_CHUNK_BYTES)
+        if not chunk:
+            break
+        digest.update(chunk)
+        size += len(chunk)
+    body.seek(0)
+    return CachedReport(_etag(digest.hexdigest()), None, media_type, headers, size, fileobj=body)
+
+
+def _not_modified(request_headers, entry: CachedReport) -> bool:
+    inm = request_headers.get("if-none-match")
+    if inm:
+        tags = {t.strip().removeprefix("W/") for t in inm.split(",")}
+        return "*" in tags or entry.etag in tags
+    ims = request_headers.get("if-modified-since")
+    if ims and entry.last_modified is not None:
+        try:
+            return int(entry.last_modified) <= int(parsedate_to_datetime(ims).timestamp())
+        except (TypeError, ValueError, IndexError, OverflowError):
+            return False
+    return False
+
+
+def respond(request, entry: CachedReport):
+    """항목 → 응답. 조건부 요청이 맞으면 304 (본문 없음)."""
+    from fastapi import Response
+    from fastapi.responses import StreamingResponse
+
+    headers = {**entry.headers, "ETag": entry.etag, "Cache-Control": "private, no-cache"}
+    if entry.last_modified is not None:
+        headers["Last-Modified"] = formatdate(entry.last_modified, usegmt=True)
+    if _not_modified(request.headers, entry):
+        if entry.fileobj is not None:
+            entry.fileobj.close()
+        report_cache.not_modified += 1
+        return Response(status_code=304, headers={k: v for k, v in headers.items() if k != "Content-Disposition"})
+    if entry.body is not None:
+        return Response(content=entry.body, media_type=entry.media_type, headers=headers)
+    f = entry.fileobj
+
+    def chunks():
+        try:
+            while True:
+                chunk = f.read(_CHUNK_BYTES)
+                if not chunk:
+                    break
+                yield chunk
+        finally:
+            f.close()
+
+    return StreamingResponse(chunks(), media_type=entry.media_type, headers=headers)
+
+
+def _opened(entry: Optional[CachedReport]) -> Optional[CachedReport]:
+    """디스크 본문 항목은 요청마다 파일을 미리 열어 둠. 그 사이 무효화로 지워졌으면 None (캐시 미스).
+    메모리 본문·캐시하지 않은 파일 객체(put 이 저장하지 못한 계산 결과) 항목은 그대로."""
+    if entry is None or entry.body is not None or entry.fileobj is not None or entry.path is None:
+        return entry
+    try:
+        f = open(entry.path, "rb")  # 열린 뒤에는 무효화로 파일이 지워져도 끝까지 읽힘
+    except OSError:
+        return None
+    return CachedReport(
+        entry.etag, entry.last_modified, entry.media_type, entry.headers, entry.size, fileobj=f,
+    )
+
+
+def cached_report(
+    request, endpoint: str, start: date, end: date, params: Dict[str, Any],
+    build: Callable[[], Any], media_type: str, headers: Optional[Dict[str, str]] = None,
+):
+    """캐시에 있으면 그 응답, 없으면 build() (bytes 또는 파일 객체) 결과를 마감 기간이면 저장하고 응답."""
+    if not report_cache.is_cacheable(end):
+        return respond(request, uncached(build(), media_type, headers))
+    entry = _opened(report_cache.get(endpoint, start, end, params))
+    if entry is None:
+        generation = report_cache.token()
+        body = build()
+        try:
+            entry = _opened(
+                report_cache.put(endpoint, start, end, params, body, media_type, headers, generation=generation)
+            )
+            if entry is None:
+                # 방금 쓴 디스크 본문이 응답 전에 무효화로 지워짐 → 이번 계산 결과를 캐시 없이 응답
+                if not isinstance(body, bytes):
+                    body.seek(0)
+                entry = uncached(body, media_type, headers)
+        finally:
+            if not isinstance(body, bytes) and (entry is None or entry.fileobj is not body):
+                body.close()
+    return respond(request, entry)
+
+
+report_cache = ReportCache()
+register_metrics("report_cache", report_cache.stats)
@@ -0,0 +1,162 @@
+"""QR 스캔 중복 방지.
+
+1) Idempotency-Key: PWA 가 스캔 1회마다 키를 만들어 재전송에도 같은 키를 보냄. (사원, 키) 로 최초 응답을
+   메모리(TTLCache) + DB(meal_scan_idempotency) 에 저장하고, 재전송은 meal_logs·WebSocket 을 건드리지 않고 그 응답 반환.
+   같은 프로세스에 같은 키가 동시에 두 번 들어오면 뒤 요청은 앞 요청 결과를 기다림.
+   DB 행은 식수 기록과 같은 트랜잭션에서 INSERT (idempotency_values) — 두 커밋 사이 장애로 키 없이 기록만 남지 않고,
+   다른 워커에서 같은 키가 동시에 처리되면 (user_id, idem_key) 유일 제약 위반으로 뒤 트랜잭션(식수 기록 포함)이 롤백 →
+   stored_response 로 먼저 저장된 응답 반환.
+2) 재스캔 억제: SCAN_SUPPRESS_WINDOW_SECONDS > 0 이면 같은 사원·같은 식사 정책의 재스캔을 창 안에서 DB 쓰기 전에
+   직전 응답(duplicate=True)으로 단락. 0(기본)이면 기존처럼 재스캔마다 기록·장치 트리거."""
+import asyncio
+import logging
+from datetime import timedelta
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import delete, select
+
+from app.core.config import settings
+from app.core.metrics import register_metrics
+from app.core.time_utils import kst_now_naive
+from app.core.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_KEY_MAX_LEN = 100
+_PRUNE_EVERY = 500
+
+_responses = TTLCache(settings.SCAN_IDEMPOTENCY_MAX_ENTRIES, settings.SCAN_IDEMPOTENCY_TTL_SECONDS)
+_recent_scans = TTLCache(settings.SCAN_IDEMPOTENCY_MAX_ENTRIES, settings.SCAN_SUPPRESS_WINDOW_SECONDS)
+_inflight: Dict[Tuple[int, str], asyncio.Future] = {}
+_stats = {"replays": 0, "replays_db": 0, "coalesced": 0, "suppressed": 0, "stored": 0}
+_stores_since_prune = 0
+
+
+def normalize_idempotency_key(raw: Optional[str]) -> Optional[str]:
+    key = (raw or "").strip()
+    if not key:
+        return None
+    return key[:IDEMPOTENCY_KEY_MAX_LEN]
+
+
+async def acquire(db, user_id: int, key: str) -> Optional[Dict[str, Any]]:
+    """재전송이면 저장된 최초 응답 반환. None 이면 이 요청이 키를 점유한 것이므로 처리 후 반드시 finish() 호출.
+    같은 키 요청이 처리 중이면 끝날 때까지 대기 (확인과 점유 사이에 await 없음)."""
+    from app.models.models import MealScanIdempotency
+
+    cache_key = (user_id, key)
+    while True:
+        cached = _responses.get(cache_key)
+        if cached is not None:
+            _stats["replays"] += 1
+            return cached
+        pending = _inflight.get(cache_key)
+        if pending is None:
+            break
+        _stats["coalesced"] += 1
+        first = await asyncio.shield(pending)
+        if first is not None:
+            return first
+        # 앞 요청이 실패로 끝남 → 다시 확인 후 직접 처리
+    _inflight[cache_key] = asyncio.get_running_loop().create_future()
+
+    try:
+        result = await db.execute(
+            select(MealScanIdempotency.response).where(
+                MealScanIdempotency.user_id == user_id,
+                MealScanIdempotency.idem_key == key,
+            )
+        )
+        stored = result.scalar_one_or_none()
+    except Exception:
+        finish(user_id, key, None)
+        raise
+    if stored is not None:
+        _responses.set(cache_key, stored)
+        _stats["replays"] += 1
+        _stats["replays_db"] += 1
+        finish(user_id, key, stored)
+    return stored
+
+
+def finish(user_id: int, key: str, response: Optional[Dict[str, Any]]) -> None:
+    """처리 종료. response=None(실패)이면 대기 중 요청은 None 을 받아 직접 처리."""
+    fut = _inflight.pop((user_id, key), None)
+    if fut is not None and not fut.done():
+        fut.set_result(response)
+
+
+def idempotency_values(user_id: int, key: str, meal_log_id: int, response: Dict[str, Any]) -> Dict[str, Any]:
+    """meal_scan_idempotency 행 값. 식수 기록 INSERT 와 같은 트랜잭션에서 넣음 (커밋은 호출 측)."""
+    return {
+        "user_id": user_id,
+        "idem_key": key,
+        "meal_log_id": meal_log_id,
+        "response": response,
+        "created_at": kst_now_naive(),
+    }
+
+
+async def stored_response(db, user_id: int, key: str) -> Optional[Dict[str, Any]]:
+    """DB 에 저장된 최초 응답 (식수 기록 커밋이 유일 제약 위반으로 실패했을 때 — 다른 워커가 먼저 처리)."""
+    from app.models.models import MealScanIdempotency
+
+    result = await db.execute(
+        select(MealScanIdempotency.response).where(
+            MealScanIdempotency.user_id == user_id,
+            MealScanIdempotency.idem_key == key,
+        )
+    )
+    stored = result.scalar_one_or_none()
+    if stored is not None:
+        _responses.set((user_id, key), stored)
+        _stats["replays"] += 1
+        _stats["replays_db"] += 1
+    return stored
+
+
+async def remember_response(db, user_id: int, key: str, response: Dict[str, Any]) -> None:
+    """식수 기록·키 행 커밋 후 메모리에 응답 보관, 가끔 보관 기간 지난 키 행 정리."""
+    global _stores_since_prune
+    from app.models.models import MealScanIdempotency
+
+    _responses.set((user_id, key), response)
+    _stats["stored"] += 1
+    _stores_since_prune += 1
+    if _stores_since_prune >= _PRUNE_EVERY:
+        _stores_since_prune = 0
+        cutoff = kst_now_naive() - timedelta(seconds=settings.SCAN_IDEMPOTENCY_TTL_SECONDS)
+        try:
+            await db.execute(delete(MealScanIdempotency).where(MealScanIdempotency.created_at < cutoff))
+            await db.commit()
+        except Exception as e:
+            logger.warning("meal_scan_idempotency prune failed: %s", e)
+            await db.rollback()
+
+
+def suppressed_response(user_id: int, policy_id: int) -> Optional[Dict[str, Any]]:
+    """억제 창 안의 재스캔이면 직전 응답 사본(duplicate=True)."""
+    if settings.SCAN_SUPPRESS_WINDOW_SECONDS <= 0:
+        return None
+    previous = _recent_scans.get((user_id, policy_id))
+    if previous is None:
+        return None
+    _stats["suppressed"] += 1
+    return {**previous, "duplicate": True}
+
+
+def remember_scan(user_id: int, policy_id: int, response: Dict[str, Any]) -> None:
+    if settings.SCAN_SUPPRESS_WINDOW_SECONDS > 0:
+        _recent_scans.set((user_id, policy_id), response)
+
+
+def stats() -> Dict[str, Any]:
+    return {
+        **_stats,
+        "inflight": len(_inflight),
+        "suppress_window_seconds": settings.SCAN_SUPPRESS_WINDOW_SECONDS,
+        "responses_cache": _responses.stats(),
+    }
+
+
+register_metrics("scan_dedup", stats)
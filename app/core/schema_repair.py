@@ -55,6 +55,16 @@ def ensure_meal_logs_columns(engine: Engine) -> None:
                 ("ALTER TABLE meal_logs ADD COLUMN void_reason VARCHAR(255) NULL", "meal_logs.void_reason"),
                 ("ALTER TABLE meal_logs ADD COLUMN void_operator_id INT NULL", "meal_logs.void_operator_id"),
                 ("ALTER TABLE meal_logs ADD COLUMN voided_at DATETIME NULL", "meal_logs.voided_at"),
+                (
+                    "CREATE INDEX ix_meal_logs_day_stats ON meal_logs (created_at, is_void, policy_id, guest_count)",
+                    "meal_logs ix_meal_logs_day_stats",
+                ),
+                ("ALTER TABLE meal_logs ADD COLUMN meal_date DATE NULL", "meal_logs.meal_date"),
+                (
+                    "CREATE INDEX ix_meal_logs_meal_date ON meal_logs (meal_date, is_void, policy_id, guest_count)",
+                    "meal_logs ix_meal_logs_meal_date",
+                ),
+                ("CREATE INDEX ix_meal_logs_created_id ON meal_logs (created_at, id)", "meal_logs ix_meal_logs_created_id"),
             ):
                 _mysql_try_ddl(conn, ddl, label)
 
@@ -92,6 +102,24 @@ def ensure_meal_logs_columns(engine: Engine) -> None:
                     "ALTER TABLE meal_logs ADD COLUMN IF NOT EXISTS voided_at TIMESTAMPTZ NULL",
                     "meal_logs.voided_at",
                 ),
+                (
+                    "CREATE INDEX IF NOT EXISTS ix_meal_logs_day_stats "
+                    "ON meal_logs (created_at, is_void, policy_id, guest_count)",
+                    "meal_logs ix_meal_logs_day_stats",
+                ),
+                (
+                    "ALTER TABLE meal_logs ADD COLUMN IF NOT EXISTS meal_date DATE NULL",
+                    "meal_logs.meal_date",
+                ),
+                (
+                    "CREATE INDEX IF NOT EXISTS ix_meal_logs_meal_date "
+                    "ON meal_logs (meal_date, is_void, policy_id, guest_count)",
+                    "meal_logs ix_meal_logs_meal_date",
+                ),
+                (
+                    "CREATE INDEX IF NOT EXISTS ix_meal_logs_created_id ON meal_logs (created_at, id)",
+                    "meal_logs ix_meal_logs_created_id",
+                ),
             ):
                 _pg_try_ddl(conn, ddl, label)
 
@@ -105,5 +133,74 @@ def ensure_meal_logs_columns(engine: Engine) -> None:
                 ("ALTER TABLE meal_logs ADD COLUMN void_reason VARCHAR(255) NULL", "meal_logs.void_reason"),
                 ("ALTER TABLE meal_logs ADD COLUMN void_operator_id INTEGER NULL", "meal_logs.void_operator_id"),
                 ("ALTER TABLE meal_logs ADD COLUMN voided_at DATETIME NULL", "meal_logs.voided_at"),
+                (
+                    "CREATE INDEX IF NOT EXISTS ix_meal_logs_day_stats "
+                    "ON meal_logs (created_at, is_void, policy_id, guest_count)",
+                    "meal_logs ix_meal_logs_day_stats",
+                ),
+                ("ALTER TABLE meal_logs ADD COLUMN meal_date DATE NULL", "meal_logs.meal_date"),
+                (
+                    "CREATE INDEX IF NOT EXISTS ix_meal_logs_meal_date "
+                    "ON meal_logs (meal_date, is_void, policy_id, guest_count)",
+                    "meal_logs ix_meal_logs_meal_date",
+                ),
+                (
+                    "CREATE INDEX IF NOT EXISTS ix_meal_logs_created_id ON meal_logs (created_at, id)",
+                    "meal_logs ix_meal_logs_created_id",
+                ),
             ):
                 _sqlite_try_ddl(conn, ddl, label)
+
+
+
+_SYNC_TABLES = ("employees", "departments", "companies", "meal_policies")
+
+
+def ensure_sync_columns(engine: Engine) -> None:
+    """목록 델타 동기화용 updated_at (+ 인덱스)이 예전 DB에 없으면 추가. 기존 행은 NULL (첫 전체 조회로 받음)."""
+    with engine.begin() as conn:
+        dialect = conn.dialect.name
+        for table in _SYNC_TABLES:
+            label = f"{table}.updated_at"
+            index_ddl = f"CREATE INDEX ix_{table}_updated_at ON {table} (updated_at)"
+            if dialect == "mysql":
+                _mysql_try_ddl(conn, f"ALTER TABLE {table} ADD COLUMN updated_at DATETIME NULL", label)
+                _mysql_try_ddl(conn, index_ddl, f"{table} ix_{table}_updated_at")
+            elif dialect == "postgresql":
+                _pg_try_ddl(conn, f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP NULL", label)
+                _pg_try_ddl(
+                    conn, index_ddl.replace("CREATE INDEX", "CREATE INDEX IF NOT EXISTS"), f"{table} ix_{table}_updated_at"
+                )
+            elif dialect == "sqlite":
+                _sqlite_try_ddl(conn, f"ALTER TABLE {table} ADD COLUMN updated_at DATETIME NULL", label)
+                _sqlite_try_ddl(
+                    conn, index_ddl.replace("CREATE INDEX", "CREATE INDEX IF NOT EXISTS"), f"{table} ix_{table}_updated_at"
+                )
+
+def backfill_meal_log_dates(engine: Engine, chunk_size: int = 5000) -> int:
+    """meal_date 가 비어 있는 기존 행을 created_at(KST naive) 날짜로 채움.
+    id 구간(chunk_size)마다 UPDATE + 커밋해 긴 잠금 없이 진행. 채운 행 수 반환."""
+    with engine.connect() as conn:
+        if conn.execute(text("SELECT 1 FROM meal_logs WHERE meal_date IS NULL LIMIT 1")).first() is None:
+            return 0
+        lo, hi = conn.execute(
+            text("SELECT MIN(id), MAX(id) FROM meal_logs WHERE meal_date IS NULL")
+        ).one()
+    if lo is None:
+        return 0
+    filled = 0
+    start = int(lo)
+    while start <= int(hi):
+        with engine.begin() as conn:
+            res = conn.execute(
+                text(
+                    "UPDATE meal_logs SET meal_date = DATE(created_at) "
+                    "WHERE id >= :lo AND id < :hi AND meal_date IS NULL AND created_at IS NOT NULL"
+                ),
+                {"lo": start, "hi": start + chunk_size},
+            )
+            filled += res.rowcount or 0
+        start += chunk_size
+    if filled:
+        logger.info("Schema repair: meal_logs.meal_date backfilled %s rows", filled)
+    return filled
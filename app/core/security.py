@@ -28,9 +28,20 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     except Exception:
         return False
 
-def get_password_hash(password: str) -> str:
+def get_password_hash(password: str, rounds: Optional[int] = None) -> str:
     # bcrypt requires bytes and returns bytes, so we decode to string for DB storage
-    # Reduce rounds to 10 (from default 12) for faster hashing (~100ms vs ~400ms+)
-    salt = bcrypt.gensalt(rounds=10)
+    # 비용(rounds)은 BCRYPT_ROUNDS (기본 10, bcrypt 기본 12보다 빠름 ~100ms vs ~400ms+)
+    salt = bcrypt.gensalt(rounds=effective_bcrypt_rounds(rounds))
     hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
     return hashed.decode('utf-8')
+
+def effective_bcrypt_rounds(rounds: Optional[int] = None) -> int:
+    """실제 해시에 쓰는 비용: rounds(없으면 BCRYPT_ROUNDS)를 bcrypt 허용 범위 4~31 로 맞춘 값."""
+    return max(4, min(31, rounds or settings.BCRYPT_ROUNDS))
+
+def bcrypt_rounds(hashed_password: Optional[str]) -> Optional[int]:
+    """bcrypt 해시($2b$10$...)에 기록된 비용. 형식이 다르면 None."""
+    try:
+        return int((hashed_password or "").split("$")[2])
+    except (IndexError, ValueError):
+        return None
@@ -16,6 +16,11 @@ def kst_now():
     return datetime.now(KST)
 
 
+def kst_now_naive():
+    """한국 현재 시각 (naive). updated_at 등 KST 로컬 시각 그대로 저장하는 컬럼용."""
+    return kst_now().replace(tzinfo=None)
+
+
 def kst_today():
     """한국 기준 오늘 날짜."""
     return kst_now().date()
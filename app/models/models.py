@@ -1,7 +1,9 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Date, JSON, Boolean, Time
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Date, JSON, Boolean, Time, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
+from app.core.time_utils import kst_now_naive, kst_today
+from datetime import datetime
 
 # 식당 운영 위탁사 관리자 (사원과 별도 테이블)
 class CafeteriaAdmin(Base):
@@ -21,6 +23,7 @@ class Company(Base):
     name = Column(String(100), nullable=False)
     domain = Column(String(100), unique=True, index=True, nullable=True)
     config = Column(JSON, default={})
+    updated_at = Column(DateTime(timezone=False), default=kst_now_naive, onupdate=kst_now_naive, index=True)  # KST naive, 목록 델타 동기화(?since=)
     
     users = relationship("User", back_populates="company", cascade="all, delete-orphan", passive_deletes=True)
     departments = relationship("Department", back_populates="company", cascade="all, delete-orphan", passive_deletes=True)
@@ -32,6 +35,7 @@ class Department(Base):
     company_id = Column(Integer, ForeignKey("companies.id", ondelete="CASCADE"))
     code = Column(String(50), index=True) # Dept Code
     name = Column(String(100), nullable=False)
+    updated_at = Column(DateTime(timezone=False), default=kst_now_naive, onupdate=kst_now_naive, index=True)  # KST naive, 목록 델타 동기화(?since=)
     
     company = relationship("Company", back_populates="departments")
     users = relationship("User", back_populates="department_ref")
@@ -54,6 +58,7 @@ class User(Base):
     is_admin = Column(Boolean, default=False)
     
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=False), default=kst_now_naive, onupdate=kst_now_naive, index=True)  # KST naive, 목록 델타 동기화(?since=)
     
     company = relationship("Company", back_populates="users")
     department_ref = relationship("Department", back_populates="users")
@@ -74,6 +79,7 @@ class MealPolicy(Base):
     base_price = Column(Integer, default=0)
     guest_price = Column(Integer, default=0)
     is_active = Column(Boolean, default=True)
+    updated_at = Column(DateTime(timezone=False), default=kst_now_naive, onupdate=kst_now_naive, index=True)  # KST naive, 목록 델타 동기화(?since=)
     
     company = relationship("Company", back_populates="policies")
 
@@ -123,8 +129,23 @@ class MealQlightTerminal(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
 
+def _meal_date_default(context):
+    """INSERT 시 meal_date = created_at(KST naive) 의 날짜. ORM·Core(그룹 커밋) INSERT 모두 적용."""
+    created_at = context.get_current_parameters().get("created_at")
+    if isinstance(created_at, datetime):
+        return created_at.date()
+    return kst_today()
+
+
 class MealLog(Base):
     __tablename__ = "meal_logs"
+    # 일자 범위 집계(대시보드·보고서)용 커버링 인덱스: created_at 범위 + is_void/policy_id/guest_count 를 테이블 접근 없이 읽음
+    __table_args__ = (
+        Index("ix_meal_logs_day_stats", "created_at", "is_void", "policy_id", "guest_count"),
+        Index("ix_meal_logs_meal_date", "meal_date", "is_void", "policy_id", "guest_count"),
+        # 원시 데이터 키셋 페이지(/raw-data/page) 정렬·커서 조건
+        Index("ix_meal_logs_created_id", "created_at", "id"),
+    )
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("employees.id", ondelete="CASCADE"))
     policy_id = Column(Integer, ForeignKey("meal_policies.id", ondelete="CASCADE"))
@@ -142,11 +163,43 @@ class MealLog(Base):
     voided_at = Column(DateTime(timezone=True), nullable=True)
     
     created_at = Column(DateTime(timezone=False), server_default=func.now())  # 한국 시간(KST) 로컬 시각 그대로 저장
+    # created_at 의 KST 날짜 (일자별 GROUP BY·필터용). INSERT 시 자동, created_at 수정 시 함께 갱신
+    meal_date = Column(Date, nullable=True, default=_meal_date_default)
     
     user = relationship("User", foreign_keys=[user_id], back_populates="meal_logs")
     policy = relationship("MealPolicy")
     void_operator = relationship("User", foreign_keys=[void_operator_id], back_populates="voided_logs")
 
+class MealDailyRollup(Base):
+    """식수 일별 집계 (보고서용). 키 (KST 날짜, 정책, 부서, 사원), 정책·부서 없음은 0. 취소 기록 제외.
+    식수 기록 변경 시 같은 트랜잭션에서 증감 (app/core/meal_rollups.py)."""
+    __tablename__ = "meal_daily_rollups"
+    __table_args__ = (
+        UniqueConstraint("meal_date", "policy_id", "department_id", "user_id", name="uq_meal_daily_rollups_key"),
+        Index("ix_meal_daily_rollups_user", "user_id"),
+    )
+    id = Column(Integer, primary_key=True, index=True)
+    meal_date = Column(Date, nullable=False)
+    policy_id = Column(Integer, nullable=False, default=0)
+    department_id = Column(Integer, nullable=False, default=0, index=True)
+    user_id = Column(Integer, ForeignKey("employees.id", ondelete="CASCADE"), nullable=False)
+    meal_count = Column(Integer, nullable=False, default=0)  # 식수 기록 건수 (사원 본인)
+    guest_count = Column(Integer, nullable=False, default=0)
+    amount = Column(Integer, nullable=False, default=0)  # final_price × (1 + guest_count) 합
+
+
+class MealScanIdempotency(Base):
+    """QR 스캔 Idempotency-Key 별 최초 응답. 같은 (사원, 키) 재전송 시 이 응답을 그대로 반환."""
+    __tablename__ = "meal_scan_idempotency"
+    __table_args__ = (UniqueConstraint("user_id", "idem_key", name="uq_meal_scan_idem_user_key"),)
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("employees.id", ondelete="CASCADE"), nullable=False)
+    idem_key = Column(String(100), nullable=False)
+    meal_log_id = Column(Integer, nullable=True)
+    response = Column(JSON, nullable=True)
+    created_at = Column(DateTime(timezone=False), server_default=func.now(), index=True)  # KST naive
+
+
 class AuditLog(Base):
     __tablename__ = "audit_logs"
     id = Column(Integer, primary_key=True, index=True)
@@ -168,3 +221,36 @@ class SystemSetting(Base):
     id = Column(Integer, primary_key=True, index=True)
     key = Column(String(50), unique=True, nullable=False, index=True)
     value = Column(JSON, nullable=True, default=dict)
+
+
+class BackgroundJob(Base):
+    """백그라운드 작업 (사원 엑셀 일괄 등록·보고서 엑셀·식수 기록 일괄 취소). 실행은 app/core/jobs.py 작업 풀,
+    상태는 이 테이블에 두어 어느 워커에서나 GET /jobs/{id} 로 조회. 시각은 KST naive."""
+    __tablename__ = "background_jobs"
+    id = Column(String(32), primary_key=True)
+    kind = Column(String(50), nullable=False)
+    status = Column(String(20), nullable=False, default="QUEUED")  # QUEUED, RUNNING, SUCCEEDED, FAILED
+    done = Column(Integer, default=0)
+    total = Column(Integer, nullable=True)
+    message = Column(String(255), nullable=True)
+    result = Column(JSON, nullable=True)
+    error = Column(String(1000), nullable=True)
+    result_path = Column(String(500), nullable=True)  # 결과 파일 (엑셀 등). JOB_RESULT_DIR 아래
+    result_filename = Column(String(255), nullable=True)
+    result_media_type = Column(String(100), nullable=True)
+    created_by = Column(Integer, nullable=True)  # 식당관리자 id
+    created_at = Column(DateTime(timezone=False), nullable=True, index=True)
+    started_at = Column(DateTime(timezone=False), nullable=True)
+    finished_at = Column(DateTime(timezone=False), nullable=True)
+    updated_at = Column(DateTime(timezone=False), nullable=True)
+
+
+class SyncTombstone(Base):
+    """삭제된 사원·부서·회사·식사 정책 id. 목록 델타 동기화(?since=)가 삭제를 알리는 데 사용 (app/core/delta_sync.py).
+    SYNC_TOMBSTONE_RETENTION_DAYS 지난 행은 삭제 기록 시 정리. 시각은 KST naive."""
+    __tablename__ = "sync_tombstones"
+    __table_args__ = (Index("ix_sync_tombstones_entity_deleted", "entity", "deleted_at"),)
+    id = Column(Integer, primary_key=True)
+    entity = Column(String(30), nullable=False)  # employees, departments, companies, meal_policies
+    entity_id = Column(Integer, nullable=False)
+    deleted_at = Column(DateTime(timezone=False), nullable=False, index=True)
@@ -121,6 +121,20 @@ class MealLogAdminDetail(MealLogResponse):
     void_operator: Optional[UserResponse] = None
     void_reason: Optional[str] = None
 
+class MealLogPage(BaseModel):
+    """GET /raw-data/page 응답. next_cursor 가 null 이면 마지막 페이지."""
+    items: List[MealLogAdminDetail]
+    next_cursor: Optional[str] = None
+
+class MealLogBulkVoid(BaseModel):
+    """POST /raw-data/bulk-void (백그라운드 작업). log_ids 또는 기간(start_date·end_date, 선택 search·path) 지정."""
+    reason: str
+    log_ids: Optional[List[int]] = None
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+    search: Optional[str] = None
+    path: Optional[str] = None
+
 class MealLogUpdate(BaseModel):
     created_at: Optional[datetime] = None
     user_id: Optional[int] = None
@@ -337,3 +351,20 @@ class MealQlightTerminalResponse(MealQlightTerminalBase):
 
     class Config:
         from_attributes = True
+
+
+# Background Job Schemas
+class JobResponse(BaseModel):
+    """백그라운드 작업 상태 (app.core.jobs). status: QUEUED, RUNNING, SUCCEEDED, FAILED. 시각은 KST 문자열."""
+    id: str
+    kind: str
+    status: str
+    done: int = 0
+    total: Optional[int] = None
+    message: Optional[str] = None
+    result: Optional[dict] = None
+    error: Optional[str] = None
+    has_file: bool = False  # True 면 GET /jobs/{id}/result 로 결과 파일
+    created_at: Optional[str] = None
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
@@ -0,0 +1,179 @@
+"""기기 인증(로그인) 처리량 벤치마크: QR 스캔 부하 중 POST /api/auth/verify_device 동시 요청.
+
+bcrypt 계산 위치별로 비교: 스레드(PASSWORD_HASH_WORKERS=0) vs 프로세스 풀(PASSWORD_HASH_WORKERS=N).
+모드마다 로그인 요청과 스캔 요청을 동시에 보내 로그인/s·429 수, 같은 시간 스캔 처리량·지연을 출력
+(스캔만 보낸 기준값 포함). 기본은 임시 SQLite DB, --db-url 로 MySQL 지정 가능 (빈 DB 사용).
+
+사용: python bench_login.py --logins 300 --scans 600 --workers 2
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+_PASSWORD = "bench-password"
+
+
+def _parse_args():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--db-url", default="", help="동기 DB URL (기본: 임시 SQLite 파일)")
+    ap.add_argument("--logins", type=int, default=300, help="모드별 로그인 요청 수")
+    ap.add_argument("--login-concurrency", type=int, default=50, help="동시 로그인 요청 수")
+    ap.add_argument("--scans", type=int, default=600, help="모드별 스캔 요청 수")
+    ap.add_argument("--scan-concurrency", type=int, default=50, help="동시 스캔 요청 수")
+    ap.add_argument("--users", type=int, default=200, help="사원 수")
+    ap.add_argument("--workers", type=int, default=2, help="프로세스 풀 모드의 PASSWORD_HASH_WORKERS")
+    ap.add_argument("--rounds", type=int, default=0, help="BCRYPT_ROUNDS (기본: 설정값)")
+    return ap.parse_args()
+
+
+def _seed(n_users: int):
+    from datetime import time as dtime
+
+    from app.core.database import Base, SessionLocal, engine
+    from app.core.security import create_access_token, get_password_hash
+    from app.models.models import Company, Department, MealPolicy, User
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        company = Company(code="BENCH", name="Bench")
+        db.add(company)
+        db.flush()
+        dept = Department(company_id=company.id, code="BENCH", name="Bench")
+        db.add(dept)
+        db.flush()
+        db.add(
+            MealPolicy(
+                company_id=company.id, meal_type="중식",
+                start_time=dtime(0, 0), end_time=dtime(23, 59, 59), base_price=5000,
+            )
+        )
+        password_hash = get_password_hash(_PASSWORD)  # 모든 사원 같은 비밀번호 (해시는 한 번만)
+        users = [
+            User(
+                company_id=company.id, department_id=dept.id, emp_no=f"B{i:05d}", name=f"bench{i}",
+                status="ACTIVE", is_verified=True, password_hash=password_hash,
+            )
+            for i in range(n_users)
+        ]
+        db.add_all(users)
+        db.commit()
+        return [(u.emp_no, u.name) for u in users], [create_access_token(subject=u.id, permanent=True) for u in users]
+    finally:
+        db.close()
+
+
+def _summary(latencies, count: int, elapsed: float, unit: str):
+    if not latencies:
+        return {f"{unit}/s": 0}
+    latencies.sort()
+    return {
+        f"{unit}/s": round(count / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 1),
+        "p95_ms": round(latencies[int(len(latencies) * 0.95) - 1] * 1000, 1),
+    }
+
+
+async def _run(app, logins, tokens, args, with_logins: bool):
+    import httpx
+
+    # 앱 예외(SQLite 잠금 등)는 500 응답으로 받아 오류 수로 집계
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+        async def scans():
+            sem = asyncio.Semaphore(args.scan_concurrency)
+            latencies = []
+            errors = 0
+
+            async def one(i: int):
+                nonlocal errors
+                headers = {"Authorization": f"Bearer {tokens[i % len(tokens)]}"}
+                async with sem:
+                    t0 = time.perf_counter()
+                    r = await client.post("/api/meal/qr-scan", json={"qr_data": "bluecom_meal_management"}, headers=headers)
+                    latencies.append(time.perf_counter() - t0)
+                    if r.status_code != 200:
+                        errors += 1
+
+            t_start = time.perf_counter()
+            await asyncio.gather(*(one(i) for i in range(args.scans)))
+            out = _summary(latencies, args.scans, time.perf_counter() - t_start, "scans")
+            out["errors"] = errors
+            return out
+
+        async def verify_devices():
+            sem = asyncio.Semaphore(args.login_concurrency)
+            latencies = []
+            statuses = {}
+
+            async def one(i: int):
+                emp_no, name = logins[i % len(logins)]
+                async with sem:
+                    t0 = time.perf_counter()
+                    r = await client.post(
+                        "/api/auth/verify_device", json={"emp_no": emp_no, "name": name, "password": _PASSWORD}
+                    )
+                    statuses[r.status_code] = statuses.get(r.status_code, 0) + 1
+                    if r.status_code == 200:
+                        latencies.append(time.perf_counter() - t0)
+
+            t_start = time.perf_counter()
+            await asyncio.gather(*(one(i) for i in range(args.logins)))
+            out = _summary(latencies, len(latencies), time.perf_counter() - t_start, "logins")
+            out["status"] = statuses
+            return out
+
+        if not with_logins:
+            return {"scan": await scans()}
+        scan_result, login_result = await asyncio.gather(scans(), verify_devices())
+        return {"login": login_result, "scan": scan_result}
+
+
+def main():
+    args = _parse_args()
+    if args.db_url:
+        os.environ["DATABASE_URL"] = args.db_url
+    else:
+        tmpdir = tempfile.mkdtemp(prefix="bench_login_")
+        os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tmpdir, "bench.db")
+    if args.rounds:
+        os.environ["BCRYPT_ROUNDS"] = str(args.rounds)
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+    import logging
+
+    logging.disable(logging.WARNING)
+    from app.core import database
+    from app.core.config import settings
+    from app.core.password_hasher import password_hasher
+    from main import app
+
+    logins, tokens = _seed(args.users)
+
+    async def all_modes():
+        # async 엔진 커넥션 풀이 이벤트 루프에 묶이므로 모든 모드를 한 루프에서 실행
+        results = {"scans only": await _run(app, logins, tokens, args, with_logins=False)}
+        for name, workers in (("thread (workers=0)", 0), (f"process pool (workers={args.workers})", args.workers)):
+            password_hasher.close()
+            settings.PASSWORD_HASH_WORKERS = workers
+            results[name] = await _run(app, logins, tokens, args, with_logins=True)
+        password_hasher.close()
+        return results
+
+    results = asyncio.run(all_modes())
+
+    print(
+        f"logins={args.logins} scans={args.scans} rounds={settings.BCRYPT_ROUNDS} "
+        f"max_pending={settings.PASSWORD_HASH_MAX_PENDING} cpus={os.cpu_count()} "
+        f"db={database.engine.url.get_backend_name()}"
+    )
+    for name, r in results.items():
+        print(f"  {name:<28} {r}")
+
+
+if __name__ == "__main__":
+    main()
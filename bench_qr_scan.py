@@ -0,0 +1,127 @@
+"""QR 스캔 처리량 벤치마크: async 엔진 경로 vs 스레드풀(동기 세션) 경로.
+
+기본은 임시 SQLite(aiosqlite) DB. 운영과 같은 조건으로 보려면 --db-url 로 MySQL 지정
+(예: mysql+pymysql://user:pw@host:3306/bench_db — 테이블을 만들고 데이터를 넣으므로 빈 DB 사용).
+
+사용: python bench_qr_scan.py --scans 600 --concurrency 100
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+
+def _parse_args():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--db-url", default="", help="동기 DB URL (기본: 임시 SQLite 파일)")
+    ap.add_argument("--scans", type=int, default=600, help="모드별 스캔 요청 수")
+    ap.add_argument("--concurrency", type=int, default=100, help="동시 요청 수")
+    ap.add_argument("--users", type=int, default=200, help="스캔할 사원 수")
+    return ap.parse_args()
+
+
+def _seed(n_users: int):
+    from datetime import time as dtime
+
+    from app.core.database import Base, SessionLocal, engine
+    from app.core.security import create_access_token
+    from app.models.models import Company, Department, MealPolicy, User
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        company = Company(code="BENCH", name="Bench")
+        db.add(company)
+        db.flush()
+        dept = Department(company_id=company.id, code="BENCH", name="Bench")
+        db.add(dept)
+        db.flush()
+        db.add(
+            MealPolicy(
+                company_id=company.id, meal_type="중식",
+                start_time=dtime(0, 0), end_time=dtime(23, 59, 59), base_price=5000,
+            )
+        )
+        users = [
+            User(
+                company_id=company.id, department_id=dept.id, emp_no=f"B{i:05d}",
+                name=f"bench{i}", status="ACTIVE", is_verified=True,
+            )
+            for i in range(n_users)
+        ]
+        db.add_all(users)
+        db.commit()
+        return [create_access_token(subject=u.id, permanent=True) for u in users]
+    finally:
+        db.close()
+
+
+async def _run(app, tokens, n_scans: int, concurrency: int):
+    import httpx
+
+    sem = asyncio.Semaphore(concurrency)
+    latencies = []
+    errors = 0
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        async def one(i: int):
+            nonlocal errors
+            headers = {"Authorization": f"Bearer {tokens[i % len(tokens)]}"}
+            async with sem:
+                t0 = time.perf_counter()
+                r = await client.post("/api/meal/qr-scan", json={"qr_data": "bluecom_meal_management"}, headers=headers)
+                latencies.append(time.perf_counter() - t0)
+                if r.status_code != 200:
+                    errors += 1
+
+        t_start = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(n_scans)))
+        elapsed = time.perf_counter() - t_start
+
+    latencies.sort()
+    return {
+        "scans/s": round(n_scans / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 1),
+        "p95_ms": round(latencies[int(len(latencies) * 0.95) - 1] * 1000, 1),
+        "errors": errors,
+    }
+
+
+def main():
+    args = _parse_args()
+    tmpdir = None
+    if args.db_url:
+        os.environ["DATABASE_URL"] = args.db_url
+    else:
+        tmpdir = tempfile.mkdtemp(prefix="bench_qr_")
+        os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tmpdir, "bench.db")
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+    import logging
+
+    logging.disable(logging.INFO)
+    from app.core import database
+    from main import app
+
+    tokens = _seed(args.users)
+    async_sessionmaker = database.AsyncSessionLocal
+    if async_sessionmaker is None:
+        print("async 엔진 없음 (aiomysql/aiosqlite·greenlet 설치 확인). 스레드풀 경로만 측정합니다.")
+
+    results = {}
+    database.AsyncSessionLocal = None
+    results["threadpool (sync session)"] = asyncio.run(_run(app, tokens, args.scans, args.concurrency))
+    if async_sessionmaker is not None:
+        database.AsyncSessionLocal = async_sessionmaker
+        results["async engine"] = asyncio.run(_run(app, tokens, args.scans, args.concurrency))
+
+    print(f"scans={args.scans} concurrency={args.concurrency} db={database.engine.url.get_backend_name()}")
+    for name, r in results.items():
+        print(f"  {name:<28} {r}")
+
+
+if __name__ == "__main__":
+    main()
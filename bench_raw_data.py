@@ -0,0 +1,125 @@
+"""원시 데이터 조회 벤치마크: GET /api/admin/raw-data 기본(full, ORM+pydantic) vs view=compact (Core select + 배열 JSON).
+
+기본은 임시 SQLite DB 에 식수 기록을 넣고 같은 기간을 모드별로 반복 조회해 rows/s 비교.
+운영과 같은 조건으로 보려면 --db-url 로 MySQL 지정 (테이블을 만들고 데이터를 넣으므로 빈 DB 사용).
+
+사용: python bench_raw_data.py --rows 20000 --repeat 3
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+
+def _parse_args():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--db-url", default="", help="동기 DB URL (기본: 임시 SQLite 파일)")
+    ap.add_argument("--rows", type=int, default=20000, help="넣을 식수 기록 수")
+    ap.add_argument("--users", type=int, default=500, help="사원 수")
+    ap.add_argument("--days", type=int, default=30, help="기록을 나눠 넣을 일수 (조회 기간)")
+    ap.add_argument("--repeat", type=int, default=3, help="모드별 반복 횟수 (최고 값 사용)")
+    return ap.parse_args()
+
+
+def _seed(n_rows: int, n_users: int, n_days: int):
+    from datetime import datetime, time as dtime, timedelta
+
+    from sqlalchemy import insert
+
+    from app.core.database import Base, SessionLocal, engine
+    from app.core.security import create_access_token
+    from app.models.models import CafeteriaAdmin, Company, Department, MealLog, MealPolicy, User
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        company = Company(code="BENCH", name="Bench")
+        db.add(company)
+        db.flush()
+        dept = Department(company_id=company.id, code="BENCH", name="Bench")
+        db.add(dept)
+        policy = MealPolicy(
+            company_id=company.id, meal_type="중식",
+            start_time=dtime(0, 0), end_time=dtime(23, 59, 59), base_price=5000,
+        )
+        db.add(policy)
+        admin = CafeteriaAdmin(emp_no="BENCH_ADMIN", name="bench", is_verified=True)
+        db.add(admin)
+        db.flush()
+        users = [
+            User(
+                company_id=company.id, department_id=dept.id, emp_no=f"B{i:05d}",
+                name=f"bench{i}", status="ACTIVE", is_verified=True,
+            )
+            for i in range(n_users)
+        ]
+        db.add_all(users)
+        db.flush()
+        start = datetime.combine(datetime.now().date() - timedelta(days=n_days), dtime(11, 30))
+        step = timedelta(days=n_days) / max(1, n_rows)
+        rows = [
+            {
+                "user_id": users[i % n_users].id, "policy_id": policy.id, "guest_count": i % 3,
+                "status": "SERVED", "path": "PWA", "final_price": 5000, "is_void": i % 50 == 0,
+                "created_at": start + step * i,
+            }
+            for i in range(n_rows)
+        ]
+        for i in range(0, n_rows, 5000):
+            db.execute(insert(MealLog), rows[i:i + 5000])
+        db.commit()
+        token = create_access_token(subject=f"admin:{admin.id}")
+        return token, (start.date().isoformat(), datetime.now().date().isoformat())
+    finally:
+        db.close()
+
+
+def _measure(client, headers, params, repeat: int):
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        r = client.get("/api/admin/raw-data", params=params, headers=headers)
+        elapsed = time.perf_counter() - t0
+        r.raise_for_status()
+        body = r.json()
+        n = len(body["rows"]) if isinstance(body, dict) else len(body)
+        if best is None or elapsed < best[0]:
+            best = (elapsed, n, len(r.content))
+    elapsed, n, size = best
+    return {"rows": n, "seconds": round(elapsed, 3), "rows/s": round(n / elapsed), "bytes": size}
+
+
+def main():
+    args = _parse_args()
+    if args.db_url:
+        os.environ["DATABASE_URL"] = args.db_url
+    else:
+        tmpdir = tempfile.mkdtemp(prefix="bench_raw_")
+        os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tmpdir, "bench.db")
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+    import logging
+
+    logging.disable(logging.WARNING)
+    from fastapi.testclient import TestClient
+
+    from app.core import database
+    from main import app
+
+    token, (start_date, end_date) = _seed(args.rows, args.users, args.days)
+    headers = {"Authorization": f"Bearer {token}"}
+    base = {"start_date": start_date, "end_date": end_date}
+    with TestClient(app) as client:
+        results = {
+            "full (ORM + pydantic)": _measure(client, headers, base, args.repeat),
+            "view=compact": _measure(client, headers, {**base, "view": "compact"}, args.repeat),
+        }
+
+    print(f"rows={args.rows} days={args.days} db={database.engine.url.get_backend_name()}")
+    for name, r in results.items():
+        print(f"  {name:<24} {r}")
+
+
+if __name__ == "__main__":
+    main()
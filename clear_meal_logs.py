@@ -1,13 +1,16 @@
 """기존 식사 로그(meal_logs) 전부 삭제. 테스트 초기화용. 한 번만 실행."""
 from sqlalchemy import delete
 from app.core.database import SessionLocal
-from app.models.models import MealLog
+from app.core.report_cache import report_cache
+from app.models.models import MealDailyRollup, MealLog
 
 
 def clear_meal_logs():
     with SessionLocal() as session:
         result = session.execute(delete(MealLog))
+        session.execute(delete(MealDailyRollup))
         session.commit()
+        report_cache.invalidate_all()  # 같은 호스트 서버의 보고서 디스크 캐시
         print(f"meal_logs 삭제 완료: {result.rowcount}건")
 
 
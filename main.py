@@ -1,6 +1,7 @@
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
+import asyncio
 import os
 import logging
 
@@ -9,11 +10,21 @@ logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
 
 from app.api import auth, meal, admin
 from app.core.database import engine, Base
-from app.core.schema_repair import ensure_meal_logs_columns
+from app.core.schema_repair import backfill_meal_log_dates, ensure_meal_logs_columns, ensure_sync_columns
 from app.core.meal_qr_terminal_migration import run_meal_qr_terminal_migration
 from app.core.split_legacy_terminals_migration import run_split_legacy_terminals_if_needed
-from app.core.database import SessionLocal
-from app.models.models import MealPrinterTerminal, MealQlightTerminal, SystemSetting  # noqa: F401 — create_all 메타데이터
+from app.core.database import SessionLocal, async_engine
+from app.core.qr_routing import rebuild_qr_routing_table
+from app.core.meal_policy_resolver import rebuild_policy_resolver
+from app.core.employee_search import rebuild_employee_index
+from app.core.meal_log_writer import meal_log_writer
+from app.core.jobs import job_runner
+from app.core.audit_writer import audit_writer
+from app.core.password_hasher import password_hasher
+from app.core.live_counters import live_counters
+from app.core.meal_rollups import backfill_rollups_if_needed
+from app.api.websocket import manager as ws_manager
+from app.models.models import BackgroundJob, MealDailyRollup, MealPrinterTerminal, MealQlightTerminal, SyncTombstone, SystemSetting  # noqa: F401 — create_all 메타데이터
 
 app = FastAPI(title="PWA Meal Auth System")
 
@@ -36,6 +47,14 @@ async def startup():
         _logger.info("DB 누락 컬럼 보강 완료 (meal_logs: path, qr_terminal_id, void 등)")
     except Exception as e:
         _logger.warning("DB 누락 컬럼 보강 실패: %s", e)
+    try:
+        ensure_sync_columns(engine)
+    except Exception as e:
+        _logger.warning("DB 누락 컬럼 보강 실패 (updated_at): %s", e)
+    try:
+        backfill_meal_log_dates(engine)
+    except Exception as e:
+        _logger.warning("meal_logs.meal_date 채우기 실패: %s", e)
     try:
         run_meal_qr_terminal_migration(engine)
         _logger.info("meal_qr_terminals QR ID 마이그레이션 확인 완료")
@@ -50,6 +69,41 @@ async def startup():
         _logger.info("프린터·경광등 테이블 분리 이행 확인")
     except Exception as e:
         _logger.warning("프린터·경광등 테이블 분리 이행 실패: %s", e)
+    try:
+        _db = SessionLocal()
+        try:
+            backfill_rollups_if_needed(_db)
+        finally:
+            _db.close()
+    except Exception as e:
+        _logger.warning("식수 일별 집계(meal_daily_rollups) 초기 구성 실패 (rebuild_meal_rollups.py 로 재구성): %s", e)
+    try:
+        _db = SessionLocal()
+        try:
+            rebuild_qr_routing_table(_db)
+            rebuild_policy_resolver(_db)
+            rebuild_employee_index(_db)
+            live_counters.seed(_db)
+        finally:
+            _db.close()
+    except Exception as e:
+        _logger.warning("QR 라우팅·식사 정책 캐시·사원 검색 색인·오늘 카운터 초기 구성 실패 (첫 스캔 시 재시도): %s", e)
+    try:
+        await ws_manager.start()
+    except Exception as e:
+        _logger.warning("WebSocket 백플레인 시작 실패 (단일 프로세스로 동작): %s", e)
+    job_runner.start(asyncio.get_running_loop())
+    audit_writer.start()  # 쓰기 지연 모드 또는 지난 실행에서 남은 감사 로그 보관 파일 재입력
+
+@app.on_event("shutdown")
+async def shutdown():
+    await meal_log_writer.close()
+    job_runner.close()
+    password_hasher.close()
+    audit_writer.close()
+    await ws_manager.close()
+    if async_engine is not None:
+        await async_engine.dispose()
 
 # CORS 설정
 app.add_middleware(
@@ -86,7 +140,7 @@ app.add_middleware(EnsureApiReturnsJsonMiddleware)
 
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request: Request, exc: HTTPException):
-    return JSONResponse(status_code=exc.status_code, content={"detail": exc.detail})
+    return JSONResponse(status_code=exc.status_code, content={"detail": exc.detail}, headers=getattr(exc, "headers", None))
 
 
 @app.exception_handler(Exception)
@@ -7,6 +7,7 @@ import httpx
 import asyncio
 import websockets
 import threading
+import time
 from datetime import datetime, date, timedelta, timezone
 from typing import Optional
 from PyQt5.QtWidgets import (
@@ -30,7 +31,18 @@ NOTICE_HTML_PATH = os.path.join(_MEAL_MANAGE_ROOT, "static", "notice.html")
 _DOWN_ARROW_PNG = os.path.join(_MEAL_MANAGE_ROOT, "static", "images", "down_arrow.png")
 _ws_origin = _API_BASE.replace("https://", "wss://").replace("http://", "ws://").split("/api")[0]
 WS_URL = _ws_origin + "/api/admin/ws"
+# 이 PC 가 담당하는 구역 QR ID (쉼표 구분, 예: MEAL_PC_QR_AUTH_IDS=1,3). 비우면 모든 구역 장치 이벤트 수신
+PC_QR_AUTH_IDS = [
+    int(x) for x in os.environ.get("MEAL_PC_QR_AUTH_IDS", "").replace(" ", "").split(",") if x.isdigit()
+]
+WS_TOPICS = ["stats", "raw-data", "jobs"] + ([f"device:{i}" for i in PC_QR_AUTH_IDS] or ["device:*"])
 API_TIMEOUT = 10.0
+# 서버 백그라운드 작업(엑셀 등록·보고서·일괄 취소) 완료를 기다리는 최대 시간(초)
+JOB_WAIT_TIMEOUT = 30 * 60
+# 원시 데이터 화면: 한 번에 받는 행 수, 끝에서 이 행 수 안으로 스크롤하면 다음 페이지. 보고서·엑셀용 전체 받기 페이지 크기
+RAW_DATA_PAGE_SIZE = 200
+RAW_DATA_PREFETCH_ROWS = 20
+RAW_DATA_BULK_PAGE_SIZE = 1000
 
 
 def _qss_local_img(path: str) -> str:
@@ -209,6 +221,32 @@ def _parse_meal_log_created_at(meal_data: dict):
         return None
 
 
+def _apply_stats_delta(stats: Optional[dict], delta: Optional[dict]) -> Optional[dict]:
+    """/stats/today 응답에 WebSocket stats_delta(건수·동반 인원 증감)를 더한 새 dict. 적용할 수 없으면 None (재조회 필요)."""
+    if not isinstance(stats, dict) or not isinstance(delta, dict):
+        return None
+    if str(stats.get("date") or "")[:10] != str(delta.get("date") or ""):
+        return None
+    summaries = stats.get("meal_summaries") or []
+    if any("policy_id" not in m for m in summaries):
+        return None
+    count = int(delta.get("count") or 0)
+    guests = int(delta.get("guests") or 0)
+    policy_id = delta.get("policy_id")
+    out = dict(stats)
+    out["total_count"] = int(stats.get("total_count") or 0) + count + guests
+    out["guest_count"] = int(stats.get("guest_count") or 0) + guests
+    if policy_id is None:
+        out["exception_count"] = int(stats.get("exception_count") or 0) + count
+    else:
+        out["employee_count"] = int(stats.get("employee_count") or 0) + count
+    out["meal_summaries"] = [
+        {**m, "count": int(m.get("count") or 0) + count + guests} if m.get("policy_id") == policy_id else m
+        for m in summaries
+    ]
+    return out
+
+
 def _meal_log_is_live_for_devices(meal_data: dict) -> bool:
     """실시간 QR 인증만 True. 수동·과거·이미 저장된 재인증은 False."""
     if not meal_data:
@@ -231,11 +269,23 @@ def _meal_log_is_live_for_devices(meal_data: dict) -> bool:
 class WSClient(QThread):
     message_received = pyqtSignal(dict)
     
-    def __init__(self, ws_url=None):
+    def __init__(self, ws_url=None, topics=None):
         super().__init__()
         self.ws_url = ws_url or WS_URL
+        self.topics = list(topics or WS_TOPICS)
         self.running = True
         self.loop = None
+        # 서버 이벤트 스트림 위치 (재접속 시 ?since= 로 놓친 이벤트만 재수신)
+        self.stream = None
+        self.last_seq = None
+
+    def _connect_url(self) -> str:
+        from urllib.parse import urlencode
+        params = {"topics": ",".join(self.topics)}
+        if self.stream and self.last_seq is not None:
+            params.update(since=self.last_seq, stream=self.stream)
+        sep = "&" if "?" in self.ws_url else "?"
+        return self.ws_url + sep + urlencode(params)
         
     def run(self):
         self.loop = asyncio.new_event_loop()
@@ -245,17 +295,36 @@ class WSClient(QThread):
     async def listen(self):
         while self.running:
             try:
-                print(f"[WS] connecting: {self.ws_url}")
-                async with websockets.connect(self.ws_url) as ws:
+                url = self._connect_url()
+                print(f"[WS] connecting: {url}")
+                # 구독한 토픽만 수신 (장치 트리거는 담당 구역 것만), 재접속이면 놓친 이벤트 재수신
+                async with websockets.connect(url) as ws:
                     self.ws = ws
                     print("[WS] connected")
                     while self.running:
                         msg = await ws.recv()
                         try:
                             data = json.loads(msg)
-                            self.message_received.emit(data)
                         except (json.JSONDecodeError, TypeError):
-                            pass
+                            continue
+                        if not isinstance(data, dict):
+                            continue
+                        seq = data.get("seq")
+                        if data.get("stream") and isinstance(seq, int):
+                            if data.get("type") in ("WELCOME", "RESYNC_REQUIRED"):
+                                # WELCOME 의 seq 는 재전송분 이후 값 → 이어받는 중이면 실제 이벤트로만 올림
+                                # (재전송 도중 끊겨도 다음 ?since= 가 받지 못한 이벤트를 건너뛰지 않게).
+                                # 새 접속·다른 stream·RESYNC(전체 다시 조회)면 여기서부터 시작
+                                if (data["type"] == "RESYNC_REQUIRED" or data["stream"] != self.stream
+                                        or self.last_seq is None):
+                                    self.stream, self.last_seq = data["stream"], seq
+                            elif data["stream"] != self.stream or self.last_seq is None:
+                                self.stream, self.last_seq = data["stream"], seq
+                            else:
+                                self.last_seq = max(self.last_seq, seq)
+                        if data.get("type") == "WELCOME" and data.get("replay"):
+                            print(f"[WS] replaying {data['replay']} missed events")
+                        self.message_received.emit(data)
             except Exception as e:
                 # Reconnect on error after delay
                 print(f"[WS] error/reconnect: {e}")
@@ -581,12 +650,61 @@ class APIClient:
         self.base_url = base_url or API_BASE_URL
         self.token = token
         self.client = httpx.Client(timeout=API_TIMEOUT)
+        # 사원·부서·회사·정책 목록 캐시: 경로 → {"rows": {id: 행}, "watermark", "etag"}. ?since= 델타로 갱신
+        self._sync_cache = {}
+        # 보고서 조건부 GET: (경로, 파라미터) → (ETag, 본문). 서버가 304 면 저장된 본문 재사용
+        self._report_etags = {}
 
     def _auth_headers(self):
         if self.token:
             return {"Authorization": f"Bearer {self.token}"}
         return {}
 
+    def _get_report(self, path, params):
+        """보고서 GET (If-None-Match). 200/304 면 본문 bytes, 실패 시 None."""
+        key = (path, tuple(sorted(params.items())))
+        cached = self._report_etags.get(key)
+        headers = self._auth_headers()
+        if cached:
+            headers["If-None-Match"] = cached[0]
+        r = self.client.get(f"{self.base_url}{path}", params=params, headers=headers)
+        if r.status_code == 304 and cached:
+            return cached[1]
+        if r.status_code != 200:
+            return None
+        etag = r.headers.get("etag")
+        if etag:
+            if len(self._report_etags) >= 32:
+                self._report_etags.pop(next(iter(self._report_etags)))
+            self._report_etags[key] = (etag, r.content)
+        return r.content
+
+    def _sync_list(self, path):
+        """목록 델타 동기화 (GET path?since=워터마크, If-None-Match). 캐시에 반영한 전체 목록, 실패 시 None.
+        304 면 캐시 그대로, full 이면 캐시 교체, 아니면 삭제 id 제거 후 바뀐 행 덮어쓰기."""
+        entry = self._sync_cache.get(path)
+        headers = self._auth_headers()
+        params = {"since": ""}
+        if entry:
+            params["since"] = entry["watermark"]
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+        r = self.client.get(f"{self.base_url}{path}", params=params, headers=headers)
+        if r.status_code == 304 and entry:
+            return list(entry["rows"].values())
+        if r.status_code != 200:
+            return None
+        body = r.json()
+        if isinstance(body, list):  # since 를 모르는 예전 서버
+            return body
+        rows = {} if body.get("full") or not entry else dict(entry["rows"])
+        for row_id in body.get("deleted") or []:
+            rows.pop(row_id, None)
+        for row in body.get("rows") or []:
+            rows[row["id"]] = row
+        self._sync_cache[path] = {"rows": rows, "watermark": body.get("watermark") or "", "etag": r.headers.get("etag")}
+        return list(rows.values())
+
     def get_stats(self):
         try:
             r = self.client.get(f"{self.base_url}/stats/today", headers=self._auth_headers())
@@ -595,13 +713,16 @@ class APIClient:
             return None
 
 
-    def get_raw_data(self, search="", start_date=None, end_date=None):
+    def get_raw_data(self, search="", start_date=None, end_date=None, view="full"):
+        """view="compact": 서버가 필요한 열만 배열로 보냄 → 화면이 쓰는 dict(user·policy 중첩) 모양으로 풀어서 반환."""
         try:
             params = {"search": search} if search else {}
             if start_date:
                 params["start_date"] = start_date
             if end_date:
                 params["end_date"] = end_date
+            if view != "full":
+                params["view"] = view
             r = self.client.get(f"{self.base_url}/raw-data", params=params, headers=self._auth_headers())
             body = None
             try:
@@ -609,12 +730,80 @@ class APIClient:
             except Exception:
                 body = {}
             if r.status_code == 200:
+                if isinstance(body, dict) and "rows" in body:
+                    return (True, _compact_rows_to_logs(body))
                 return (True, body if isinstance(body, list) else [])
             msg = (body or {}).get("detail", r.text or "조회 실패")
             return (False, msg if isinstance(msg, str) else str(msg))
         except Exception as e:
             return (False, str(e))
 
+    def get_raw_data_page(self, search="", start_date=None, end_date=None, cursor=None, limit=RAW_DATA_PAGE_SIZE, order="desc", view="full"):
+        """원시 데이터 한 페이지. (True, {"items": [...], "next_cursor": str|None}) 또는 (False, 메시지)."""
+        try:
+            params = {"limit": limit, "order": order}
+            if view != "full":
+                params["view"] = view
+            if search:
+                params["search"] = search
+            if start_date:
+                params["start_date"] = start_date
+            if end_date:
+                params["end_date"] = end_date
+            if cursor:
+                params["cursor"] = cursor
+            r = self.client.get(f"{self.base_url}/raw-data/page", params=params, headers=self._auth_headers())
+            try:
+                body = r.json()
+            except Exception:
+                body = {}
+            if r.status_code == 200 and isinstance(body, dict):
+                items = _compact_rows_to_logs(body) if "rows" in body else (body.get("items") or [])
+                return (True, {"items": items, "next_cursor": body.get("next_cursor")})
+            msg = (body or {}).get("detail", r.text or "조회 실패") if isinstance(body, dict) else (r.text or "조회 실패")
+            return (False, msg if isinstance(msg, str) else str(msg))
+        except Exception as e:
+            return (False, str(e))
+
+    def get_raw_data_all(self, search="", start_date=None, end_date=None, order="desc", view="full"):
+        """기간 전체를 페이지 단위(RAW_DATA_BULK_PAGE_SIZE)로 이어 받아 리스트로 반환. get_raw_data 와 같은 (성공, 데이터) 형식."""
+        items, cursor = [], None
+        while True:
+            ok, page = self.get_raw_data_page(search, start_date, end_date, cursor, RAW_DATA_BULK_PAGE_SIZE, order, view)
+            if not ok:
+                return (False, page)
+            items.extend(page["items"])
+            cursor = page["next_cursor"]
+            if not cursor:
+                return (True, items)
+
+    def download_raw_data_export(self, dest_path, search="", start_date=None, end_date=None, fmt="csv"):
+        """/raw-data/export 응답(인증 순 CSV·NDJSON)을 메모리에 모으지 않고 dest_path 에 바로 기록. (성공, 경로 또는 메시지)."""
+        try:
+            params = {"format": fmt}
+            if search:
+                params["search"] = search
+            if start_date:
+                params["start_date"] = start_date
+            if end_date:
+                params["end_date"] = end_date
+            with self.client.stream(
+                "GET", f"{self.base_url}/raw-data/export", params=params, headers=self._auth_headers()
+            ) as r:
+                if r.status_code != 200:
+                    r.read()
+                    try:
+                        msg = r.json().get("detail", "내보내기 실패")
+                    except Exception:
+                        msg = r.text or "내보내기 실패"
+                    return (False, msg if isinstance(msg, str) else str(msg))
+                with open(dest_path, "wb") as f:
+                    for chunk in r.iter_bytes():
+                        f.write(chunk)
+            return (True, dest_path)
+        except Exception as e:
+            return (False, str(e))
+
     def create_manual_raw_data(self, data):
         try:
             r = self.client.post(f"{self.base_url}/raw-data/manual", params=data, headers=self._auth_headers())
@@ -662,8 +851,8 @@ class APIClient:
     # Company Actions
     def get_companies(self):
         try:
-            r = self.client.get(f"{self.base_url}/companies", headers=self._auth_headers())
-            return r.json() if r.status_code == 200 else []
+            rows = self._sync_list("/companies")
+            return sorted(rows, key=lambda c: c.get("id") or 0) if rows is not None else []
         except Exception:
             return []
 
@@ -700,6 +889,10 @@ class APIClient:
     def get_policies(self):
         """(성공 여부, 목록 또는 오류 메시지). 서버 500 등 시 빈 리스트만 주면 UI에 원인이 안 보였음."""
         try:
+            rows = self._sync_list("/policies")
+            if rows is not None:
+                return (True, sorted(_normalize_api_list_payload(rows), key=lambda p: p.get("id") or 0))
+            # 실패 시 일반 조회로 오류 내용 확인
             r = self.client.get(f"{self.base_url}/policies", headers=self._auth_headers())
             try:
                 body = r.json()
@@ -749,7 +942,10 @@ class APIClient:
     # Department Actions
     def get_departments(self, company_id=None):
         try:
-            params = {"company_id": company_id} if company_id else {}
+            if not company_id:
+                rows = self._sync_list("/departments")
+                return sorted(rows, key=lambda d: d.get("id") or 0) if rows is not None else []
+            params = {"company_id": company_id}
             r = self.client.get(f"{self.base_url}/departments", params=params, headers=self._auth_headers())
             return r.json() if r.status_code == 200 else []
         except Exception:
@@ -783,6 +979,9 @@ class APIClient:
     # Employee Actions
     def get_employees(self, search="", status=None):
         try:
+            if not search and not status:
+                rows = self._sync_list("/employees")
+                return sorted(rows, key=lambda e: e.get("emp_no") or "") if rows is not None else []
             params = {"search": search}
             if status:
                 params["status"] = status
@@ -813,21 +1012,85 @@ class APIClient:
             return False
 
     def get_excel_report_data(self, year, month):
+        """보고서 엑셀 bytes, 실패 시 None.
+        어제 이전에 끝나는 달은 서버 결과 캐시가 있으므로 조건부 GET (바뀌지 않았으면 304 → 저장된 본문),
+        오늘이 포함된 달은 서버 백그라운드 작업으로 만들고 끝날 때까지 기다린 뒤 결과 파일을 받음."""
         try:
-            r = self.client.get(f"{self.base_url}/reports/excel", params={"year": year, "month": month}, headers=self._auth_headers())
-            return r.content if r.status_code == 200 else None
+            next_month = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
+            if next_month <= date.today():
+                return self._get_report("/reports/excel", {"year": year, "month": month})
+            r = self.client.post(
+                f"{self.base_url}/reports/excel/jobs", params={"year": year, "month": month},
+                headers=self._auth_headers()
+            )
+            if r.status_code != 202:
+                return None
+            job = self.wait_for_job(r.json()["id"])
+            if job.get("status") != "SUCCEEDED":
+                return None
+            return self.download_job_result(job["id"])
         except Exception:
             return None
 
     def import_employees_excel(self, company_id, file_content):
+        """엑셀 일괄 등록(백그라운드 작업)을 등록하고 끝날 때까지 대기. (성공 여부, 결과 dict 또는 오류 메시지)."""
         try:
             r = self.client.post(
-                f"{self.base_url}/employees/import",
+                f"{self.base_url}/employees/import/jobs",
                 params={"company_id": company_id},
                 content=file_content,
-                headers=self._auth_headers()
+                headers={**self._auth_headers(), "Content-Type": "application/octet-stream"}
             )
-            return (True, r.json()) if r.status_code == 200 else (False, r.json().get("detail", "가져오기 실패"))
+            if r.status_code != 202:
+                return (False, r.json().get("detail", "가져오기 실패"))
+            job = self.wait_for_job(r.json()["id"])
+            if job.get("status") != "SUCCEEDED":
+                return (False, job.get("error") or "가져오기 실패")
+            return (True, job.get("result") or {})
+        except Exception as e: return (False, str(e))
+
+    def get_job(self, job_id):
+        r = self.client.get(f"{self.base_url}/jobs/{job_id}", headers=self._auth_headers())
+        if r.status_code == 404:
+            raise RuntimeError("서버에서 작업을 찾을 수 없습니다 (정리되었거나 다른 서버의 작업). 다시 실행하세요.")
+        r.raise_for_status()
+        return r.json()
+
+    def wait_for_job(self, job_id, poll=1.0, timeout=None):
+        """작업이 SUCCEEDED/FAILED 가 될 때까지 상태 조회 (DataLoader 스레드에서 호출). 진행률은 WebSocket JOB_PROGRESS 로 표시.
+        timeout(기본 JOB_WAIT_TIMEOUT)초 안에 끝나지 않으면 RuntimeError."""
+        timeout = JOB_WAIT_TIMEOUT if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        while True:
+            job = self.get_job(job_id)
+            if job.get("status") in ("SUCCEEDED", "FAILED"):
+                return job
+            if time.monotonic() >= deadline:
+                raise RuntimeError(
+                    f"작업이 {int(timeout)}초 안에 끝나지 않았습니다 "
+                    f"(진행 {job.get('done', 0)}/{job.get('total') or '?'}). 잠시 후 결과를 다시 확인하세요."
+                )
+            time.sleep(poll)
+
+    def download_job_result(self, job_id):
+        r = self.client.get(f"{self.base_url}/jobs/{job_id}/result", headers=self._auth_headers())
+        return r.content if r.status_code == 200 else None
+
+    def bulk_void_raw_data(self, reason, log_ids=None, start_date=None, end_date=None, search=None):
+        """식수 기록 일괄 취소(백그라운드 작업) 후 대기. (성공 여부, {"voided", "matched"} 또는 오류 메시지)."""
+        body = {"reason": reason}
+        if log_ids:
+            body["log_ids"] = list(log_ids)
+        else:
+            body.update(start_date=start_date, end_date=end_date, search=search or None)
+        try:
+            r = self.client.post(f"{self.base_url}/raw-data/bulk-void", json=body, headers=self._auth_headers())
+            if r.status_code != 202:
+                return (False, r.json().get("detail", "일괄 취소 실패"))
+            job = self.wait_for_job(r.json()["id"])
+            if job.get("status") != "SUCCEEDED":
+                return (False, job.get("error") or "일괄 취소 실패")
+            return (True, job.get("result") or {})
         except Exception as e: return (False, str(e))
 
     def reset_device_auth(self, emp_id):
@@ -1926,6 +2189,12 @@ class EmployeeScreen(QWidget):
         success, data = result if isinstance(result, tuple) else (False, result)
         if success:
             msg = data.get("message", "완료되었습니다.")
+            errors = data.get("errors") or []
+            if errors:
+                lines = [f"{e.get('row')}행 {e.get('emp_no') or ''}: {e.get('reason')}" for e in errors[:10]]
+                if data.get("error_count", len(errors)) > len(lines):
+                    lines.append(f"... 외 {data.get('error_count', len(errors)) - len(lines)}건")
+                msg += "\n\n[오류 행]\n" + "\n".join(lines)
             QMessageBox.information(self, "임포트 성공", msg)
             self.load_data() # Refresh table
         else:
@@ -2330,6 +2599,31 @@ class RawDataRecordAddDialog(QDialog):
         }
 
 
+def _compact_rows_to_logs(body):
+    """/raw-data?view=compact 응답({"columns", "rows"}) → 화면 공용 dict 모양 (user·policy 중첩)."""
+    cols = body.get("columns") or []
+    logs = []
+    for values in body.get("rows") or []:
+        row = dict(zip(cols, values))
+        logs.append({
+            "id": row.get("id"),
+            "created_at": row.get("created_at"),
+            "user_id": row.get("user_id"),
+            "guest_count": row.get("guest_count") or 0,
+            "final_price": row.get("final_price") or 0,
+            "is_void": bool(row.get("is_void")),
+            "user": {
+                "id": row.get("user_id"),
+                "emp_no": row.get("emp_no"),
+                "name": row.get("name"),
+                "department_id": row.get("department_id"),
+                "department_name": row.get("department_name"),
+            },
+            "policy": {"meal_type": row.get("meal_type")} if row.get("meal_type") else None,
+        })
+    return logs
+
+
 class RawDataScreen(QWidget):
     def __init__(self, api, main_win):
         super().__init__()
@@ -2378,6 +2672,11 @@ class RawDataScreen(QWidget):
         self.raw_excel_btn.setFixedWidth(70)
         self.raw_excel_btn.clicked.connect(self.on_raw_excel)
         header_layout.addWidget(self.raw_excel_btn)
+        self.bulk_void_btn = QPushButton("일괄 취소")
+        self.bulk_void_btn.setObjectName("DangerBtn")
+        self.bulk_void_btn.setFixedWidth(90)
+        self.bulk_void_btn.clicked.connect(self.on_bulk_void)
+        header_layout.addWidget(self.bulk_void_btn)
 
         # Main layout structure: Left (Table) / Right (Inputs)
         main_h_layout = QHBoxLayout()
@@ -2435,35 +2734,67 @@ class RawDataScreen(QWidget):
 
         main_h_layout.addWidget(self.input_panel)
         self.current_log_id = None
+        self.full_data = []
+        self._page_query = ("", None, None)
+        self._page_generation = 0
+        self._next_cursor = None
+        self._page_loading = False
+        self.table.verticalScrollBar().valueChanged.connect(self._on_table_scrolled)
     def load_data(self):
-        start_date = self.start_date_edit.date().toString("yyyy-MM-dd")
-        end_date = self.end_date_edit.date().toString("yyyy-MM-dd")
-        self.loader = DataLoader(self.api.get_raw_data, self.search_input.text(), start_date, end_date)
-        self.loader.finished.connect(self.display_data)
+        # 조회 조건이 바뀌면 처음부터: 인증 순(asc) 첫 페이지만 받고, 나머지는 스크롤이 끝에 가까워질 때 이어 받음
+        self._page_query = (
+            self.search_input.text(),
+            self.start_date_edit.date().toString("yyyy-MM-dd"),
+            self.end_date_edit.date().toString("yyyy-MM-dd"),
+        )
+        self._page_generation += 1
+        self._next_cursor = None
+        self._page_loading = False
+        self.full_data = []
+        self.table.setRowCount(0)
+        self._load_next_page()
+
+    def _load_next_page(self, cursor=None):
+        if self._page_loading:
+            return
+        self._page_loading = True
+        generation = self._page_generation
+        search, start_date, end_date = self._page_query
+        self.loader = DataLoader(self.api.get_raw_data_page, search, start_date, end_date, cursor, RAW_DATA_PAGE_SIZE, "asc")
+        self.loader.finished.connect(lambda data, g=generation: self._on_page_loaded(g, data))
         self.loader.start()
+
+    def _on_page_loaded(self, generation, data):
+        if generation != self._page_generation:
+            return  # 그 사이 다시 조회함
+        self._page_loading = False
+        success, payload = data if isinstance(data, tuple) and len(data) >= 2 else (False, "응답 형식 오류")
+        if not success:
+            QMessageBox.warning(self, "오류", f"데이터를 가져오는데 실패했습니다.\n{payload}")
+            return
+        self._next_cursor = payload.get("next_cursor")
+        self.display_data(payload.get("items") or [])
+        # 첫 페이지가 화면을 다 채우지 못하면 스크롤이 생길 때까지 이어 받음
+        if self._next_cursor and self.table.verticalScrollBar().maximum() == 0:
+            self._load_next_page(self._next_cursor)
+
+    def _on_table_scrolled(self, value):
+        bar = self.table.verticalScrollBar()
+        if self._next_cursor and not self._page_loading and value >= bar.maximum() - RAW_DATA_PREFETCH_ROWS:
+            self._load_next_page(self._next_cursor)
+
     def display_data(self, data):
-        if isinstance(data, tuple) and len(data) >= 2:
-            success, payload = data[0], data[1]
-            if not success:
-                QMessageBox.warning(self, "오류", f"데이터를 가져오는데 실패했습니다.\n{payload}")
-                return
-            data = payload
+        """받은 페이지(인증 순)를 표 끝에 붙임. No 는 전체 인증 순번."""
         if not isinstance(data, list):
             return
         self.table.setSortingEnabled(False)
         self.table.setUpdatesEnabled(False)
 
-        def _created_key(row):
-            s = str(row.get("created_at") or "").strip().replace("Z", "")
-            if " " in s and "T" not in s:
-                s = s.replace(" ", "T", 1)
-            return s[:19]
-
-        # 가장 먼저 인증한 건 No=1, 그다음 2… (시간 빠른 순)
-        data = sorted([r for r in data if isinstance(r, dict)], key=_created_key)
-        self.table.setRowCount(len(data))
-        self.full_data = data
-        for i, row in enumerate(data):
+        data = [r for r in data if isinstance(r, dict)]
+        offset = len(self.full_data)
+        self.table.setRowCount(offset + len(data))
+        self.full_data.extend(data)
+        for i, row in enumerate(data, start=offset):
             created_at = str(row.get("created_at") or "")
             if "T" in created_at:
                 date_part = created_at.split("T")[0]
@@ -2512,11 +2843,13 @@ class RawDataScreen(QWidget):
             ok, payload = data
             if not ok:
                 self.policies_list = []
+                self._meal_type_slots = None
                 return
             data = payload
         if not isinstance(data, list):
             return
         self.policies_list = data
+        self._compile_meal_type_slots()
 
     def _created_at_time_from_policy(self, policy_id):
         """선택한 식사 종류의 시작 시간 + 5분을 HH:mm:ss 로 반환. 없으면 12:00:00."""
@@ -2532,29 +2865,32 @@ class RawDataScreen(QWidget):
         except Exception:
             return "12:00:00"
 
+    def _compile_meal_type_slots(self):
+        """활성 정책을 하루 1440분 슬롯으로 펼침 (서버 meal_policy_resolver 와 같은 규칙: 자정 넘김 허용, id 작은 정책 우선)."""
+        slots = [None] * 1440
+        for p in sorted(self.policies_list or [], key=lambda x: x.get("id") or 0):
+            if p.get("is_active") is False or not p.get("start_time") or not p.get("end_time"):
+                continue
+            try:
+                sh, sm = map(int, p["start_time"].split(":")[:2])
+                eh, em = map(int, p["end_time"].split(":")[:2])
+            except (ValueError, AttributeError):
+                continue
+            s, e = sh * 60 + sm, eh * 60 + em
+            ranges = [(s, e)] if s <= e else [(s, 1439), (0, e)]
+            for lo, hi in ranges:
+                for m in range(lo, hi + 1):
+                    if slots[m] is None:
+                        slots[m] = p.get("meal_type")
+        self._meal_type_slots = slots
+        return slots
+
     def get_meal_type_by_time(self, time_str):
         if not time_str: return "번외"
         try:
-            h, m, s = map(int, time_str.split(":"))
-            target_time = QTime(h, m, s)
-            
-            for p in self.policies_list:
-                if not p.get("start_time") or not p.get("end_time"): continue
-                
-                # Times from API are HH:MM:SS
-                sh, sm, ss = map(int, p["start_time"].split(":")[:3])
-                eh, em, es = map(int, p["end_time"].split(":")[:3])
-                
-                start = QTime(sh, sm, ss)
-                end = QTime(eh, em, es)
-                
-                if start <= end:
-                    if start <= target_time <= end:
-                        return p["meal_type"]
-                else: # Overnight
-                    if target_time >= start or target_time <= end:
-                        return p["meal_type"]
-            return "번외"
+            h, m = map(int, time_str.split(":")[:2])
+            slots = getattr(self, "_meal_type_slots", None) or self._compile_meal_type_slots()
+            return slots[h * 60 + m] or "번외"
         except Exception as e:
             print(f"Error judging meal type: {e}")
             return "번외"
@@ -2594,55 +2930,102 @@ class RawDataScreen(QWidget):
         self.del_btn.setEnabled(False)
 
     def on_raw_excel(self):
-        """원시데이터 테이블을 엑셀 파일로 저장 후 열기"""
-        import os
-        import tempfile
-        import subprocess
-        import sys
+        """조회 조건의 원시데이터를 서버 CSV 내보내기(/raw-data/export)로 받아 엑셀 파일로 저장 후 열기.
+        화면에 아직 받지 않은 페이지까지 포함. 받기·변환은 DataLoader 스레드에서 (큰 기간도 창이 멈추지 않게),
+        그동안 버튼은 '생성 중...' 으로 비활성화."""
         try:
-            import openpyxl
-            from openpyxl.styles import Font, Alignment
+            import openpyxl  # noqa: F401
         except ImportError:
             QMessageBox.warning(self, "오류", "엑셀 저장을 위해 openpyxl이 필요합니다.\npip install openpyxl")
             return
-        start_str = self.start_date_edit.date().toString("yyyy-MM-dd")
-        end_str = self.end_date_edit.date().toString("yyyy-MM-dd")
-        title = "원시데이터"
-        period_str = f"조회기간: {start_str} ~ {end_str}"
-        wb = openpyxl.Workbook()
-        ws = wb.active
-        ws.title = "원시데이터"
-        col_count = self.table.columnCount()
-        if col_count > 1:
-            ws.merge_cells(start_row=1, start_column=1, end_row=1, end_column=col_count)
-        ws.cell(row=1, column=1, value=title).font = Font(bold=True, size=16)
-        ws.cell(row=1, column=1).alignment = Alignment(horizontal="center", vertical="center")
-        ws.row_dimensions[1].height = 28
-        ws.cell(row=2, column=1, value=period_str)
-        for c in range(col_count):
-            h = self.table.horizontalHeaderItem(c)
-            ws.cell(row=3, column=c + 1, value=h.text() if h else "").font = Font(bold=True)
-        for r in range(self.table.rowCount()):
-            for c in range(col_count):
-                item = self.table.item(r, c)
-                val = item.text() if item else ""
-                ws.cell(row=r + 4, column=c + 1, value=val)
-        for i in range(1, col_count + 1):
-            ws.column_dimensions[openpyxl.utils.get_column_letter(i)].width = 14
+        search, start_str, end_str = self._page_query
+        headers = [
+            (self.table.horizontalHeaderItem(c).text() if self.table.horizontalHeaderItem(c) else "")
+            for c in range(self.table.columnCount())
+        ]
+        self.raw_excel_btn.setEnabled(False)
+        self.raw_excel_btn.setText("생성 중...")
+        self.main_win.statusBar().showMessage("원시데이터 엑셀 생성 중...")
+        self.raw_excel_loader = DataLoader(self._write_raw_excel, search, start_str, end_str, headers)
+        self.raw_excel_loader.finished.connect(self._on_raw_excel_finished)
+        self.raw_excel_loader.error.connect(lambda msg: self._on_raw_excel_finished((False, msg)))
+        self.raw_excel_loader.start()
+
+    def _write_raw_excel(self, search, start_str, end_str, headers):
+        """(DataLoader 스레드) CSV 를 임시 파일에 받아 한 줄씩 write-only 통합문서로 옮김. (성공, 저장 경로 또는 메시지).
+        위젯에 접근하지 않음."""
+        import csv
+        import os
+        import tempfile
+        import openpyxl
+        from openpyxl.cell import WriteOnlyCell
+        from openpyxl.styles import Font
+
+        fd, csv_path = tempfile.mkstemp(suffix=".csv", prefix="RawData_")
+        os.close(fd)
         try:
+            ok, msg = self.api.download_raw_data_export(csv_path, search, start_str, end_str, "csv")
+            if not ok:
+                return (False, f"데이터를 가져오는데 실패했습니다.\n{msg}")
+            wb = openpyxl.Workbook(write_only=True)
+            ws = wb.create_sheet("원시데이터")
+            for i in range(1, len(headers) + 1):
+                ws.column_dimensions[openpyxl.utils.get_column_letter(i)].width = 14
+            ws.row_dimensions[1].height = 28
+            title = WriteOnlyCell(ws, value="원시데이터")
+            title.font = Font(bold=True, size=16)
+            ws.append([title])
+            ws.append([f"조회기간: {start_str} ~ {end_str}"])
+            header_cells = []
+            for h in headers:
+                cell = WriteOnlyCell(ws, value=h)
+                cell.font = Font(bold=True)
+                header_cells.append(cell)
+            ws.append(header_cells)
+            with open(csv_path, newline="", encoding="utf-8-sig") as f:
+                for no, row in enumerate(csv.DictReader(f), start=1):
+                    date_part, _, time_part = (row.get("created_at") or "").partition("T")
+                    ws.append([
+                        no,
+                        date_part,
+                        time_part[:8],
+                        row.get("name") or "",
+                        row.get("emp_no") or "",
+                        row.get("meal_type") or "번외",
+                        row.get("path") or "",
+                        "취소됨" if row.get("is_void") == "True" else "정상",
+                    ])
             fd, save_path = tempfile.mkstemp(suffix=".xlsx", prefix="RawData_")
             os.close(fd)
             wb.save(save_path)
+            return (True, save_path)
         except Exception as e:
-            QMessageBox.warning(self, "오류", f"엑셀 파일 생성 실패:\n{e}")
+            return (False, f"엑셀 파일 생성 실패:\n{e}")
+        finally:
+            try:
+                os.remove(csv_path)
+            except OSError:
+                pass
+
+    def _on_raw_excel_finished(self, result):
+        import os
+        import subprocess
+        import sys
+
+        self.raw_excel_btn.setEnabled(True)
+        self.raw_excel_btn.setText("엑셀")
+        self.main_win.statusBar().clearMessage()
+        success, detail = result if isinstance(result, tuple) and len(result) >= 2 else (False, "엑셀 파일 생성 실패")
+        if not success:
+            QMessageBox.warning(self, "오류", str(detail))
             return
         try:
             if sys.platform == "win32":
-                os.startfile(save_path)
+                os.startfile(detail)
             elif sys.platform == "darwin":
-                subprocess.run(["open", save_path], check=True)
+                subprocess.run(["open", detail], check=True)
             else:
-                subprocess.run(["xdg-open", save_path], check=True)
+                subprocess.run(["xdg-open", detail], check=True)
         except Exception:
             pass
 
@@ -2756,6 +3139,31 @@ class RawDataScreen(QWidget):
             else:
                 QMessageBox.warning(self, "오류", "처리에 실패했습니다.")
 
+    def on_bulk_void(self):
+        """조회 조건(기간·검색어)의 식수 기록을 서버 백그라운드 작업으로 일괄 취소."""
+        search, start_str, end_str = self._page_query
+        period = f"{start_str} ~ {end_str}" + (f", 검색어 '{search}'" if search else "")
+        if QMessageBox.question(self, "일괄 취소 확인", f"조회 조건({period})의 기록을 모두 취소하시겠습니까?",
+                                QMessageBox.Yes | QMessageBox.No) == QMessageBox.No:
+            return
+        reason, ok = QInputDialog.getText(self, "취소 사유", "취소 사유를 입력하세요:")
+        if not ok or not reason.strip():
+            return
+        self.bulk_void_btn.setEnabled(False)
+        self.main_win.statusBar().showMessage("일괄 취소 중...", 2000)
+        self.bulk_void_loader = DataLoader(self.api.bulk_void_raw_data, reason.strip(), None, start_str, end_str, search)
+        self.bulk_void_loader.finished.connect(self.on_bulk_void_finished)
+        self.bulk_void_loader.start()
+
+    def on_bulk_void_finished(self, result):
+        self.bulk_void_btn.setEnabled(True)
+        success, detail = result if isinstance(result, tuple) else (False, "일괄 취소 실패")
+        if success:
+            QMessageBox.information(self, "성공", f"{detail.get('voided', 0)}건 취소되었습니다.")
+            self.load_data()
+        else:
+            QMessageBox.warning(self, "오류", f"작업 실패: {detail}")
+
 class PolicyScreen(QWidget):
     def __init__(self, api, main_win):
         super().__init__()
@@ -3327,8 +3735,8 @@ class ReportScreen(QWidget):
         
         self.main_win.statusBar().showMessage("데이터 조회 중...", 3000)
         
-        # Get raw data for the range
-        self.loader = DataLoader(self.api.get_raw_data, "", start, end)
+        # 기간 전체 (합계·사원별 묶음 계산에 모두 필요) — 한 응답이 커지지 않게 페이지 단위로 이어 받음
+        self.loader = DataLoader(self.api.get_raw_data_all, "", start, end, view="compact")
         self.loader.finished.connect(self.on_data_loaded)
         self.loader.start()
 
@@ -4760,6 +5168,7 @@ class MainWindow(QMainWindow):
         self.companies_data = []
         self.departments_data = []
         self._device_triggered_log_ids = set()
+        self._last_stats = None  # 마지막 /stats/today 응답 (WebSocket stats_delta 적용 기준)
         self.setWindowTitle("Meal Auth - Admin Management System")
         # 화면보다 큰 최소 크기 요구로 setGeometry 경고 나오지 않도록 상한 설정
         screen = QApplication.primaryScreen()
@@ -4861,8 +5270,23 @@ class MainWindow(QMainWindow):
         msg_type = data.get("type")
         if msg_type:
             print(f"[WS] message type={msg_type}")
-        if msg_type in ["USER_VERIFIED", "MEAL_LOG_CREATED", "STATS_REFRESH"]:
+        payload = data.get("data") or {}
+        if msg_type in ["MEAL_LOG_CREATED", "MEAL_LOG_VOIDED"] and payload.get("stats_delta"):
+            # 서버가 보낸 증감분을 화면 숫자에 더함 (/stats/today 재조회 생략). 적용 불가하면 재조회
+            updated = _apply_stats_delta(self._last_stats, payload["stats_delta"])
+            if updated is not None:
+                self.refresh_active_screen()
+                self.display_stats(updated)
+            else:
+                self.refresh_stats()
+        elif msg_type in ["USER_VERIFIED", "MEAL_LOG_CREATED", "STATS_REFRESH", "RESYNC_REQUIRED"]:
+            # RESYNC_REQUIRED: 끊긴 동안 놓친 이벤트를 서버가 다시 보낼 수 없음 → 전체 다시 조회
             self.refresh_stats()  # refresh active screen and dashboard
+        elif msg_type == "JOB_PROGRESS":
+            # 백그라운드 작업(엑셀 일괄 등록·보고서·일괄 취소) 진행률 → 상태 표시줄
+            total = payload.get("total")
+            progress = f"{payload.get('done', 0)}/{total}" if total else payload.get("status", "")
+            self.statusBar().showMessage(f"작업 진행: {progress} {payload.get('message') or ''}".strip(), 5000)
         # PC 앱에서 프린터·경광등 신호 전송 (QR 인증 등 MEAL_LOG_CREATED만, 수동 등록은 STATS_REFRESH)
         if msg_type == "MEAL_LOG_CREATED":
             self._trigger_devices_from_meal_data(data.get("data") or {})
@@ -4954,6 +5378,7 @@ class MainWindow(QMainWindow):
             pass # Explicit search only
     def display_stats(self, stats):
         if stats and isinstance(stats, dict):
+            self._last_stats = stats
             # Dynamic stats update
             self.dashboard.update_stats(stats)
             # 테이블도 서버가 통계 낸 날짜로 조회 (타임존/날짜 불일치 방지)
@@ -4971,7 +5396,7 @@ class MainWindow(QMainWindow):
         else:
             kst = timezone(timedelta(hours=9))
             day_str = datetime.now(kst).date().strftime("%Y-%m-%d")
-        self.recent_loader = DataLoader(self.api.get_raw_data, "", day_str, day_str)
+        self.recent_loader = DataLoader(self.api.get_raw_data, "", day_str, day_str, view="compact")
         self.recent_loader.finished.connect(self.on_recent_logs_finished)
         self.recent_loader.start()
 
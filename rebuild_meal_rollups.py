@@ -0,0 +1,44 @@
+"""식수 일별 집계(meal_daily_rollups) 재구성. meal_logs 를 직접 고쳤거나 집계가 어긋났을 때 실행.
+
+사용:
+  python rebuild_meal_rollups.py                          # meal_logs 전체 기간
+  python rebuild_meal_rollups.py --start 2025-01-01 --end 2025-12-31
+"""
+import argparse
+from datetime import date
+
+from app.core.database import Base, SessionLocal, engine
+from app.core.meal_rollups import mark_rollups_backfilled, meal_log_date_bounds, rebuild_rollups
+from app.core.report_cache import report_cache
+from app.core.schema_repair import backfill_meal_log_dates, ensure_meal_logs_columns
+from app.models.models import MealDailyRollup  # noqa: F401 — create_all 메타데이터
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--start", type=date.fromisoformat, help="시작일 (KST, 기본: 첫 식수 기록일)")
+    ap.add_argument("--end", type=date.fromisoformat, help="종료일 (KST, 기본: 마지막 식수 기록일)")
+    args = ap.parse_args()
+
+    Base.metadata.create_all(bind=engine, tables=[MealDailyRollup.__table__])
+    # 집계는 meal_logs.meal_date 기준이므로 비어 있는 행부터 채움
+    ensure_meal_logs_columns(engine)
+    backfill_meal_log_dates(engine)
+    with SessionLocal() as session:
+        bounds = meal_log_date_bounds(session)
+        start = args.start or (bounds[0] if bounds else None)
+        end = args.end or (bounds[1] if bounds else None)
+        if start is None or end is None:
+            print("식수 기록이 없습니다.")
+            return
+        n = rebuild_rollups(session, start, end)
+        if args.start is None and args.end is None:
+            # 전체 기간을 다시 만들었으면 서버 시작 시 초기 구성 생략
+            mark_rollups_backfilled(session, start, end)
+            session.commit()
+        report_cache.invalidate_all()  # 같은 호스트 서버의 보고서 디스크 캐시
+        print(f"meal_daily_rollups 재구성 완료: {start} ~ {end}, {n}행")
+
+
+if __name__ == "__main__":
+    main()
@@ -242,15 +242,29 @@ const app = {
 
     async processQrAuth(qrData) {
         const token = localStorage.getItem('meal_token');
+        // 스캔 1회당 키 1개. 네트워크 오류로 재전송해도 같은 키 → 서버가 최초 응답을 그대로 반환(중복 식수·출력 없음)
+        const idemKey = (window.crypto && crypto.randomUUID)
+            ? crypto.randomUUID()
+            : Date.now().toString(36) + '-' + Math.random().toString(36).slice(2);
         try {
-            const res = await fetch('/api/meal/qr-scan', {
-                method: 'POST',
-                headers: {
-                    'Content-Type': 'application/json',
-                    'Authorization': `Bearer ${token}`
-                },
-                body: JSON.stringify({ qr_data: qrData || '' })
-            });
+            let res;
+            for (let attempt = 0; ; attempt++) {
+                try {
+                    res = await fetch('/api/meal/qr-scan', {
+                        method: 'POST',
+                        headers: {
+                            'Content-Type': 'application/json',
+                            'Authorization': `Bearer ${token}`,
+                            'Idempotency-Key': idemKey
+                        },
+                        body: JSON.stringify({ qr_data: qrData || '' })
+                    });
+                    break;
+                } catch (netErr) {
+                    if (attempt >= 2) throw netErr;
+                    await new Promise(function (r) { setTimeout(r, 700 * (attempt + 1)); });
+                }
+            }
 
             const text = await res.text();
             let data;
@@ -0,0 +1,97 @@
+"""인증 캐시 무효화가 백플레인으로 다른 워커에 전달되는지 (pytest tests/)."""
+import asyncio
+import os
+import sys
+import threading
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core import principal_cache
+from app.core.event_backplane import RedisBackplane
+from ws_backplane_server import PubSubServer
+
+
+@pytest.fixture(autouse=True)
+def _reset_cache():
+    principal_cache.user_cache.clear()
+    principal_cache.admin_cache.clear()
+    yield
+    principal_cache.set_broadcaster(None)
+    principal_cache.user_cache.clear()
+    principal_cache.admin_cache.clear()
+
+
+async def _wait_for(predicate, timeout=5.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not predicate():
+        if asyncio.get_running_loop().time() > deadline:
+            raise AssertionError("timed out")
+        await asyncio.sleep(0.01)
+
+
+def test_invalidation_reaches_other_worker(tmp_path):
+    sock = str(tmp_path / "bp.sock")
+
+    async def scenario():
+        server = await asyncio.start_unix_server(PubSubServer().handle, path=sock)
+        sender = RedisBackplane(f"unix://{sock}", "test")
+        receiver = RedisBackplane(f"unix://{sock}", "test")
+        received = []
+
+        async def no_events(deliveries):
+            pass
+
+        await sender.start(no_events)
+        await receiver.start(no_events, received.append)
+        await _wait_for(lambda: sender.connected_pub and receiver.connected_sub)
+        principal_cache.set_broadcaster(sender.send_control)
+        try:
+            principal_cache.invalidate_user(7)
+            # 동기 라우트·작업 스레드에서의 무효화
+            worker = threading.Thread(target=principal_cache.invalidate_users, args=([8, 9],))
+            worker.start()
+            worker.join()
+            principal_cache.invalidate_admin(3)
+            principal_cache.invalidate_all_users()
+            await _wait_for(lambda: len(received) == 4)
+        finally:
+            await sender.close()
+            await receiver.close()
+            server.close()
+            await server.wait_closed()
+        return received
+
+    received = asyncio.run(scenario())
+    # 다른 스레드의 무효화는 이벤트 루프로 넘겨 보내므로 순서는 보장하지 않음
+    assert sorted(received, key=repr) == sorted([
+        {"type": principal_cache.AUTH_INVALIDATE, "users": [7]},
+        {"type": principal_cache.AUTH_INVALIDATE, "users": [8, 9]},
+        {"type": principal_cache.AUTH_INVALIDATE, "admins": [3]},
+        {"type": principal_cache.AUTH_INVALIDATE, "all_users": True},
+    ], key=repr)
+
+
+def test_apply_remote_invalidation_drops_only_named_entries():
+    for uid in (1, 2):
+        principal_cache.user_cache.set(uid, f"user{uid}")
+    principal_cache.admin_cache.set(5, "admin5")
+    sent = []
+    principal_cache.set_broadcaster(sent.append)
+
+    principal_cache.apply_remote_invalidation({"type": principal_cache.AUTH_INVALIDATE, "users": [1], "admins": [5]})
+
+    assert principal_cache.user_cache.get(1) is None
+    assert principal_cache.user_cache.get(2) == "user2"
+    assert principal_cache.admin_cache.get(5) is None
+    assert sent == []  # 받은 무효화를 다시 보내지 않음
+
+
+def test_large_invalidation_sends_clear_all():
+    sent = []
+    principal_cache.set_broadcaster(sent.append)
+    principal_cache.invalidate_users(range(principal_cache._MAX_IDS_PER_MESSAGE + 1))
+    assert sent == [{"type": principal_cache.AUTH_INVALIDATE, "all_users": True}]
@@ -0,0 +1,85 @@
+"""사원 엑셀 일괄 등록: 숫자 사번 열과 기존 DB 사번의 비교 (pytest tests/)."""
+import os
+from io import BytesIO
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from app.api.admin.employees import _import_employees, _normalize_emp_no
+from app.core.database import Base
+from app.models.models import Company, Department, User
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    with Session(engine) as session:
+        company = Company(code="C1", name="회사")
+        session.add(company)
+        session.flush()
+        session.add(Department(company_id=company.id, code="개발", name="개발"))
+        session.commit()
+        yield session
+    engine.dispose()
+
+
+def _xlsx(rows) -> bytes:
+    buf = BytesIO()
+    pd.DataFrame(rows, columns=["사번", "성명", "부서명"]).to_excel(buf, index=False)
+    return buf.getvalue()
+
+
+def _company_id(db) -> int:
+    return db.execute(select(Company.id)).scalar_one()
+
+
+@pytest.mark.parametrize("raw, expected", [
+    ("1001", "1001"),
+    (" 1001.0 ", "1001"),
+    ("1001.00", "1001"),
+    ("00123", "00123"),
+    ("A-1001.0", "A-1001.0"),
+    ("1001.5", "1001.5"),
+])
+def test_normalize_emp_no(raw, expected):
+    assert _normalize_emp_no(raw) == expected
+
+
+def test_numeric_emp_no_column_matches_existing_users(db):
+    company_id = _company_id(db)
+    dept_id = db.execute(select(Department.id)).scalar_one()
+    # 예전 가져오기(dtype 미지정, 빈 칸 때문에 실수 열)가 남긴 사번, 그리고 정상 사번
+    db.add_all([
+        User(company_id=company_id, department_id=dept_id, emp_no="1001.0", name="기존1", status="ACTIVE"),
+        User(company_id=company_id, department_id=dept_id, emp_no="1002", name="기존2", status="RESIGNED"),
+    ])
+    db.commit()
+
+    # 숫자 셀 사번 열 (빈 칸이 섞여 float64 열이 됨)
+    content = _xlsx([[1001, "기존1", "개발"], [1002, "기존2", "개발"], [1003, "신규", "개발"], [None, None, None]])
+    result = _import_employees(db, content, company_id)
+
+    assert result["error_count"] == 0
+    assert result["success_count"] == 2
+    assert result["reregister_count"] == 1
+    assert result["skip_count"] == 1
+    emp_nos = sorted(db.execute(select(User.emp_no)).scalars())
+    assert emp_nos == ["1001.0", "1002", "1003"]
+
+
+def test_reimport_of_numeric_column_is_skipped(db):
+    company_id = _company_id(db)
+    content = _xlsx([[2001, "가", "개발"], [2002.0, "나", "영업"]])
+    first = _import_employees(db, content, company_id)
+    second = _import_employees(db, content, company_id)
+
+    assert first["success_count"] == 2
+    assert second["success_count"] == 0
+    assert second["skip_count"] == 2
+    assert sorted(db.execute(select(User.emp_no)).scalars()) == ["2001", "2002"]
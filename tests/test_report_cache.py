@@ -0,0 +1,87 @@
+"""마감 기간 보고서 캐시: 파일 객체 본문(엑셀)이 캐시되지 못한 경우에도 그대로 응답 (pytest tests/)."""
+import asyncio
+import os
+from datetime import date
+from tempfile import SpooledTemporaryFile
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+import pytest
+
+from app.core import report_cache as rc
+from app.core.config import settings
+
+START, END = date(2020, 1, 1), date(2020, 1, 31)
+XLSX = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+PAYLOAD = b"PK\x03\x04" + b"x" * 200_000
+
+
+class _Request:
+    headers = {}
+
+
+def _body(response) -> bytes:
+    if hasattr(response, "body_iterator"):
+        async def collect():
+            return b"".join([chunk async for chunk in response.body_iterator])
+        return asyncio.run(collect())
+    return response.body
+
+
+def _fileobj_build(on_build=None):
+    def build():
+        if on_build is not None:
+            on_build()
+        f = SpooledTemporaryFile(max_size=1024)
+        f.write(PAYLOAD)
+        f.seek(0)
+        return f
+    return build
+
+
+@pytest.fixture
+def cache(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "REPORT_CACHE_ENABLED", True)
+    monkeypatch.setattr(settings, "REPORT_CACHE_DIR", str(tmp_path / "cache"))
+    instance = rc.ReportCache()
+    monkeypatch.setattr(rc, "report_cache", instance)
+    return instance
+
+
+def test_fileobj_body_cached_then_served_from_disk(cache):
+    first = rc.cached_report(_Request(), "excel", START, END, {}, _fileobj_build(), XLSX)
+    assert first.status_code == 200 and _body(first) == PAYLOAD
+    second = rc.cached_report(_Request(), "excel", START, END, {}, _fileobj_build(lambda: pytest.fail("rebuilt")), XLSX)
+    assert _body(second) == PAYLOAD
+    assert cache.stores == 1
+
+
+def test_fileobj_body_invalidated_during_build(cache):
+    response = rc.cached_report(
+        _Request(), "excel", START, END, {}, _fileobj_build(cache.invalidate_all), XLSX,
+    )
+    assert response.status_code == 200 and _body(response) == PAYLOAD
+    assert cache.stores == 0
+    assert cache.get("excel", START, END, {}) is None
+
+
+def test_fileobj_body_memory_only(cache, monkeypatch, tmp_path):
+    blocker = tmp_path / "not-a-dir"
+    blocker.write_text("")
+    monkeypatch.setattr(settings, "REPORT_CACHE_DIR", str(blocker / "cache"))
+    response = rc.cached_report(_Request(), "excel", START, END, {}, _fileobj_build(), XLSX)
+    assert response.status_code == 200 and _body(response) == PAYLOAD
+    assert cache.stores == 0
+
+
+def test_disk_body_removed_before_response(cache, monkeypatch):
+    put = cache.put
+
+    def put_then_wipe(*args, **kwargs):
+        entry = put(*args, **kwargs)
+        os.remove(entry.path)
+        return entry
+
+    monkeypatch.setattr(cache, "put", put_then_wipe)
+    response = rc.cached_report(_Request(), "excel", START, END, {}, _fileobj_build(), XLSX)
+    assert response.status_code == 200 and _body(response) == PAYLOAD
@@ -0,0 +1,104 @@
+"""WebSocket 백플레인 대체 서버 (Redis 없이 개발·시험용 최소 pub/sub).
+
+Redis 프로토콜의 PING / SUBSCRIBE / UNSUBSCRIBE / PUBLISH / AUTH / QUIT 만 처리.
+같은 호스트 워커끼리는 unix 소켓으로 쓰면 됨.
+
+사용:
+  python ws_backplane_server.py --port 6380
+  WS_BACKPLANE_URL=redis://127.0.0.1:6380 uvicorn main:app --workers 4
+  python ws_backplane_server.py --unix /tmp/meal_ws.sock
+  WS_BACKPLANE_URL=unix:///tmp/meal_ws.sock uvicorn main:app --workers 4
+"""
+import argparse
+import asyncio
+import logging
+import os
+import sys
+from typing import Dict, Set
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.core.event_backplane import encode_command, read_resp  # noqa: E402
+
+logger = logging.getLogger("ws_backplane_server")
+
+
+class PubSubServer:
+    def __init__(self):
+        self.channels: Dict[bytes, Set[asyncio.StreamWriter]] = {}
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        subscribed: Set[bytes] = set()
+        try:
+            while True:
+                cmd = await read_resp(reader)
+                if not isinstance(cmd, list) or not cmd:
+                    continue
+                name = bytes(cmd[0]).upper()
+                args = cmd[1:]
+                if name == b"PING":
+                    writer.write(b"+PONG\r\n")
+                elif name == b"AUTH":
+                    writer.write(b"+OK\r\n")
+                elif name == b"SUBSCRIBE":
+                    for ch in args:
+                        subscribed.add(ch)
+                        self.channels.setdefault(ch, set()).add(writer)
+                        # ["subscribe", channel, 구독 수]
+                        head = encode_command(b"subscribe", ch)[len(b"*2\r\n"):]
+                        writer.write(b"*3\r\n" + head + b":%d\r\n" % len(subscribed))
+                elif name == b"UNSUBSCRIBE":
+                    for ch in args or list(subscribed):
+                        subscribed.discard(ch)
+                        self.channels.get(ch, set()).discard(writer)
+                elif name == b"PUBLISH" and len(args) == 2:
+                    ch, payload = args
+                    receivers = list(self.channels.get(ch, ()))
+                    msg = encode_command(b"message", ch, payload)
+                    for w in receivers:
+                        w.write(msg)
+                    writer.write(b":%d\r\n" % len(receivers))
+                elif name == b"QUIT":
+                    writer.write(b"+OK\r\n")
+                    await writer.drain()
+                    break
+                else:
+                    writer.write(b"-ERR unknown command\r\n")
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            for ch in subscribed:
+                self.channels.get(ch, set()).discard(writer)
+            writer.close()
+
+
+async def _serve(args) -> None:
+    server = PubSubServer()
+    if args.unix:
+        if os.path.exists(args.unix):
+            os.unlink(args.unix)
+        srv = await asyncio.start_unix_server(server.handle, path=args.unix)
+        logger.info("backplane listening on unix://%s", args.unix)
+    else:
+        srv = await asyncio.start_server(server.handle, args.host, args.port)
+        logger.info("backplane listening on redis://%s:%s", args.host, args.port)
+    async with srv:
+        await srv.serve_forever()
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=6380)
+    ap.add_argument("--unix", default="", help="TCP 대신 unix 소켓 경로")
+    args = ap.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+    try:
+        asyncio.run(_serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()